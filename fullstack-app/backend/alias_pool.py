@@ -0,0 +1,297 @@
+"""
+Pool of pre-generated aliases, served instantly at signup
+
+Aliases are generated ALIAS_BATCH_SIZE at a time per LLM call and appended
+to the `alias_pool/available` document. Firestore is the source of truth, so
+every worker and every restart sees the same pool: take() pops the first
+free alias from that document and records it in `alias_claims/{alias}` in
+one transaction, checking the claim documents at claim time - two workers
+can't hand out the same alias. Aliases users already had are claimed once
+by load() (the `meta/alias_claims` document records that it ran).
+
+When the pool drops below the low watermark a background refill tops it
+back up. If it ever runs dry, ADJECTIVES x NOUNS combinations fill in.
+"""
+import asyncio
+import random
+import re
+from datetime import datetime
+
+from firebase_admin import firestore
+
+from firestore_paging import iter_query_documents
+from metrics import metrics
+
+# Fallback AI Alias Generator (if OpenAI fails or the pool is empty)
+ADJECTIVES = ["Velvet", "Neon", "Cosmic", "Shadow", "Electric", "Mystic", "Digital", "Urban", "Midnight", "Golden"]
+NOUNS = ["Thunder", "Phantom", "Wolf", "Phoenix", "Viper", "Cipher", "Falcon", "Raven", "Tiger", "Dragon"]
+
+ALIAS_MODEL = "gpt-3.5-turbo"
+ALIAS_BATCH_SIZE = 50
+CLAIMS_COLLECTION = 'alias_claims'
+# A claim can still lose a race with a personalized alias - try the next one
+CLAIM_ATTEMPTS = 3
+
+ALIAS_SYSTEM_PROMPT = (
+    "You are a creative alias generator for BCPlugHub, a college social app. "
+    "Generate ONLY a cool, mysterious 2-word alias (Adjective + Noun) based on the user's info. "
+    "Make it edgy, fun, and campus-appropriate. The alias should feel like a secret identity. "
+    "Examples: 'Neon Thunder', 'Cosmic Wolf', 'Digital Phoenix', 'Velvet Cipher'. "
+    "Respond with ONLY the 2-word alias, nothing else."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a creative alias generator for BCPlugHub, a college social app. "
+    "Aliases are cool, mysterious 2-word secret identities (Adjective + Noun) that are edgy, fun "
+    "and campus-appropriate, like 'Neon Thunder', 'Cosmic Wolf', 'Digital Phoenix', 'Velvet Cipher'. "
+    "Respond with ONLY the aliases, one per line, no numbering."
+)
+
+_ALIAS_RE = re.compile(r"^[A-Za-z]+ [A-Za-z]+$")
+
+
+def normalize_alias(text):
+    """'  3. neon   thunder' -> 'Neon Thunder', or None if it isn't a 2-word alias"""
+    text = re.sub(r"^\s*(?:\d+[.)]|[-*•])\s*", "", text or "").strip().strip('"\'').strip()
+    text = " ".join(text.split())
+    if not _ALIAS_RE.match(text):
+        return None
+    return " ".join(word.capitalize() for word in text.split())
+
+
+def generate_fallback_alias():
+    """Generate a cool AI alias (fallback)"""
+    return f"{random.choice(ADJECTIVES)} {random.choice(NOUNS)}"
+
+
+def _is_conflict(error):
+    # AlreadyExists / Conflict from a create() of an existing document
+    return getattr(error, 'code', None) == 409
+
+
+class AliasPool:
+
+    def __init__(self, db, gateway, target_size=300, low_watermark=100, batch_size=ALIAS_BATCH_SIZE):
+        self.db = db
+        self.gateway = gateway
+        self.target_size = target_size
+        self.low_watermark = low_watermark
+        self.batch_size = batch_size
+        # Lowercased aliases this process has seen claimed - skips a read, never trusted alone
+        self._taken = set()
+        self._remaining = 0  # pool size as of the last claim/refill
+        self._refill_lock = asyncio.Lock()
+        self._refill_task = None
+
+    def _pool_ref(self):
+        return self.db.collection('alias_pool').document('available')
+
+    def _claim_ref(self, alias):
+        return self.db.collection(CLAIMS_COLLECTION).document(alias.lower())
+
+    def _marker_ref(self):
+        return self.db.collection('meta').document(CLAIMS_COLLECTION)
+
+    def _pool_aliases(self, transaction=None):
+        pool_doc = self._pool_ref().get(transaction=transaction)
+        return list((pool_doc.to_dict() or {}).get('aliases', [])) if pool_doc.exists else []
+
+    def _is_free(self, alias, transaction=None):
+        """Whether nobody has claimed alias (reads its claim document unless already known taken)"""
+        if alias.lower() in self._taken:
+            return False
+        if self._claim_ref(alias).get(transaction=transaction).exists:
+            self._taken.add(alias.lower())
+            return False
+        return True
+
+    def _claim_data(self, user_id):
+        return {'user_id': user_id, 'claimed_at': datetime.utcnow().isoformat()}
+
+    def load(self):
+        """Claim the aliases users already have, once, and read the pool size (blocking, run at startup)"""
+        if not self._marker_ref().get().exists:
+            claimed = 0
+            users = self.db.collection('users').order_by('__name__').select(['ai_generated_alias'])
+            for doc in iter_query_documents(users):
+                alias = (doc.to_dict() or {}).get('ai_generated_alias')
+                if not alias:
+                    continue
+                self._taken.add(alias.lower())
+                try:
+                    self._claim_ref(alias).create(self._claim_data(doc.id))
+                    claimed += 1
+                except Exception as e:
+                    # Already claimed, or a legacy duplicate - the first user keeps it
+                    if not _is_conflict(e):
+                        raise
+            self._marker_ref().set({'claimed_at': datetime.utcnow().isoformat(), 'claimed': claimed})
+
+        self._remaining = len(self._pool_aliases())
+        metrics.gauge('alias_pool.available', self._remaining)
+        print(f"🎭 Alias pool loaded: {self._remaining} available")
+
+    def __len__(self):
+        return self._remaining
+
+    def mark_taken(self, alias):
+        if alias:
+            self._taken.add(alias.lower())
+
+    def take(self, user_id=None):
+        """
+        Claim an unused alias for user_id (blocking)
+
+        Pops it from the pool document and creates its claim in one
+        transaction; claimed aliases found on the way are dropped from the pool.
+        """
+        pool_ref = self._pool_ref()
+
+        @firestore.transactional
+        def claim(transaction):
+            aliases = self._pool_aliases(transaction)
+            alias, used = None, 0
+            for candidate in aliases:
+                used += 1
+                if self._is_free(candidate, transaction):
+                    alias = candidate
+                    break
+            from_pool = alias is not None
+            if alias is None:
+                alias = self._fallback_alias(transaction)
+            if used:
+                transaction.set(pool_ref, {'aliases': aliases[used:]})
+            transaction.create(self._claim_ref(alias), self._claim_data(user_id))
+            return alias, from_pool, len(aliases) - used
+
+        for attempt in range(CLAIM_ATTEMPTS):
+            try:
+                alias, from_pool, self._remaining = claim(self.db.transaction())
+                break
+            except Exception as e:
+                if not _is_conflict(e) or attempt == CLAIM_ATTEMPTS - 1:
+                    raise
+
+        self.mark_taken(alias)
+        metrics.incr('alias_pool.served' if from_pool else 'alias_pool.fallbacks')
+        metrics.gauge('alias_pool.available', self._remaining)
+        return alias
+
+    async def claim(self, user_id=None):
+        """take() off the event loop; kicks off a refill when the pool runs low"""
+        alias = await asyncio.to_thread(self.take, user_id)
+        if self._remaining < self.low_watermark:
+            self.schedule_refill()
+        return alias
+
+    def _fallback_alias(self, transaction=None):
+        combos = [f"{adjective} {noun}" for adjective in ADJECTIVES for noun in NOUNS]
+        random.shuffle(combos)
+        for alias in combos:
+            if self._is_free(alias, transaction):
+                return alias
+        # All 100 combinations are used - add a number to keep it unique
+        while True:
+            alias = f"{generate_fallback_alias()} {random.randint(10, 99)}"
+            if self._is_free(alias, transaction):
+                return alias
+
+    def _append(self, batch):
+        """Add new aliases to the pool document -> (added, pool size) (blocking)"""
+        pool_ref = self._pool_ref()
+
+        @firestore.transactional
+        def append(transaction):
+            aliases = self._pool_aliases(transaction)
+            queued = {alias.lower() for alias in aliases}
+            new = []
+            for alias in batch:
+                if alias.lower() not in queued and alias.lower() not in self._taken:
+                    queued.add(alias.lower())
+                    new.append(alias)
+            if new:
+                transaction.set(pool_ref, {'aliases': aliases + new})
+            return len(new), len(aliases) + len(new)
+
+        return append(self.db.transaction())
+
+    def schedule_refill(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.get_running_loop().create_task(self.refill())
+        return self._refill_task
+
+    async def _generate_batch(self):
+        text = await self.gateway.chat(
+            ALIAS_MODEL,
+            [
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Generate {self.batch_size} different aliases."},
+            ],
+            timeout=30.0,
+            max_tokens=8 * self.batch_size,
+            temperature=1.0
+        )
+        return [alias for alias in map(normalize_alias, text.splitlines()) if alias]
+
+    async def refill(self):
+        """Generate batches until the pool is back at target_size (or a batch adds nothing new)"""
+        async with self._refill_lock:
+            added = 0
+            self._remaining = len(await asyncio.to_thread(self._pool_aliases))
+            while self._remaining < self.target_size:
+                try:
+                    batch = await self._generate_batch()
+                except Exception as e:
+                    print(f"⚠️ Alias pool refill failed: {e}")
+                    metrics.incr('alias_pool.refill_errors')
+                    break
+
+                new, self._remaining = await asyncio.to_thread(self._append, batch)
+                metrics.incr('alias_pool.generated', len(batch))
+                metrics.incr('alias_pool.duplicates', len(batch) - new)
+                added += new
+                if new == 0:
+                    break
+
+            metrics.gauge('alias_pool.available', self._remaining)
+            if added:
+                print(f"🎭 Alias pool refilled: +{added} ({self._remaining} available)")
+            return added
+
+    async def personalized(self, description, name=None, user_id=None):
+        """One LLM call shaped by the user's description; pool alias if that fails or is taken"""
+        user_info = f"Description: {description}"
+        if name:
+            user_info += f", Name: {name}"
+
+        try:
+            text = await self.gateway.chat(
+                ALIAS_MODEL,
+                [
+                    {"role": "system", "content": ALIAS_SYSTEM_PROMPT},
+                    {"role": "user", "content": f"Generate an alias for: {user_info}"},
+                ],
+                timeout=5.0,
+                max_tokens=10,
+                temperature=0.9
+            )
+        except Exception as e:
+            print(f"OpenAI error: {e}")
+            return await self.claim(user_id)
+
+        alias = normalize_alias(text)
+        if alias and alias.lower() not in self._taken:
+            try:
+                # create() is the taken check - it fails if anyone already holds the alias
+                await asyncio.to_thread(self._claim_ref(alias).create, self._claim_data(user_id))
+            except Exception as e:
+                if not _is_conflict(e):
+                    raise
+                self.mark_taken(alias)
+            else:
+                self.mark_taken(alias)
+                metrics.incr('alias_pool.personalized')
+                print(f"Generated alias: {alias}")
+                return alias
+
+        return await self.claim(user_id)
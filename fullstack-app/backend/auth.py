@@ -0,0 +1,198 @@
+"""
+Password hashing and signed JWT sessions
+
+Passwords are stored as salted PBKDF2-HMAC-SHA256 hashes
+(`pbkdf2_sha256$<iterations>$<salt>$<hash>`). Hashing is slow on purpose,
+so it runs on a small dedicated thread pool - hashlib releases the GIL -
+rather than on the event loop or the default to_thread pool that Firestore
+calls share. Accounts created before hashing still have a plaintext
+`password` field; verify_user_password accepts it once and hands back a
+hash to store in its place.
+
+Login returns a short-lived access token plus a long-lived refresh token
+(python-jose, HS256). The access token carries the user id, email and name,
+so the caller of a request is resolved from the token alone - no Firestore
+read. A refresh token can only be traded for a new pair.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from jose import ExpiredSignatureError, JWTError, jwt
+from pydantic import BaseModel
+
+from metrics import metrics
+
+PASSWORD_SCHEME = 'pbkdf2_sha256'
+PASSWORD_ITERATIONS = 600_000  # OWASP 2023 recommendation for PBKDF2-SHA256
+SALT_BYTES = 16
+
+_hash_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='password-hash')
+
+
+class InvalidTokenError(Exception):
+    """Missing, malformed, expired or wrong-type token"""
+
+
+class TokenUser(BaseModel):
+    user_id: str
+    bc_email: str
+    name: str
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def hash_password(password, iterations=PASSWORD_ITERATIONS):
+    """Salted PBKDF2 hash string (blocking, ~0.3s)"""
+    salt = secrets.token_bytes(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+    return f"{PASSWORD_SCHEME}${iterations}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, stored_hash):
+    """Constant-time check of password against a hash_password() string (blocking)"""
+    try:
+        scheme, iterations, salt, expected = stored_hash.split('$')
+        if scheme != PASSWORD_SCHEME:
+            return False
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), base64.b64decode(salt), int(iterations))
+    except (ValueError, TypeError):
+        return False
+    return hmac.compare_digest(digest, base64.b64decode(expected))
+
+
+def needs_rehash(stored_hash):
+    try:
+        return int(stored_hash.split('$')[1]) < PASSWORD_ITERATIONS
+    except (IndexError, ValueError):
+        return True
+
+
+# Verified against when the email is unknown, so response time doesn't reveal which emails exist.
+# Built on the first such login rather than at import - it's a full PBKDF2 run
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    return hash_password(secrets.token_urlsafe(16))
+
+
+def _verify_stored(password, stored_hash):
+    return verify_password(password, stored_hash or _dummy_hash())
+
+
+async def hash_password_async(password):
+    with metrics.timer('auth.hash_seconds'):
+        return await asyncio.get_running_loop().run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_user_password(password, user_data):
+    """
+    Check a login attempt against a user document (None if the email is unknown)
+    Returns (matches, new_hash) - new_hash is set when the stored form should be
+    replaced (legacy plaintext or an outdated iteration count)
+    """
+    loop = asyncio.get_running_loop()
+    stored_hash = (user_data or {}).get('password_hash')
+
+    if user_data is not None and stored_hash is None and user_data.get('password') is not None:
+        # Pre-hashing account: accept the plaintext once, then store a hash instead
+        if not hmac.compare_digest(str(user_data['password']).encode('utf-8'), password.encode('utf-8')):
+            return False, None
+        metrics.incr('auth.legacy_password_upgrades')
+        return True, await hash_password_async(password)
+
+    with metrics.timer('auth.verify_seconds'):
+        matches = await loop.run_in_executor(_hash_pool, _verify_stored, password, stored_hash)
+    if not matches or stored_hash is None:
+        return False, None
+    return True, (await hash_password_async(password) if needs_rehash(stored_hash) else None)
+
+
+class TokenService:
+
+    def __init__(self, secret=None, access_minutes=15, refresh_days=14, algorithm='HS256'):
+        if not secret:
+            print("⚠️ JWT_SECRET is not set - using a random secret, sessions won't survive a restart")
+            secret = secrets.token_urlsafe(32)
+        self.secret = secret
+        self.algorithm = algorithm
+        self.access_seconds = access_minutes * 60
+        self.refresh_seconds = refresh_days * 24 * 3600
+
+    def _encode(self, claims, token_type, lifetime):
+        now = int(time.time())
+        payload = {**claims, 'type': token_type, 'iat': now, 'exp': now + lifetime, 'jti': secrets.token_hex(8)}
+        return jwt.encode(payload, self.secret, algorithm=self.algorithm)
+
+    def issue(self, user_id, bc_email, name):
+        """Access + refresh token pair for a user"""
+        metrics.incr('auth.tokens_issued')
+        return {
+            'access_token': self._encode(
+                {'sub': user_id, 'email': bc_email, 'name': name}, 'access', self.access_seconds
+            ),
+            'refresh_token': self._encode({'sub': user_id}, 'refresh', self.refresh_seconds),
+            'token_type': 'bearer',
+            'expires_in': self.access_seconds,
+        }
+
+    def decode(self, token, token_type):
+        try:
+            claims = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        except ExpiredSignatureError:
+            metrics.incr('auth.expired_tokens')
+            raise InvalidTokenError("Token has expired")
+        except JWTError:
+            metrics.incr('auth.invalid_tokens')
+            raise InvalidTokenError("Invalid token")
+        if claims.get('type') != token_type or not claims.get('sub'):
+            metrics.incr('auth.invalid_tokens')
+            raise InvalidTokenError("Invalid token")
+        return claims
+
+    def current_user(self, access_token):
+        """The caller of a request, from its access token alone"""
+        claims = self.decode(access_token, 'access')
+        return TokenUser(user_id=claims['sub'], bc_email=claims.get('email', ''), name=claims.get('name', ''))
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    stored = hash_password('correct horse')
+    print(f"hash: {(time.perf_counter() - start) * 1000:.0f} ms  {stored[:40]}...")
+    assert verify_password('correct horse', stored) and not verify_password('wrong', stored)
+
+    async def concurrent_logins(n=8):
+        """Loop stays responsive while n logins hash in the pool"""
+        lags = []
+
+        async def probe():
+            while True:
+                t = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - t - 0.01)
+
+        task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        results = await asyncio.gather(*(verify_user_password('correct horse', {'password_hash': stored})
+                                         for _ in range(n)))
+        elapsed = time.perf_counter() - start
+        task.cancel()
+        assert all(matches for matches, _ in results)
+        print(f"{n} concurrent verifications: {elapsed:.2f}s, max loop lag {max(lags) * 1000:.1f} ms")
+
+    asyncio.run(concurrent_logins())
+
+    tokens = TokenService('dev-secret').issue('u1', 'eagle@bc.edu', 'Eagle')
+    service = TokenService('dev-secret')
+    start = time.perf_counter()
+    for _ in range(10_000):
+        service.current_user(tokens['access_token'])
+    print(f"resolve caller from token: {(time.perf_counter() - start) / 10_000 * 1e6:.0f} us")
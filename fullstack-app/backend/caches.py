@@ -0,0 +1,216 @@
+"""
+In-process caches with hit-rate metrics
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from llm_gateway import LLMUnavailableError
+from metrics import metrics
+
+
+class LRUCache:
+    """
+    Thread-safe LRU map. Hits/misses are reported as `<name>.hits` / `<name>.misses`.
+    With a ttl (seconds), entries older than that are dropped on read and count as misses.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=1024, name='cache', ttl=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        expired = False
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is not self._MISSING:
+                if self.ttl is not None and self._expires[key] <= time.monotonic():
+                    del self._data[key]
+                    del self._expires[key]
+                    value = self._MISSING
+                    expired = True
+                else:
+                    self._data.move_to_end(key)
+        if expired:
+            metrics.incr(f'{self.name}.expirations')
+        if value is self._MISSING:
+            metrics.incr(f'{self.name}.misses')
+            return default
+        metrics.incr(f'{self.name}.hits')
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
+                metrics.incr(f'{self.name}.evictions')
+
+    def pop(self, key):
+        with self._lock:
+            self._expires.pop(key, None)
+            return self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        counters = metrics.snapshot()['counters']
+        hits = counters.get(f'{self.name}.hits', 0)
+        misses = counters.get(f'{self.name}.misses', 0)
+        lookups = hits + misses
+        return {
+            'size': len(self),
+            'maxsize': self.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'evictions': counters.get(f'{self.name}.evictions', 0),
+            'expirations': counters.get(f'{self.name}.expirations', 0),
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+        }
+
+
+class PredictionCache:
+    """
+    Goated predictions keyed by (model version, hash of the feature vector)
+
+    A new model version or any change to an input feature produces a new key,
+    so stale entries are never served. Entries are also tracked per event id so
+    a cancelled event's entry is dropped right away instead of waiting for it
+    to age out of the LRU.
+    """
+
+    def __init__(self, maxsize=4096):
+        self._cache = LRUCache(maxsize=maxsize, name='prediction_cache')
+        self._keys_by_event = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_version, features):
+        digest = hashlib.blake2b(np.ascontiguousarray(features, dtype=np.float64).tobytes(), digest_size=16)
+        return (model_version, digest.hexdigest())
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def put(self, key, prediction, event_id=None):
+        self._cache.set(key, prediction)
+        if event_id:
+            with self._lock:
+                old_key = self._keys_by_event.get(event_id)
+                self._keys_by_event[event_id] = key
+            if old_key is not None and old_key != key:
+                self._cache.pop(old_key)
+
+    def invalidate_event(self, event_id):
+        """Drop the cached prediction for an event that was changed or removed"""
+        with self._lock:
+            key = self._keys_by_event.pop(event_id, None)
+        if key is not None and self._cache.pop(key) is not None:
+            metrics.incr('prediction_cache.invalidations')
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class LLMResponseCache:
+    """
+    Completed LLM responses keyed by a canonical hash of the request, with TTL + LRU bounds
+
+    Concurrent identical requests share one in-flight upstream call (single
+    flight). Every response served without calling upstream - a cache hit or
+    a coalesced waiter - adds that call's upstream latency to
+    `<name>.latency_saved_seconds`. Failed calls aren't cached, so the caller's
+    fallback runs and the next request tries upstream again; if the calling
+    request is cancelled its waiters get LLMUnavailableError.
+    """
+
+    def __init__(self, maxsize=256, ttl=600, name='llm_cache'):
+        self.name = name
+        self._cache = LRUCache(maxsize=maxsize, name=name, ttl=ttl)
+        self._in_flight = {}
+
+    @staticmethod
+    def key(model, payload):
+        """Stable hash of the model + a JSON-serializable request summary"""
+        canonical = json.dumps({'model': model, 'payload': payload}, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Cached response or None (for callers that stream instead of using get_or_call)"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        metrics.incr(f'{self.name}.latency_saved_seconds', entry['latency'])
+        return entry['value']
+
+    def put(self, key, value, latency):
+        metrics.observe(f'{self.name}.upstream_seconds', latency)
+        self._cache.set(key, {'value': value, 'latency': latency})
+
+    async def get_or_call(self, key, call):
+        """Return the cached response for key, or await call() once and cache its result"""
+        entry = self._cache.get(key)
+        if entry is not None:
+            metrics.incr(f'{self.name}.latency_saved_seconds', entry['latency'])
+            return entry['value']
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            metrics.incr(f'{self.name}.coalesced')
+            entry = await asyncio.shield(in_flight)
+            metrics.incr(f'{self.name}.latency_saved_seconds', entry['latency'])
+            return entry['value']
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            start = time.perf_counter()
+            value = await call()
+            entry = {'value': value, 'latency': time.perf_counter() - start}
+            metrics.observe(f'{self.name}.upstream_seconds', entry['latency'])
+            self._cache.set(key, entry)
+            future.set_result(entry)
+            return value
+        except asyncio.CancelledError:
+            # The leader's client went away - waiters get an ordinary error so
+            # their fallbacks run, instead of a CancelledError that skips them
+            future.set_exception(LLMUnavailableError("Coalesced LLM call was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting on it - don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def stats(self):
+        counters = metrics.snapshot()['counters']
+        return {
+            **self._cache.stats(),
+            'coalesced': counters.get(f'{self.name}.coalesced', 0),
+            'in_flight': len(self._in_flight),
+            'latency_saved_seconds': round(counters.get(f'{self.name}.latency_saved_seconds', 0), 3),
+        }
@@ -0,0 +1,263 @@
+"""
+Normalized registry of BC locations and clubs
+
+Free-text locations / club names are resolved to a canonical id once, with a
+single compiled regex over every alias (longest alias wins), and the result
+is memoized. Everything that scores a location or club then does O(1) table
+lookups by id instead of scanning a list of substrings per event.
+
+create_event stores the resolved `location_id` / `club_id` on the event.
+
+Matching is on word boundaries and shared by every score table, so short
+forms now resolve everywhere: "Walsh" or "mods" get the Walsh Hall / The
+Mods popularity score (the old popularity scan only knew 'walsh hall' /
+'the mods' and gave them 0.5), and the Mods one-hot feature no longer needs
+a capital M. Full names score exactly as before (tests/test_campus_registry.py).
+
+Run `python campus_registry.py` to benchmark against the old per-event scans.
+"""
+import re
+from functools import lru_cache
+
+# id -> display name, aliases (matched case-insensitively on word boundaries)
+LOCATIONS = {
+    'gabelli': ('Gabelli Hall', ['gabelli hall', 'gabelli']),
+    'stayer': ('Stayer Hall', ['stayer hall', 'stayer']),
+    'ninety_stm': ('90 St. Thomas More', ['90 st. thomas more', '90 st thomas more', '90 st']),
+    'walsh': ('Walsh Hall', ['walsh hall', 'walsh']),
+    'ignacio': ('Ignacio Hall', ['ignacio hall', 'ignacio']),
+    'mods': ('The Mods', ['the mods', 'mods']),
+    'rubenstein': ('Rubenstein Hall', ['rubenstein hall', 'rubenstein']),
+    'voute': ('Voute Hall', ['voute hall', 'voute']),
+    'welch': ('Welch Hall', ['welch hall', 'welch']),
+    'roncalli': ('Roncalli Hall', ['roncalli hall', 'roncalli']),
+    'kostka': ('Kostka Hall', ['kostka hall', 'kostka']),
+    'claver': ('Claver Hall', ['claver hall', 'claver']),
+    'xavier': ('Xavier Hall', ['xavier hall', 'xavier']),
+    'loyola': ('Loyola Hall', ['loyola hall', 'loyola']),
+    'fenwick': ('Fenwick Hall', ['fenwick hall', 'fenwick']),
+    'cheverus': ('Cheverus Hall', ['cheverus hall', 'cheverus']),
+    'thomas_more_apts': ('Thomas More Apartments', ['thomas more apartments']),
+}
+
+CLUBS = {
+    'student_government': ('Student Government', ['student government']),
+    'asian_caucus': ('Asian Caucus', ['asian caucus']),
+    'acapella': ('Acapella', ['acapella']),
+    'comedy_club': ('Comedy Club', ['comedy club']),
+    'bc_bop': ('BC Bop', ['bc bop']),
+    'sexual_chocolate': ('Sexual Chocolate', ['sexual chocolate']),
+    'fists': ('FISTS', ['fists']),
+    'fuego': ('Fuego', ['fuego']),
+    'bccss': ('BCCSS', ['bccss']),
+    'aso': ('ASO', ['aso']),
+    'chess_club': ('Chess Club', ['chess club']),
+    'vip': ('VIP', ['vip']),
+    'investment_club': ('Investment Club', ['investment club']),
+    'theater_club': ('Theater Club', ['theater club', 'theatre club']),
+    'heights_men': ('Heights Men', ['heights men']),
+    'model_un': ('Model United Nations', ['model united nations', 'model un']),
+}
+
+# Location popularity/accessibility (calculate_location_score), default 0.5
+LOCATION_POPULARITY_SCORES = {
+    'gabelli': 0.9,
+    'stayer': 0.85,
+    'ninety_stm': 0.8,
+    'walsh': 0.85,
+    'ignacio': 0.75,
+    'mods': 0.7,
+    'rubenstein': 0.75,
+    'voute': 0.7,
+    'welch': 0.65,
+    'roncalli': 0.65,
+}
+
+# Ranked BC preferences (get_location_score), default 0.5
+LOCATION_PREFERENCE_SCORES = {
+    'mods': 1.0,
+    'ignacio': 1.0,
+    'rubenstein': 1.0,
+    'gabelli': 0.85,
+    'stayer': 0.85,
+    'ninety_stm': 0.85,
+    'walsh': 0.7,
+    'roncalli': 0.7,
+    'kostka': 0.7,
+}
+
+# Locations with their own one-hot model feature, in extract_features order
+FEATURE_LOCATIONS = ['gabelli', 'stayer', 'ignacio', 'mods']
+_ONE_HOT = {
+    location_id: tuple(1.0 if i == j else 0.0 for j in range(len(FEATURE_LOCATIONS)))
+    for i, location_id in enumerate(FEATURE_LOCATIONS)
+}
+_NO_FEATURE_LOCATION = (0.0,) * len(FEATURE_LOCATIONS)
+
+# Popular clubs (calculate_club_affiliation_score), default 0.7 for other clubs
+CLUB_SCORES = {
+    'student_government': 0.9,
+    'asian_caucus': 0.85,
+    'acapella': 0.85,
+    'comedy_club': 0.8,
+}
+
+
+def _compile_matcher(registry):
+    """One case-insensitive alternation of every alias, longest first"""
+    alias_to_id = {}
+    for entry_id, (_, aliases) in registry.items():
+        for alias in aliases:
+            alias_to_id[alias.lower()] = entry_id
+    alternation = '|'.join(re.escape(alias) for alias in sorted(alias_to_id, key=len, reverse=True))
+    pattern = re.compile(rf'(?<![a-z0-9])(?:{alternation})(?![a-z0-9])', re.IGNORECASE)
+    return pattern, alias_to_id
+
+
+_LOCATION_PATTERN, _LOCATION_ALIASES = _compile_matcher(LOCATIONS)
+_CLUB_PATTERN, _CLUB_ALIASES = _compile_matcher(CLUBS)
+
+
+@lru_cache(maxsize=4096)
+def resolve_location(location):
+    """Canonical location id for free text, or None if it's not a known place"""
+    if not location:
+        return None
+    match = _LOCATION_PATTERN.search(location)
+    return _LOCATION_ALIASES[match.group(0).lower()] if match else None
+
+
+@lru_cache(maxsize=4096)
+def resolve_club(club_name):
+    """Canonical club id for free text, or None if it's not a known club"""
+    if not club_name:
+        return None
+    match = _CLUB_PATTERN.search(club_name)
+    return _CLUB_ALIASES[match.group(0).lower()] if match else None
+
+
+def event_location_id(event):
+    """Stored location_id if the event has one, otherwise resolve its location text"""
+    return event.get('location_id') or resolve_location(event.get('location') or '')
+
+
+def event_club_id(event):
+    return event.get('club_id') or resolve_club(event.get('club_name') or '')
+
+
+def location_popularity_score(location_id):
+    return LOCATION_POPULARITY_SCORES.get(location_id, 0.5)
+
+
+def location_preference_score(location_id):
+    return LOCATION_PREFERENCE_SCORES.get(location_id, 0.5)
+
+
+def location_one_hot(location_id):
+    return _ONE_HOT.get(location_id, _NO_FEATURE_LOCATION)
+
+
+def club_score(club_id):
+    return CLUB_SCORES.get(club_id, 0.7)
+
+
+# ---- Benchmark: registry lookups vs the previous per-event substring scans ----
+
+def _legacy_calculate_location_score(location):
+    popular_locations = {
+        'gabelli hall': 0.9, 'stayer hall': 0.85, '90 st. thomas more': 0.8, 'walsh hall': 0.85,
+        'ignacio hall': 0.75, 'the mods': 0.7, 'rubenstein hall': 0.75, 'voute hall': 0.7,
+        'welch hall': 0.65, 'roncalli hall': 0.65,
+    }
+    location_lower = location.lower()
+    for key, score in popular_locations.items():
+        if key in location_lower:
+            return score
+    return 0.5
+
+
+def _legacy_get_location_score(event):
+    location = event.get('location', '').lower()
+    if any(loc in location for loc in ['mods', 'ignacio', 'rubenstein']):
+        return 1.0
+    elif any(loc in location for loc in ['gabelli', 'stayer', '90 st']):
+        return 0.85
+    elif any(loc in location for loc in ['walsh', 'roncalli', 'kostka']):
+        return 0.7
+    return 0.5
+
+
+def _legacy_club_score(club_name):
+    popular_clubs = {'student government': 0.9, 'asian caucus': 0.85, 'acapella': 0.85, 'comedy club': 0.8}
+    if club_name:
+        club_lower = club_name.lower()
+        for key, score in popular_clubs.items():
+            if key in club_lower:
+                return score
+    return 0.7
+
+
+def _legacy_one_hot(event):
+    location = event.get('location', '')
+    return ('Gabelli' in location, 'Stayer' in location, 'Ignacio' in location, 'Mods' in location)
+
+
+if __name__ == "__main__":
+    import time
+
+    from event_features import generate_historical_event_data
+
+    events = generate_historical_event_data(num_events=100_000, seed=7)
+
+    def legacy():
+        for event in events:
+            _legacy_calculate_location_score(event['location'])
+            _legacy_get_location_score(event)
+            _legacy_club_score(event['club_name'])
+            _legacy_one_hot(event)
+
+    def registry_resolving():
+        for event in events:
+            location_id = event_location_id(event)
+            location_popularity_score(location_id)
+            location_preference_score(location_id)
+            club_score(event_club_id(event))
+            location_one_hot(location_id)
+
+    # What scoring paths see for events created after this change
+    stored = [
+        {**event, 'location_id': resolve_location(event['location']), 'club_id': resolve_club(event['club_name'])}
+        for event in events
+    ]
+
+    def registry_stored():
+        for event in stored:
+            location_id = event['location_id']
+            location_popularity_score(location_id)
+            location_preference_score(location_id)
+            club_score(event['club_id'])
+            location_one_hot(location_id)
+
+    print(f"Scoring location + club for {len(events):,} events:")
+    for name, fn in [('legacy substring scans', legacy),
+                     ('registry (resolve + memo)', registry_resolving),
+                     ('registry (stored ids)', registry_stored)]:
+        resolve_location.cache_clear()
+        resolve_club.cache_clear()
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<28}{elapsed * 1000:>9.1f} ms  ({elapsed / len(events) * 1e6:.2f} us/event)")
+
+    # Cold resolution cost for unique free text (no memo hits)
+    unique = [f"{event['location']} room {i}" for i, event in enumerate(events)]
+    start = time.perf_counter()
+    for text in unique:
+        _LOCATION_PATTERN.search(text)
+    compiled = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in unique:
+        _legacy_calculate_location_score(text)
+    scanned = time.perf_counter() - start
+    print(f"\nUnique free-text locations: compiled matcher {compiled * 1000:.1f} ms, "
+          f"legacy dict scan {scanned * 1000:.1f} ms")
@@ -0,0 +1,132 @@
+"""
+Flat NumPy export of a fitted RandomForestRegressor for low-latency inference
+
+All trees are packed into one set of node arrays (feature, threshold, left,
+right, value). Leaves point to themselves, so traversal is a fixed number of
+vectorized steps (the forest's max depth) over an (n_rows, n_trees) matrix of
+node ids - no per-tree Python loop, no joblib dispatch, no input validation.
+
+Run `python compiled_forest.py` for a latency benchmark against sklearn.
+"""
+import numpy as np
+
+
+class CompiledForest:
+    """Vectorized forest traversal over flat node arrays (optionally with the scaler folded in)"""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, mean=None, scale=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_sklearn(cls, forest, scaler=None):
+        """Export a fitted RandomForestRegressor (and the StandardScaler in front of it)"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            # Leaves loop back to themselves so extra traversal steps are no-ops
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        mean = scale = None
+        if scaler is not None:
+            mean = np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else None
+            scale = np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else None
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            mean=mean,
+            scale=scale,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """Predict for raw feature rows (2D array). Matches scaler.transform + forest.predict."""
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        # sklearn compares float32 inputs against float64 thresholds - do the same
+        X = X.astype(np.float32)
+
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return self.value[nodes].mean(axis=1)
+
+
+def _latency_percentiles(fn, repeats):
+    import time
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1000
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+
+if __name__ == "__main__":
+    from goated_model import build_training_set
+    from predictors import RandomForestPredictor
+
+    X, y, _ = build_training_set(np.empty((0, 0)), np.empty(0), num_events=2000)
+    predictor = RandomForestPredictor().fit(X, y)
+    model, scaler = predictor.model, predictor.scaler
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    expected = model.predict(scaler.transform(X))
+    actual = compiled.predict(X)
+    print(f"Trees: {compiled.n_trees}, nodes: {len(compiled.value)}, max depth: {compiled.max_depth}")
+    print(f"Max |compiled - sklearn| over {len(X)} rows: {np.max(np.abs(expected - actual)):.2e}")
+
+    single = X[:1]
+    batch = X[:500]
+    cases = [
+        ('single row', single, 500),
+        ('batch of 500', batch, 50),
+    ]
+    print(f"\n{'case':<14}{'backend':<10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, rows, repeats in cases:
+        sk = _latency_percentiles(lambda: model.predict(scaler.transform(rows)), repeats)
+        np_ = _latency_percentiles(lambda: compiled.predict(rows), repeats)
+        print(f"{name:<14}{'sklearn':<10}{sk[0]:>10.3f}{sk[1]:>10.3f}")
+        print(f"{name:<14}{'compiled':<10}{np_[0]:>10.3f}{np_[1]:>10.3f}")
@@ -0,0 +1,94 @@
+"""
+Cursor-based paging over Firestore queries
+
+Uses start_after(last_snapshot) instead of offset(), so every page costs only
+the documents it returns no matter how deep into the collection we are.
+
+API pages hand clients an opaque cursor token instead of a snapshot: the
+last document's order_by values plus its id, base64-encoded JSON. The query
+must be ordered by those fields and then by __name__, so the token pins an
+exact position even when several documents share a value.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class InvalidCursorError(ValueError):
+    """Cursor token that wasn't produced by encode_cursor for this query"""
+
+
+def iter_query_pages(query, page_size=500, start_after=None):
+    """
+    Yield lists of DocumentSnapshots, page_size at a time
+
+    `query` must already be ordered (order_by). `start_after` may be a
+    DocumentSnapshot or a dict of the order_by field values to resume from.
+    """
+    cursor = start_after
+    while True:
+        page_query = query.limit(page_size)
+        if cursor is not None:
+            page_query = page_query.start_after(cursor)
+
+        docs = list(page_query.stream())
+        if not docs:
+            return
+
+        yield docs
+
+        if len(docs) < page_size:
+            return
+        cursor = docs[-1]
+
+
+def iter_query_documents(query, page_size=500, start_after=None):
+    """Flatten iter_query_pages into one document at a time"""
+    for page in iter_query_pages(query, page_size=page_size, start_after=start_after):
+        yield from page
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'ts': value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['ts'])
+    return value
+
+
+def encode_cursor(snapshot, fields):
+    """Opaque token for resuming after snapshot in a query ordered by fields + __name__"""
+    data = snapshot.to_dict() or {}
+    values = [_encode_value(data.get(field)) for field in fields] + [snapshot.id]
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token, fields):
+    """A start_after() dict for the query encode_cursor's token came from"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(fields) + 1 or not isinstance(values[-1], str):
+            raise ValueError(token)
+        cursor = {field: _decode_value(value) for field, value in zip(fields, values)}
+    except (ValueError, KeyError, TypeError, UnicodeError, binascii.Error):
+        raise InvalidCursorError(token)
+    cursor['__name__'] = values[-1]
+    return cursor
+
+
+def fetch_page(query, fields, limit, cursor=None):
+    """
+    One page of a query ordered by fields + __name__ -> (snapshots, next cursor token or None)
+    Reads one document past the page to know whether there is a next one
+    """
+    if cursor:
+        query = query.start_after(decode_cursor(cursor, fields))
+    docs = list(query.limit(limit + 1).stream())
+    if len(docs) <= limit:
+        return docs, None
+    return docs[:limit], encode_cursor(docs[limit - 1], fields)
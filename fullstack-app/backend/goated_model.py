@@ -0,0 +1,376 @@
+"""
+Goated event prediction model: training and the immutable model bundle that
+the API serves from
+
+Training runs in a separate process (see TrainingService) so a retrain never
+blocks the serving worker. The fitted predictor (model + scaler) is published as
+one ModelBundle and swapped in with a single reference assignment, so a request
+always sees a matching pair.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from event_features import FEATURE_NAMES, extract_features, generate_historical_event_data
+from metrics import metrics
+from predictors import GoatedPredictor, make_predictor
+
+
+# Below this many real historical events, pad the training set with synthetic ones
+MIN_REAL_EVENTS = 200
+# Fixed seed + anchor date so the synthetic padding is identical on every run
+SYNTHETIC_SEED = 42
+SYNTHETIC_ANCHOR = datetime(2025, 1, 1)
+# Predictor backend used for training (see predictors.PREDICTOR_BACKENDS)
+DEFAULT_BACKEND = os.getenv('GOATED_MODEL_BACKEND', 'random_forest')
+
+
+def build_training_set(X_real, y_real, num_events=500):
+    """
+    Training rows from real historical events, padded with synthetic events
+    only when there are fewer than MIN_REAL_EVENTS real ones
+
+    Returns (X, y, data_source)
+    """
+    X_real = np.asarray(X_real, dtype=float).reshape(-1, len(FEATURE_NAMES))
+    y_real = np.asarray(y_real, dtype=float)
+    if len(X_real) >= MIN_REAL_EVENTS:
+        return X_real, y_real, 'historical'
+
+    synthetic = generate_historical_event_data(
+        num_events=max(num_events - len(X_real), 0),
+        seed=SYNTHETIC_SEED,
+        now=SYNTHETIC_ANCHOR
+    )
+    X_synth = np.array([extract_features(event) for event in synthetic]).reshape(-1, len(FEATURE_NAMES))
+    y_synth = np.array([event.get('rsvp_count', 0) for event in synthetic], dtype=float)
+
+    data_source = 'mixed' if len(X_real) else 'synthetic'
+    return np.vstack([X_real, X_synth]), np.concatenate([y_real, y_synth]), data_source
+
+
+def _split_holdout(n_rows, holdout_fraction, random_state):
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(n_rows)
+    holdout_size = max(1, int(n_rows * holdout_fraction))
+    return order[holdout_size:], order[:holdout_size]
+
+
+def _evaluate(predictor, X, y, train_idx, holdout_idx):
+    holdout_pred = predictor.predict(X[holdout_idx])
+    holdout_mae = float(np.mean(np.abs(holdout_pred - y[holdout_idx])))
+    # MAE of always predicting the training mean - a candidate must beat this
+    baseline_mae = float(np.mean(np.abs(y[train_idx].mean() - y[holdout_idx])))
+    return holdout_mae, baseline_mae
+
+
+def _training_result(predictor, X, y, train_idx, holdout_idx, start, incremental):
+    holdout_mae, baseline_mae = _evaluate(predictor, X, y, train_idx, holdout_idx)
+    return {
+        'predictor': predictor,
+        'holdout_X': X[holdout_idx],
+        'holdout_y': y[holdout_idx],
+        'holdout_mae': holdout_mae,
+        'baseline_mae': baseline_mae,
+        'train_size': int(len(train_idx)),
+        'training_seconds': time.perf_counter() - start,
+        'incremental': incremental,
+    }
+
+
+def train_goated_model(X, y, backend=DEFAULT_BACKEND, holdout_fraction=0.2, random_state=42):
+    """
+    Fit a predictor backend from scratch and score a holdout split
+
+    Runs inside the training process pool, so it must stay a top-level function
+    that only depends on importable modules. Returns a plain dict (picklable).
+    """
+    start = time.perf_counter()
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # Hold out a slice of the data to validate the candidate before publishing
+    train_idx, holdout_idx = _split_holdout(len(X), holdout_fraction, random_state)
+
+    predictor = make_predictor(backend)
+    predictor.fit(X[train_idx], y[train_idx])
+
+    return _training_result(predictor, X, y, train_idx, holdout_idx, start, incremental=False)
+
+
+def update_goated_model(predictor, X_new, y_new, holdout_fraction=0.2, random_state=42):
+    """
+    Incrementally retrain on new rows only (see predictor.update)
+
+    `predictor` is the worker's own unpickled copy of the live one, so updating
+    it in place never touches the bundle being served.
+    """
+    start = time.perf_counter()
+    X_new = np.asarray(X_new, dtype=float)
+    y_new = np.asarray(y_new, dtype=float)
+
+    train_idx, holdout_idx = _split_holdout(len(X_new), holdout_fraction, random_state)
+    predictor.update(X_new[train_idx], y_new[train_idx], random_state=random_state)
+
+    return _training_result(predictor, X_new, y_new, train_idx, holdout_idx, start, incremental=True)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    A fitted predictor (model + its scaler, fitted together) and its serving
+    metadata. Never mutated after publish.
+    """
+    version: str
+    predictor: GoatedPredictor
+    trained_at: str
+    training_seconds: float
+    holdout_mae: float
+    train_size: int
+    # How many feature store rows this model has seen, and where its data came from
+    trained_rows: int = 0
+    data_source: str = 'synthetic'
+    # Fast serving export of the predictor, e.g. a CompiledForest (None = predictor.predict)
+    compiled: object = None
+
+    @property
+    def backend(self):
+        return self.predictor.name
+
+    def predict(self, X):
+        """Predict RSVP counts for a 2D array of raw (unscaled) feature rows"""
+        if self.compiled is not None:
+            return self.compiled.predict(X)
+        return self.predictor.predict(X)
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'backend': self.backend,
+            'trained_at': self.trained_at,
+            'training_seconds': round(self.training_seconds, 3),
+            'holdout_mae': round(self.holdout_mae, 3),
+            'train_size': self.train_size,
+            'trained_rows': self.trained_rows,
+            'data_source': self.data_source,
+            'compiled': self.compiled is not None,
+        }
+
+
+class ModelRegistry:
+    """
+    Holds the bundle currently being served plus a short history for rollback
+
+    Readers call current() once per request and use that bundle throughout;
+    publishing replaces the reference in one assignment, so there is no window
+    where a reader can see a new model with an old scaler.
+    """
+
+    def __init__(self, history_size=5):
+        self._current = None
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def current(self):
+        return self._current
+
+    def add_listener(self, callback):
+        """Call callback(bundle) after every publish/rollback (e.g. to re-score stored events)"""
+        self._listeners.append(callback)
+
+    def _notify(self, bundle):
+        for callback in self._listeners:
+            try:
+                callback(bundle)
+            except Exception as e:
+                print(f"⚠️ Model swap listener failed: {e}")
+
+    def publish(self, bundle):
+        with metrics.timer('model.swap_seconds'):
+            with self._lock:
+                if self._current is not None:
+                    self._history.append(self._current)
+                self._current = bundle
+        metrics.incr('model.swaps')
+        metrics.gauge('model.version', bundle.version)
+        print(f"🔁 Serving goated model {bundle.version} (holdout MAE {bundle.holdout_mae:.2f})")
+        self._notify(bundle)
+        return bundle
+
+    def rollback(self):
+        """Swap back to the previously served bundle. Returns it, or None if there is none."""
+        with metrics.timer('model.swap_seconds'):
+            with self._lock:
+                if not self._history:
+                    return None
+                self._current = self._history.pop()
+                bundle = self._current
+        metrics.incr('model.rollbacks')
+        metrics.gauge('model.version', bundle.version)
+        print(f"⏪ Rolled back goated model to {bundle.version}")
+        self._notify(bundle)
+        return bundle
+
+    def history(self):
+        return [bundle.describe() for bundle in reversed(self._history)]
+
+
+class ModelValidationError(Exception):
+    """Raised when a freshly trained candidate is not good enough to serve"""
+
+
+class TrainingService:
+    """
+    Trains candidate models in a process pool, validates them on a holdout set
+    and publishes them to the registry
+
+    Training data comes from the feature store (real historical events). When
+    the live model was trained on real data and new rows have arrived since,
+    only the new rows are used (incremental update); otherwise it's a full fit.
+    """
+
+    def __init__(self, registry, store=None, backend=DEFAULT_BACKEND, max_regression=0.10,
+                 mae_slack=1.0, min_incremental_rows=20):
+        self.registry = registry
+        self.store = store
+        self.backend = backend
+        # A candidate may be at most this much worse than the live model:
+        # max_regression relative MAE, but never stricter than mae_slack RSVPs
+        self.max_regression = max_regression
+        self.mae_slack = mae_slack
+        # Don't bother growing the forest for just a handful of new events
+        self.min_incremental_rows = min_incremental_rows
+        self._executor = None
+        self._train_lock = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn: never fork a process that holds gRPC/Firestore threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def _plan(self, full=False, backend=None):
+        """
+        Decide what the next training run should do
+
+        Returns (train_fn, args, trained_rows, data_source), or None when the
+        live model has already seen everything in the store.
+        """
+        backend = backend or self.backend
+        live = self.registry.current()
+        rows = self.store.rows if self.store is not None else 0
+
+        # Switching backends always means a full fit
+        if not full and live is not None and live.backend == backend:
+            new_rows = rows - live.trained_rows
+            if (live.data_source == 'historical' and rows >= MIN_REAL_EVENTS
+                    and live.predictor.supports_incremental):
+                if new_rows < self.min_incremental_rows:
+                    return None
+                X_new, y_new = self.store.read(start_row=live.trained_rows)
+                return update_goated_model, (live.predictor, X_new, y_new), rows, 'historical'
+            if new_rows <= 0:
+                return None
+
+        if self.store is not None:
+            X_real, y_real = self.store.read()
+        else:
+            X_real, y_real = np.empty((0, len(FEATURE_NAMES))), np.empty(0)
+        X, y, data_source = build_training_set(X_real, y_real)
+        return train_goated_model, (X, y, backend), rows, data_source
+
+    async def retrain(self, full=False, backend=None):
+        """
+        Train off the event loop, validate, then hot swap
+
+        `backend` overrides the service's predictor backend for this run.
+        Returns the published bundle, or None if there was nothing new to train on.
+        """
+        if self._train_lock is None:
+            self._train_lock = asyncio.Lock()
+
+        # One training run at a time; concurrent callers wait for their turn
+        async with self._train_lock:
+            # Planning reads the whole feature file from disk - keep it off the loop too
+            plan = await asyncio.to_thread(self._plan, full, backend)
+            if plan is None:
+                print("✅ Goated model is up to date with historical events")
+                return None
+
+            train_fn, args, trained_rows, data_source = plan
+            kind = 'incremental' if train_fn is update_goated_model else 'full'
+            print(f"🎓 Training Goated Event Prediction Model ({kind}, {data_source} data, background process)...")
+            metrics.incr('model.training_runs')
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(self._get_executor(), train_fn, *args)
+            except Exception:
+                metrics.incr('model.training_failures')
+                raise
+            return self._validate_and_publish(result, trained_rows, data_source)
+
+    def _validate_and_publish(self, result, trained_rows, data_source):
+        metrics.observe('model.training_seconds', result['training_seconds'])
+        candidate_mae = result['holdout_mae']
+
+        if not np.isfinite(candidate_mae) or candidate_mae >= result['baseline_mae']:
+            metrics.incr('model.rejected')
+            raise ModelValidationError(
+                f"Candidate holdout MAE {candidate_mae:.2f} does not beat the "
+                f"mean baseline ({result['baseline_mae']:.2f})"
+            )
+
+        live = self.registry.current()
+        if live is not None:
+            live_pred = live.predict(result['holdout_X'])
+            live_mae = float(np.mean(np.abs(live_pred - result['holdout_y'])))
+            allowed_mae = max(live_mae * (1 + self.max_regression), live_mae + self.mae_slack)
+            if candidate_mae > allowed_mae:
+                metrics.incr('model.rejected')
+                raise ModelValidationError(
+                    f"Candidate holdout MAE {candidate_mae:.2f} is worse than the "
+                    f"live model {live.version} ({live_mae:.2f})"
+                )
+
+        predictor = result['predictor']
+        compiled = predictor.compile()
+        if compiled is not None:
+            reference = predictor.predict(result['holdout_X'])
+            if not np.allclose(compiled.predict(result['holdout_X']), reference):
+                # Should never happen, but never serve a mismatching export
+                print(f"⚠️ Compiled {predictor.name} disagrees with the reference predictor, not using it")
+                metrics.incr('model.compile_mismatches')
+                compiled = None
+
+        bundle = ModelBundle(
+            version=f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}",
+            predictor=predictor,
+            trained_at=datetime.utcnow().isoformat(),
+            training_seconds=result['training_seconds'],
+            holdout_mae=candidate_mae,
+            train_size=result['train_size'],
+            trained_rows=trained_rows,
+            data_source=data_source,
+            compiled=compiled,
+        )
+        metrics.incr('model.incremental_updates' if result['incremental'] else 'model.full_fits')
+        print(f"✅ {predictor.name} model trained on {result['train_size']} {data_source} events in {result['training_seconds']:.2f}s")
+        return self.registry.publish(bundle)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,165 @@
+"""
+Cursor-paged reads of the historical_events archive
+
+Pages are ordered by (date DESC, document id DESC) and resumed with
+start_after() from an opaque firestore_paging cursor token, never offset():
+Firestore reads - and bills - every document an offset skips, so page 100
+of an offset query costs 100 pages of reads, while a cursor page costs only
+the documents it returns. The list view also projects to
+HISTORICAL_LIST_FIELDS, leaving the attendee and rating arrays behind.
+
+Run `python historical_events.py` against the Firestore emulator
+(FIRESTORE_EMULATOR_HOST) or the service account to compare page-100
+latency and document reads for offset vs cursor paging.
+"""
+from firebase_admin import firestore
+
+from firestore_paging import fetch_page
+
+HISTORICAL_COLLECTION = 'historical_events'
+HISTORICAL_ORDER_FIELDS = ['date']
+MAX_PAGE_SIZE = 100
+
+# What the history list shows; ?fields=all returns whole documents
+HISTORICAL_LIST_FIELDS = [
+    'function_name', 'date', 'location', 'emoji_vibe', 'organizer_alias', 'organizer_user_id',
+    'club_affiliated', 'club_name', 'public_or_private', 'rsvp_count', 'max_capacity',
+    'average_rating', 'total_ratings', 'rating_finalized', 'status', 'original_event_id',
+    'invitation_image', 'invitation_images',
+]
+
+
+def parse_fields(fields):
+    """?fields= value -> field paths to select, or None for whole documents"""
+    if fields is None:
+        return list(HISTORICAL_LIST_FIELDS)
+    if fields.strip() == 'all':
+        return None
+    selected = [field.strip() for field in fields.split(',') if field.strip()]
+    # The cursor token needs the order_by value
+    for field in HISTORICAL_ORDER_FIELDS:
+        if field not in selected:
+            selected.append(field)
+    return selected
+
+
+def historical_query(db, fields=None, collection=HISTORICAL_COLLECTION):
+    """historical_events, most recent first, ties broken by document id"""
+    query = (db.collection(collection)
+             .order_by('date', direction=firestore.Query.DESCENDING)
+             .order_by('__name__', direction=firestore.Query.DESCENDING))
+    if fields is not None:
+        query = query.select(fields)
+    return query
+
+
+def list_historical_events(db, limit=50, cursor=None, fields=None, collection=HISTORICAL_COLLECTION):
+    """One page of historical events -> (events, next cursor token or None) (blocking)"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    docs, next_cursor = fetch_page(historical_query(db, fields, collection), HISTORICAL_ORDER_FIELDS, limit, cursor)
+
+    events = []
+    for doc in docs:
+        event_data = doc.to_dict()
+        event_data['event_id'] = doc.id
+        event_data['original_event_id'] = event_data.get('original_event_id', doc.id)
+        events.append(event_data)
+    return events, next_cursor
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import random
+    import statistics
+    import time
+    from datetime import datetime, timedelta
+
+    from firestore_paging import encode_cursor, iter_query_pages
+
+    parser = argparse.ArgumentParser(description="Page-N latency and reads: offset vs cursor")
+    parser.add_argument('--collection', default='historical_events_benchmark',
+                        help="Seeded with synthetic events if it holds too few")
+    parser.add_argument('--page', type=int, default=100)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    if os.getenv('FIRESTORE_EMULATOR_HOST'):
+        from google.auth.credentials import AnonymousCredentials
+        from google.cloud.firestore import Client
+        db = Client(project=os.getenv('GCLOUD_PROJECT', 'bcplubhub'), credentials=AnonymousCredentials())
+    else:
+        import firebase_admin
+        from firebase_admin import credentials
+        firebase_admin.initialize_app(credentials.Certificate("bcplubhub-service-account.json"))
+        db = firestore.client()
+
+    needed = args.page * args.page_size
+    collection = db.collection(args.collection)
+    existing = sum(len(page) for page in iter_query_pages(collection.order_by('__name__').select([])))
+    if existing < needed:
+        print(f"Seeding {needed - existing} synthetic events into {args.collection}...")
+        rng = random.Random(7)
+        start = datetime(2023, 1, 1)
+        batch, pending = db.batch(), 0
+        for i in range(existing, needed):
+            date = start + timedelta(hours=rng.randrange(24 * 900))
+            batch.set(collection.document(), {
+                'function_name': f'Function {i}', 'date': date.isoformat(), 'location': 'The Mods',
+                'emoji_vibe': ['🎉', '🔥'], 'organizer_alias': 'Neon Wolf', 'rsvp_count': rng.randrange(80),
+                'max_capacity': 100, 'status': 'completed', 'average_rating': round(rng.uniform(1, 5), 1),
+                'attendees': [{'user_id': f'u{j}', 'user_alias': f'Alias {j}'} for j in range(40)],
+                'ratings': [{'user_id': f'u{j}', 'rating': rng.randrange(1, 6)} for j in range(30)],
+            })
+            pending += 1
+            if pending == 400:
+                batch.commit()
+                batch, pending = db.batch(), 0
+        if pending:
+            batch.commit()
+
+    fields = parse_fields(None)
+    query = historical_query(db, fields, args.collection)
+
+    # The cursor a client would hold after reading pages 1..page-1
+    last_doc = None
+    for number, page in enumerate(iter_query_pages(query, page_size=args.page_size), start=1):
+        last_doc = page[-1]
+        if number == args.page - 1:
+            break
+    token = encode_cursor(last_doc, HISTORICAL_ORDER_FIELDS)
+
+    def reads(page_query):
+        """Documents Firestore read (and billed) for the query, via Query Explain"""
+        try:
+            from google.cloud.firestore_v1.query_profile import ExplainOptions
+            results = page_query.get(explain_options=ExplainOptions(analyze=True))
+            return results.get_explain_metrics().execution_stats.read_operations
+        except Exception:
+            return None  # Explain isn't available (older client or the emulator)
+
+    offset_query = query.offset((args.page - 1) * args.page_size).limit(args.page_size)
+
+    def by_offset():
+        return list(offset_query.stream())
+
+    def by_cursor():
+        return list_historical_events(db, args.page_size, token, fields, args.collection)[0]
+
+    assert [doc.id for doc in by_offset()] == [event['event_id'] for event in by_cursor()]
+
+    print(f"Page {args.page} of {args.page_size} from {args.collection}, median of {args.runs} runs")
+    print(f"{'paging':<10}{'p50 ms':>10}{'max ms':>10}{'reads':>8}")
+    for label, fetch, page_query in [
+        ('offset', by_offset, offset_query),
+        ('cursor', by_cursor, query.start_after(last_doc).limit(args.page_size + 1)),
+    ]:
+        timings = []
+        for _ in range(args.runs):
+            start_time = time.perf_counter()
+            fetch()
+            timings.append(time.perf_counter() - start_time)
+        read_count = reads(page_query)
+        print(f"{label:<10}{statistics.median(timings) * 1000:>10.1f}{max(timings) * 1000:>10.1f}"
+              f"{read_count if read_count is not None else 'n/a':>8}")
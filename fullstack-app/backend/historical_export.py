@@ -0,0 +1,198 @@
+"""
+Streaming NDJSON / CSV export of historical_events (and their ratings)
+
+Walks the archive in cursor pages (firestore_paging) and turns each page
+into one text chunk as it arrives, so memory stays at about one page
+however many events are exported. GET /api/events/historical/export
+streams the chunks through a StreamingResponse; the CLI writes them to a
+file or stdout:
+
+    python historical_export.py --format csv --fields function_name,date,rsvp_count -o events.csv
+
+Nested values (emoji_vibe, ratings, ...) are JSON-encoded in CSV cells.
+Throughput is reported as exports.rows / exports.seconds metrics and, for
+the CLI, on stderr.
+"""
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+from firestore_paging import iter_query_pages
+from historical_events import HISTORICAL_COLLECTION, HISTORICAL_LIST_FIELDS, historical_query
+from metrics import metrics
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_FIELDS = HISTORICAL_LIST_FIELDS + ['ratings', 'moved_to_historical_at']
+EXPORT_PAGE_SIZE = 500
+
+
+class ExportFieldsError(ValueError):
+    pass
+
+
+def export_fields(fields, fmt):
+    """?fields= value -> field paths to export, or None for whole documents (NDJSON only)"""
+    if fields is None:
+        return list(EXPORT_FIELDS)
+    if fields.strip() == 'all':
+        if fmt == 'csv':
+            raise ExportFieldsError("CSV export needs an explicit field list (its columns are fixed up front)")
+        return None
+    selected = [field.strip() for field in fields.split(',') if field.strip() and field.strip() != 'event_id']
+    if not selected:
+        raise ExportFieldsError("No fields selected")
+    return selected
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportStats:
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.rows} rows, {self.bytes / 1e6:.1f} MB in {self.seconds:.1f}s "
+                f"({self.rows_per_second:,.0f} rows/s)")
+
+
+def iter_event_pages(db, fields, page_size=EXPORT_PAGE_SIZE, limit=None, collection=HISTORICAL_COLLECTION):
+    """Lists of event dicts ({'event_id', **fields}), one per cursor page, most recent first (blocking)"""
+    remaining = limit
+    query = historical_query(db, fields, collection)
+    for page in iter_query_pages(query, page_size=page_size):
+        if remaining is not None:
+            page = page[:remaining]
+            remaining -= len(page)
+        yield [{'event_id': doc.id, **doc.to_dict()} for doc in page]
+        if remaining is not None and remaining <= 0:
+            return
+
+
+def format_chunks(pages, fmt, fields, stats=None):
+    """One text chunk per page of events (CSV starts with its header row)"""
+    stats = stats or ExportStats()
+    columns = ['event_id'] + (fields or [])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def take():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        stats.bytes += len(chunk.encode('utf-8'))
+        return chunk
+
+    try:
+        if fmt == 'csv':
+            writer.writerow(columns)
+            yield take()
+        for events in pages:
+            for event in events:
+                if fmt == 'csv':
+                    writer.writerow([_csv_cell(event.get(column)) for column in columns])
+                else:
+                    row = event if fields is None else {column: event.get(column) for column in columns}
+                    buffer.write(json.dumps(row, default=_json_default, ensure_ascii=False))
+                    buffer.write('\n')
+            stats.rows += len(events)
+            yield take()
+    finally:
+        # Also runs when the client disconnects mid-stream
+        stats.seconds = time.perf_counter() - stats.started
+        metrics.incr('exports.rows', stats.rows)
+        metrics.observe('exports.seconds', stats.seconds)
+
+
+def export_historical_events(db, fmt='ndjson', fields=None, limit=None, page_size=EXPORT_PAGE_SIZE,
+                             stats=None, collection=HISTORICAL_COLLECTION):
+    """Text chunks of the export, produced page by page (blocking generator)"""
+    pages = iter_event_pages(db, fields, page_size=page_size, limit=limit, collection=collection)
+    return format_chunks(pages, fmt, fields, stats)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description="Export historical_events as NDJSON or CSV")
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+    parser.add_argument('--fields', help="Comma-separated fields, or 'all' (NDJSON only); default: "
+                                         + ','.join(EXPORT_FIELDS))
+    parser.add_argument('--limit', type=int, help="Stop after this many events")
+    parser.add_argument('--page-size', type=int, default=EXPORT_PAGE_SIZE)
+    parser.add_argument('--collection', default=HISTORICAL_COLLECTION)
+    parser.add_argument('-o', '--output', help="File to write (default: stdout)")
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help="Format N generated events instead of reading Firestore "
+                             "(throughput / memory check of the formatter)")
+    args = parser.parse_args()
+
+    try:
+        fields = export_fields(args.fields, args.format)
+    except ExportFieldsError as e:
+        parser.error(str(e))
+
+    stats = ExportStats()
+    if args.synthetic:
+        def synthetic_pages():
+            for start in range(0, args.synthetic, args.page_size):
+                yield [{
+                    'event_id': f'evt{i:07d}', 'function_name': f'Function {i}', 'date': '2025-04-12T21:00:00',
+                    'location': 'The Mods', 'emoji_vibe': ['🎉', '🔥'], 'rsvp_count': i % 80,
+                    'average_rating': 4.2, 'ratings': [{'user_id': f'u{j}', 'rating': 4} for j in range(10)],
+                } for i in range(start, min(start + args.page_size, args.synthetic))]
+
+        chunks = format_chunks(synthetic_pages(), args.format, fields, stats)
+    else:
+        if os.getenv('FIRESTORE_EMULATOR_HOST'):
+            from google.auth.credentials import AnonymousCredentials
+            from google.cloud.firestore import Client
+            db = Client(project=os.getenv('GCLOUD_PROJECT', 'bcplubhub'), credentials=AnonymousCredentials())
+        else:
+            import firebase_admin
+            from firebase_admin import credentials, firestore
+            firebase_admin.initialize_app(credentials.Certificate("bcplubhub-service-account.json"))
+            db = firestore.client()
+        chunks = export_historical_events(db, args.format, fields, args.limit, args.page_size, stats,
+                                          args.collection)
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+    print(f"Exported {stats.summary()}", file=sys.stderr)
+    if args.synthetic:
+        import resource
+        print(f"Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB", file=sys.stderr)
@@ -0,0 +1,129 @@
+"""
+Resized, compressed renditions of invite images for cards and previews
+
+Every invite is stored once at full size (PNG) plus one rendition per entry
+in RENDITION_WIDTHS, encoded as WebP (optimized progressive JPEG if this
+Pillow build has no WebP). Renditions are resized and encoded in a shared
+thread pool - Pillow releases the GIL while resampling and encoding, so they
+run in parallel - and uploaded concurrently. Their URLs are stored on events
+as `invitation_images` ({'card': url, 'preview': url, 'full': url}).
+
+Run `python image_derivatives.py` for byte-size and encode-time numbers.
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, features
+
+from metrics import metrics
+from storage_transfer import upload_immutable
+
+RENDITION_WIDTHS = {
+    'card': 360,  # map popups, list cards
+    'preview': 720,  # event pages, goated hero image
+    'full': 1080,  # full-screen / share
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='image-derivatives')
+
+
+def preferred_format():
+    return 'WEBP' if features.check('webp') else 'JPEG'
+
+
+def encode_rendition(img, width, fmt):
+    """Resize (never upscale) and encode one rendition -> (bytes, width, height)"""
+    if img.width > width:
+        height = round(img.height * width / img.width)
+        img = img.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+    buffer = io.BytesIO()
+    if fmt == 'WEBP':
+        img.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue(), img.width, img.height
+
+
+def make_derivatives(image, fmt=None):
+    """
+    All renditions of an encoded image - bytes or a binary file (blocking)
+    Returns {name: {'data', 'content_type', 'extension', 'width', 'height'}}
+    """
+    fmt = fmt or preferred_format()
+    if isinstance(image, (bytes, bytearray)):
+        image = io.BytesIO(image)
+    img = Image.open(image).convert('RGB')
+    img.load()
+
+    with metrics.timer('invites.derivatives_seconds'):
+        futures = {
+            name: _pool.submit(encode_rendition, img, width, fmt)
+            for name, width in RENDITION_WIDTHS.items()
+        }
+        derivatives = {}
+        for name, future in futures.items():
+            data, width, height = future.result()
+            derivatives[name] = {
+                'data': data,
+                'content_type': 'image/webp' if fmt == 'WEBP' else 'image/jpeg',
+                'extension': 'webp' if fmt == 'WEBP' else 'jpg',
+                'width': width,
+                'height': height,
+            }
+    return derivatives
+
+
+def upload_derivatives(bucket, prefix, derivatives):
+    """Upload renditions under prefix, named by content hash -> {name: public url}"""
+    def upload(derivative):
+        return upload_immutable(bucket, prefix, derivative['data'], derivative['content_type'], derivative['extension'])
+
+    futures = {name: _pool.submit(upload, derivative) for name, derivative in derivatives.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+if __name__ == "__main__":
+    import time
+
+    import numpy as np
+
+    from invite_renderer import render_invite_png
+
+    # A photo-like DALL-E stand-in: smooth color fields plus grain (flat gradients flatter every codec)
+    rng = np.random.default_rng(0)
+    low = Image.fromarray(rng.integers(0, 255, (28, 16, 3), dtype=np.uint8), 'RGB').resize((1024, 1792), Image.BICUBIC)
+    grain = rng.normal(0, 6, (1792, 1024, 3))
+    photo = Image.fromarray(np.clip(np.asarray(low) + grain, 0, 255).astype(np.uint8), 'RGB')
+    buffer = io.BytesIO()
+    photo.save(buffer, format='PNG')
+
+    sources = {
+        'DALL-E-like 1024x1792': buffer.getvalue(),
+        'fallback 1080x1920': render_invite_png({
+            'function_name': 'Mods Darty', 'location': 'The Mods', 'date': '2025-04-12T21:00:00',
+            'emoji_vibe': ['🎉', '🔥', '🎵'], 'organizer_alias': 'Neon Wolf',
+        }),
+    }
+    formats = ['JPEG'] + (['WEBP'] if features.check('webp') else [])
+
+    for label, image_bytes in sources.items():
+        img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+        print(f"\n{label}: original PNG {len(image_bytes) / 1024:.0f} KB")
+        print(f"  {'rendition':<10}{'format':<7}{'size':>11}{'KB':>9}{'encode ms':>12}")
+        for fmt in formats:
+            for name, width in RENDITION_WIDTHS.items():
+                start = time.perf_counter()
+                for _ in range(5):
+                    data, w, h = encode_rendition(img, width, fmt)
+                elapsed = (time.perf_counter() - start) / 5
+                print(f"  {name:<10}{fmt:<7}{f'{w}x{h}':>11}{len(data) / 1024:>9.1f}{elapsed * 1000:>12.1f}")
+
+        start = time.perf_counter()
+        for _ in range(5):
+            make_derivatives(image_bytes)
+        print(f"  all renditions in the pool ({preferred_format()}): "
+              f"{(time.perf_counter() - start) / 5 * 1000:.1f} ms")
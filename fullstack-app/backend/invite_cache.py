@@ -0,0 +1,103 @@
+"""
+Content-addressed cache for generated invite images
+
+The key is a hash of the normalized invite inputs (the exact values the
+prompt is built from) plus INVITE_GENERATOR_VERSION, so re-previewing the
+same name/location/date/vibe returns the stored image instead of paying for
+another DALL-E call. `invite_images/{key}` index documents map keys to
+Storage objects; the object name itself is derived from the key too, so a
+missing index entry can be recovered from Storage.
+
+Bump INVITE_GENERATOR_VERSION whenever the prompt or renderer changes.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from metrics import metrics
+
+INVITE_GENERATOR_VERSION = 'dalle3-v1'
+INVITE_IMAGE_PREFIX = 'event-invites'
+
+
+def _clean_text(value):
+    return ' '.join(str(value or '').split())
+
+
+def _clean_date(value):
+    """Minute precision, which is all the invite shows"""
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).strftime('%Y-%m-%dT%H:%M%z')
+    except ValueError:
+        return _clean_text(value)
+
+
+def normalize_invite_data(event_data):
+    """The fields an invite is rendered from, with formatting noise removed"""
+    return {
+        'function_name': _clean_text(event_data.get('function_name')),
+        'location': _clean_text(event_data.get('location')),
+        'date': _clean_date(event_data.get('date')) if event_data.get('date') else '',
+        'emoji_vibe': [emoji.strip() for emoji in event_data.get('emoji_vibe') or [] if emoji.strip()],
+        'organizer_alias': _clean_text(event_data.get('organizer_alias')),
+        'description': _clean_text(event_data.get('description')),
+    }
+
+
+def invite_cache_key(event_data, version=INVITE_GENERATOR_VERSION):
+    canonical = json.dumps(
+        {'version': version, 'invite': normalize_invite_data(event_data)},
+        sort_keys=True,
+        separators=(',', ':'),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class InviteImageCache:
+
+    def __init__(self, db, bucket):
+        self.db = db
+        self.bucket = bucket
+
+    def _index_ref(self, key):
+        return self.db.collection('invite_images').document(key)
+
+    def storage_path(self, key, regenerated=False):
+        """Object name for a key; regenerations get their own name so the first stays intact"""
+        if regenerated:
+            return f"{INVITE_IMAGE_PREFIX}/{key}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.png"
+        return f"{INVITE_IMAGE_PREFIX}/{key}.png"
+
+    def lookup(self, key):
+        """
+        Cached invite for key, or None (blocking)
+        Returns {'invitation_image': url, 'invitation_images': {rendition: url}}
+        """
+        index_doc = self._index_ref(key).get()
+        if index_doc.exists:
+            metrics.incr('invite_cache.hits')
+            entry = index_doc.to_dict()
+            return {'invitation_image': entry['url'], 'invitation_images': entry.get('images') or {}}
+
+        # Uploaded but the index write never landed (renditions, if any, are re-made next time)
+        blob = self.bucket.blob(self.storage_path(key))
+        if blob.exists():
+            blob.make_public()
+            invite = {'invitation_image': blob.public_url, 'invitation_images': {}}
+            self.record(key, invite, blob.name)
+            metrics.incr('invite_cache.hits')
+            return invite
+
+        metrics.incr('invite_cache.misses')
+        return None
+
+    def record(self, key, invite, storage_path):
+        """Point key at a stored image and its renditions (blocking)"""
+        self._index_ref(key).set({
+            'url': invite['invitation_image'],
+            'images': invite.get('invitation_images') or {},
+            'storage_path': storage_path,
+            'generator_version': INVITE_GENERATOR_VERSION,
+            'created_at': datetime.utcnow().isoformat(),
+        })
@@ -0,0 +1,81 @@
+"""
+Materialized top-K leaderboard, rebuilt in the background
+
+Readers get the last built snapshot (an immutable tuple) without doing any
+work. Rebuilds run on a timer and shortly after anything marks the board
+dirty (event created, RSVP changed, model swapped...), with a small debounce
+so a burst of RSVPs costs one rebuild.
+"""
+import asyncio
+import time
+from datetime import datetime
+
+from metrics import metrics
+
+
+class Leaderboard:
+
+    def __init__(self, name, rebuild, refresh_interval=300, debounce=2.0, on_refresh=None):
+        """
+        rebuild: blocking callable returning (entries, total_analyzed), entries sorted best-first
+        on_refresh: optional blocking callable(snapshot) used to persist the summary
+        """
+        self.name = name
+        self._rebuild = rebuild
+        self._on_refresh = on_refresh
+        self.refresh_interval = refresh_interval
+        self.debounce = debounce
+        self._snapshot = None
+        self._dirty = asyncio.Event()
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def ready(self):
+        return self._snapshot is not None
+
+    def snapshot(self):
+        return self._snapshot
+
+    def load(self, snapshot):
+        """Seed from a persisted summary (e.g. after a restart) until the first rebuild"""
+        if self._snapshot is None and snapshot:
+            self._snapshot = {**snapshot, 'entries': tuple(snapshot.get('entries', []))}
+
+    def mark_dirty(self):
+        self._dirty.set()
+
+    async def refresh(self):
+        async with self._refresh_lock:
+            start = time.perf_counter()
+            entries, total_analyzed = await asyncio.to_thread(self._rebuild)
+            snapshot = {
+                'entries': tuple(entries),
+                'total_analyzed': total_analyzed,
+                'refreshed_at': datetime.utcnow().isoformat(),
+            }
+            self._snapshot = snapshot
+            metrics.observe(f'{self.name}.refresh_seconds', time.perf_counter() - start)
+            metrics.incr(f'{self.name}.refreshes')
+
+            if self._on_refresh is not None:
+                try:
+                    await asyncio.to_thread(self._on_refresh, snapshot)
+                except Exception as e:
+                    print(f"⚠️ Could not persist {self.name}: {e}")
+            return snapshot
+
+    async def run(self):
+        """Background loop: rebuild on a timer or shortly after being marked dirty"""
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=self.refresh_interval)
+                # Let a burst of changes settle into one rebuild
+                await asyncio.sleep(self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"⚠️ {self.name} refresh failed: {e}")
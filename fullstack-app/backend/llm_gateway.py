@@ -0,0 +1,230 @@
+"""
+Shared async gateway in front of the OpenAI API
+
+Every call gets a deadline (queueing for a slot counts against it), each
+model has its own concurrency cap, and each model has a circuit breaker:
+after `failure_threshold` consecutive failures calls are rejected right away
+with CircuitOpenError for `reset_timeout` seconds, so callers go straight to
+their fallbacks instead of waiting on a sick upstream. After that one trial
+call is let through; success closes the circuit, failure re-opens it.
+
+Metrics per model: llm.<model>.calls / .errors / .timeouts / .rejected
+counters, llm.<model>.seconds timings and llm.<model>.circuit_open gauge.
+
+Point OPENAI_BASE_URL at `python llm_stub.py` to run against a local fake.
+"""
+import asyncio
+import os
+import time
+
+from metrics import metrics
+
+
+class LLMUnavailableError(Exception):
+    """The call failed, timed out or was rejected - use the fallback"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_cancelled(self):
+        """A cancelled call says nothing about upstream health - just free the trial slot"""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class LLMGateway:
+    """
+    client: an AsyncOpenAI-compatible client (chat.completions.create / images.generate)
+    concurrency: {model: max in-flight calls}, others get default_concurrency
+    """
+
+    def __init__(self, client, concurrency=None, default_concurrency=8, default_timeout=20.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.client = client
+        self.concurrency = dict(concurrency or {})
+        self.default_concurrency = default_concurrency
+        self.default_timeout = default_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._semaphores = {}
+        self._breakers = {}
+
+    def _semaphore(self, model):
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(self.concurrency.get(model, self.default_concurrency))
+        return self._semaphores[model]
+
+    def breaker(self, model):
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[model]
+
+    async def _call(self, model, request, timeout):
+        breaker = self.breaker(model)
+        if not breaker.allow():
+            metrics.incr(f'llm.{model}.rejected')
+            raise CircuitOpenError(f"{model} circuit is open")
+
+        async def limited():
+            async with self._semaphore(model):
+                return await request()
+
+        metrics.incr(f'llm.{model}.calls')
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(limited(), timeout=timeout or self.default_timeout)
+        except asyncio.TimeoutError as e:
+            metrics.incr(f'llm.{model}.timeouts')
+            self._record_failure(model, breaker)
+            raise LLMUnavailableError(f"{model} timed out after {timeout or self.default_timeout}s") from e
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
+        except Exception as e:
+            metrics.incr(f'llm.{model}.errors')
+            self._record_failure(model, breaker)
+            raise LLMUnavailableError(f"{model} call failed: {e}") from e
+        finally:
+            metrics.observe(f'llm.{model}.seconds', time.perf_counter() - start)
+
+        breaker.record_success()
+        metrics.gauge(f'llm.{model}.circuit_open', 0)
+        return result
+
+    def _record_failure(self, model, breaker):
+        breaker.record_failure()
+        if breaker.opened_at is not None:
+            metrics.gauge(f'llm.{model}.circuit_open', 1)
+
+    async def chat(self, model, messages, timeout=None, **kwargs):
+        """Chat completion text"""
+        async def request():
+            response = await self.client.chat.completions.create(model=model, messages=messages, **kwargs)
+            return response.choices[0].message.content
+        return await self._call(model, request, timeout)
+
+    async def chat_stream(self, model, messages, timeout=None, **kwargs):
+        """
+        Yield chat completion text deltas as they arrive
+        The deadline covers the whole stream; the concurrency slot is held until it ends.
+        """
+        breaker = self.breaker(model)
+        if not breaker.allow():
+            metrics.incr(f'llm.{model}.rejected')
+            raise CircuitOpenError(f"{model} circuit is open")
+
+        timeout = timeout or self.default_timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        metrics.incr(f'llm.{model}.calls')
+        start = time.perf_counter()
+        first_token = True
+        try:
+            await asyncio.wait_for(self._semaphore(model).acquire(), timeout=timeout)
+            try:
+                stream = await asyncio.wait_for(
+                    self.client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs),
+                    timeout=deadline - loop.time()
+                )
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=deadline - loop.time())
+                    except StopAsyncIteration:
+                        break
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        if first_token:
+                            metrics.observe(f'llm.{model}.first_token_seconds', time.perf_counter() - start)
+                            first_token = False
+                        yield text
+            finally:
+                self._semaphore(model).release()
+        except asyncio.TimeoutError as e:
+            metrics.incr(f'llm.{model}.timeouts')
+            self._record_failure(model, breaker)
+            raise LLMUnavailableError(f"{model} stream timed out after {timeout}s") from e
+        except (asyncio.CancelledError, GeneratorExit):
+            breaker.record_cancelled()
+            raise
+        except Exception as e:
+            metrics.incr(f'llm.{model}.errors')
+            self._record_failure(model, breaker)
+            raise LLMUnavailableError(f"{model} stream failed: {e}") from e
+        finally:
+            metrics.observe(f'llm.{model}.seconds', time.perf_counter() - start)
+
+        breaker.record_success()
+        metrics.gauge(f'llm.{model}.circuit_open', 0)
+
+    async def image(self, model, prompt, timeout=None, **kwargs):
+        """URL of one generated image"""
+        async def request():
+            response = await self.client.images.generate(model=model, prompt=prompt, **kwargs)
+            return response.data[0].url
+        return await self._call(model, request, timeout)
+
+    def stats(self):
+        return {
+            model: {'state': breaker.state, 'consecutive_failures': breaker.failures}
+            for model, breaker in self._breakers.items()
+        }
+
+
+def create_openai_gateway(**kwargs):
+    """
+    Gateway over AsyncOpenAI (or the in-process stub when LLM_STUB is set)
+    The client doesn't retry or time out on its own - the gateway's deadlines decide.
+    """
+    if os.getenv("LLM_STUB"):
+        from llm_stub import StubAsyncOpenAI
+        return LLMGateway(StubAsyncOpenAI(), **kwargs)
+
+    from openai import AsyncOpenAI
+    client = AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        max_retries=0,
+        timeout=None,
+    )
+    return LLMGateway(client, **kwargs)
@@ -0,0 +1,124 @@
+"""
+Local stand-ins for the OpenAI API, for tests and offline development
+
+- LLM_STUB=1 makes main.py use StubAsyncOpenAI in-process: chat completions
+  answer deterministically (same prompt -> same text) after LLM_STUB_LATENCY
+  seconds, so cache hit rates and latency savings can be measured without an
+  API key. Images aren't stubbed, which exercises the fallback renderer.
+- `python llm_stub.py --port 8089 --latency 0.5 --fail-rate 0.2` serves a fake
+  OpenAI-compatible HTTP API; set OPENAI_BASE_URL=http://localhost:8089/v1 to
+  test timeouts and the circuit breaker against a real socket.
+"""
+import asyncio
+import hashlib
+import os
+from types import SimpleNamespace
+
+STUB_LATENCY = float(os.getenv('LLM_STUB_LATENCY', '0.2'))
+
+
+def stub_completion(model, messages):
+    prompt = messages[-1]['content'] if messages else ''
+    digest = hashlib.sha256(f'{model}\n{prompt}'.encode('utf-8')).hexdigest()[:8]
+    return f"[stub {model} {digest}] Lots going on around campus - grab friends and check out the top events!"
+
+
+class _StubCompletions:
+
+    def __init__(self, client):
+        self._client = client
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        self._client.calls += 1
+        await asyncio.sleep(self._client.latency)
+        content = stub_completion(model, messages)
+        if stream:
+            return self._stream(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _stream(self, content):
+        # Word by word, like a real token stream
+        for i, word in enumerate(content.split(' ')):
+            await asyncio.sleep(0.02)
+            text = word if i == 0 else f' {word}'
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class StubAsyncOpenAI:
+    """Just enough of `AsyncOpenAI()` for chat.completions.create (streaming or not)"""
+
+    def __init__(self, latency=STUB_LATENCY):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_StubCompletions(self))
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import random
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible API")
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=STUB_LATENCY, help="seconds before each response")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="fraction of requests answered with HTTP 500")
+    args = parser.parse_args()
+
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_stream(self, model, messages):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for i, word in enumerate(stub_completion(model, messages).split(' ')):
+                chunk = {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion.chunk',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'delta': {'content': word if i == 0 else f' {word}'}, 'finish_reason': None}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                time.sleep(0.02)
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            time.sleep(args.latency)
+
+            if random.random() < args.fail_rate:
+                self._send(500, {'error': {'message': 'stub failure', 'type': 'server_error'}})
+            elif self.path.endswith('/chat/completions') and request.get('stream'):
+                self._send_stream(request.get('model', 'stub'), request.get('messages', []))
+            elif self.path.endswith('/chat/completions'):
+                model = request.get('model', 'stub')
+                self._send(200, {
+                    'id': 'chatcmpl-stub',
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': stub_completion(model, request.get('messages', []))},
+                        'finish_reason': 'stop',
+                    }],
+                })
+            elif self.path.endswith('/images/generations'):
+                self._send(200, {'created': int(time.time()), 'data': [{'url': 'https://placehold.co/1024x1792.png'}]})
+            else:
+                self._send(404, {'error': {'message': f'unknown path {self.path}'}})
+
+    print(f"🧪 Fake OpenAI API on http://localhost:{args.port}/v1 "
+          f"(latency {args.latency}s, fail rate {args.fail_rate:.0%})")
+    ThreadingHTTPServer(('', args.port), FakeOpenAIHandler).serve_forever()
@@ -0,0 +1,136 @@
+"""
+Filesystem stand-in for a Cloud Storage bucket, for tests and offline development
+
+Implements the slice of google.cloud.storage Bucket/Blob that the backend
+uses - blob(), upload_from_file() (read chunk_size at a time, like a
+resumable upload), upload_from_string(), make_public(), exists(),
+download_as_bytes(), public_url, cache_control and if_generation_match=0
+preconditions - on top of a local directory. Object metadata (content type,
+cache control, ACL) is kept in a `<object>.meta.json` sidecar so the
+/storage route in main.py can serve objects with the right headers.
+"""
+import json
+import os
+import shutil
+from urllib.parse import quote
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+META_SUFFIX = '.meta.json'
+
+
+class PreconditionFailed(Exception):
+    """Same shape as google.api_core.exceptions.PreconditionFailed (checked via .code)"""
+    code = 412
+
+
+class LocalBlob:
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.chunk_size = None
+        self.cache_control = None
+        self.content_type = None
+
+    @property
+    def path(self):
+        return os.path.join(self.bucket.root, *self.name.split('/'))
+
+    @property
+    def public_url(self):
+        return f"{self.bucket.base_url}/{quote(self.name)}"
+
+    def metadata(self):
+        """{'content_type', 'cache_control', 'acl'} as stored at upload time"""
+        try:
+            with open(self.path + META_SUFFIX) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    @property
+    def acl(self):
+        return self.metadata().get('acl')
+
+    def _prepare(self, if_generation_match):
+        if if_generation_match == 0 and self.exists():
+            raise PreconditionFailed(f"{self.name} already exists")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def _set_metadata(self, content_type, predefined_acl):
+        self.content_type = content_type
+        with open(self.path + META_SUFFIX, 'w') as f:
+            json.dump({'content_type': content_type, 'cache_control': self.cache_control, 'acl': predefined_acl}, f)
+
+    def upload_from_file(self, file_obj, size=None, content_type=None, predefined_acl=None,
+                         if_generation_match=None, **kwargs):
+        self._prepare(if_generation_match)
+        chunk_size = self.chunk_size or DEFAULT_CHUNK_SIZE
+        partial = f"{self.path}.part"
+        with open(partial, 'wb') as out:
+            remaining = size
+            while remaining is None or remaining > 0:
+                chunk = file_obj.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                out.write(chunk)
+                self.bucket.chunks_uploaded += 1
+                if remaining is not None:
+                    remaining -= len(chunk)
+        # Like a finalized upload, the object only appears once complete
+        self._set_metadata(content_type, predefined_acl)
+        os.replace(partial, self.path)
+
+    def upload_from_string(self, data, content_type='text/plain', predefined_acl=None,
+                           if_generation_match=None, **kwargs):
+        self._prepare(if_generation_match)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        partial = f"{self.path}.part"
+        with open(partial, 'wb') as out:
+            out.write(data)
+        self._set_metadata(content_type, predefined_acl)
+        os.replace(partial, self.path)
+
+    def make_public(self):
+        metadata = self.metadata()
+        with open(self.path + META_SUFFIX, 'w') as f:
+            json.dump({**metadata, 'acl': 'publicRead'}, f)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def download_as_bytes(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def delete(self):
+        os.remove(self.path)
+        if os.path.exists(self.path + META_SUFFIX):
+            os.remove(self.path + META_SUFFIX)
+
+
+class LocalBucket:
+
+    def __init__(self, root, base_url='http://localhost:8000/storage'):
+        self.root = os.path.realpath(root)
+        self.base_url = base_url.rstrip('/')
+        self.name = os.path.basename(self.root)
+        self.chunks_uploaded = 0
+
+    def blob(self, name):
+        return LocalBlob(self, name)
+
+    def public_blob(self, name):
+        """The blob for a requested object name if it exists and is public, else None (no path escapes)"""
+        if name.endswith(META_SUFFIX) or name.endswith('.part'):
+            return None
+        blob = self.blob(name)
+        if os.path.commonpath([self.root, os.path.realpath(blob.path)]) != self.root:
+            return None
+        if not os.path.isfile(blob.path) or blob.acl != 'publicRead':
+            return None
+        return blob
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -1,27 +1,51 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, EmailStr, model_validator
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from pydantic import BaseModel, EmailStr
 import firebase_admin
-from firebase_admin import credentials, firestore, storage
-import random
-from datetime import datetime, timedelta
+from firebase_admin import credentials, firestore
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from enum import Enum
 import os
-from openai import OpenAI
 from typing import Dict
 from dotenv import load_dotenv
-import requests
 import time
-from PIL import Image, ImageDraw, ImageFont
-import io
-import base64
-import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-import pickle
+import asyncio
+import json
+from alias_pool import AliasPool
+from auth import InvalidTokenError, TokenService, TokenUser, hash_password_async, verify_user_password
+from caches import LLMResponseCache, PredictionCache
+from campus_registry import event_location_id, location_preference_score, resolve_club, resolve_location
+from event_features import extract_features
+from firestore_paging import InvalidCursorError, iter_query_documents
+from goated_model import ModelRegistry, ModelValidationError, TrainingService
+from historical_events import list_historical_events, parse_fields
+from historical_export import EXPORT_FORMATS, ExportFieldsError, ExportStats, export_fields, export_historical_events
+from image_derivatives import make_derivatives, upload_derivatives
+from invite_cache import INVITE_IMAGE_PREFIX, InviteImageCache, invite_cache_key
+from leaderboard import Leaderboard
+from local_storage import LocalBucket
+from llm_gateway import create_openai_gateway
+from metrics import metrics
+from predictors import PREDICTOR_BACKENDS
+from render_service import RenderQueueFullError, RenderService
+from storage_transfer import create_storage_bucket, spool_file, stream_url_to_blob, upload_immutable
+from success_heuristic import (
+    calculate_capacity_utilization_score,
+    calculate_club_affiliation_score,
+    calculate_location_score,
+    calculate_time_score,
+    calculate_vibe_score,
+    combine_factor_scores,
+    score_events_batch,
+    success_reason,
+)
+from training_data import FeatureStore, sync_historical_events
+from user_activity import CURRENT, FOLLOWERS, FUNCTIONS_SCHEMA_VERSION, PAST, UserActivity
+from user_directory import EmailTakenError, UserDirectory
 
 # Load environment variables from .env file
 load_dotenv()
@@ -55,21 +79,192 @@ firebase_admin.initialize_app(cred, {
     'storageBucket': 'bcplubhub.firebasestorage.app'  # Replace with your actual bucket name
 })
 db = firestore.client()
-bucket = storage.bucket()
+# Firebase Storage, or files served from /storage with STORAGE_BACKEND=local (see storage_transfer.py)
+bucket = create_storage_bucket()
+
+# Keep references to fire-and-forget tasks so they aren't garbage collected mid-run
+_background_tasks = set()
+
+def spawn_background(coro):
+    """Run a coroutine in the background on the current event loop"""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
 # Initialize OpenAI using .env file (includes DALL-E for image generation)
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# All calls go through the async gateway: per-call deadlines, per-model
+# concurrency caps and a circuit breaker that sends callers straight to the
+# fallbacks when OpenAI keeps failing. LLM_STUB=1 swaps in a local stub.
+llm_gateway = create_openai_gateway(
+    concurrency={"dall-e-3": 2, "gpt-4o": 4},
+    default_concurrency=8,
+    failure_threshold=5,
+    reset_timeout=30.0,
+)
+
+# Identical insight prompts (same top events + scores) reuse one completion
+llm_cache = LLMResponseCache(maxsize=256, ttl=int(os.getenv("LLM_CACHE_TTL", "600")))
+
+
+def chat_cache_key(model, messages, max_tokens, temperature):
+    return llm_cache.key(model, {'messages': messages, 'max_tokens': max_tokens, 'temperature': temperature})
+
+
+async def stream_cached_chat_completion(model, messages, max_tokens, temperature, timeout=20.0):
+    """
+    Yield completion text as it streams in; a cached answer comes back as one chunk
+    Fully streamed answers are cached. Errors before/while streaming propagate.
+    """
+    key = chat_cache_key(model, messages, max_tokens, temperature)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    
+    start = time.perf_counter()
+    parts = []
+    async for text in llm_gateway.chat_stream(
+        model,
+        messages,
+        timeout=timeout,
+        max_tokens=max_tokens,
+        temperature=temperature
+    ):
+        parts.append(text)
+        yield text
+    llm_cache.put(key, ''.join(parts), time.perf_counter() - start)
+
+
+async def cached_chat_completion(model, messages, max_tokens, temperature, timeout=10.0):
+    """
+    Chat completion text, served from llm_cache when the exact same request was made recently
+    Concurrent identical calls share one upstream request. Errors propagate (nothing is cached).
+    """
+    key = chat_cache_key(model, messages, max_tokens, temperature)
+    
+    async def call():
+        return await llm_gateway.chat(
+            model,
+            messages,
+            timeout=timeout,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+    
+    return await llm_cache.get_or_call(key, call)
+
+# Previews with identical inputs reuse the stored image (see invite_cache.py)
+invite_image_cache = InviteImageCache(db, bucket)
+
+# Aliases are pre-generated in batches and handed out instantly (see alias_pool.py)
+alias_pool = AliasPool(db, llm_gateway)
+
+# users_by_email/{email} index: direct-get email lookups, transactional signups (see user_directory.py)
+user_directory = UserDirectory(db)
+
+
+@app.on_event("startup")
+async def backfill_email_index():
+    """Index users created before users_by_email existed (no-op once done)"""
+    async def _backfill():
+        try:
+            await asyncio.to_thread(user_directory.load)
+        except Exception as e:
+            print(f"⚠️ Email index backfill failed: {e}")
+    spawn_background(_backfill())
+
+# Function history and followers live in per-user subcollections (see user_activity.py)
+user_activity = UserActivity(db)
+
+
+@app.on_event("startup")
+async def migrate_user_activity():
+    """Move embedded function/follower arrays out of user documents (no-op once done)"""
+    async def _migrate():
+        try:
+            await asyncio.to_thread(user_activity.load)
+        except Exception as e:
+            print(f"⚠️ User activity migration failed: {e}")
+    spawn_background(_migrate())
+
+
+def get_user_doc(user_id):
+    """users/{user_id} snapshot (None if missing), migrating it first if it still embeds the arrays"""
+    user_doc = db.collection('users').document(user_id).get()
+    if not user_doc.exists:
+        return None
+    if user_activity.ensure_migrated(user_doc):
+        user_doc = user_doc.reference.get()
+    return user_doc
+
+# Signed access/refresh tokens (see auth.py); JWT_SECRET must be set in production
+token_service = TokenService(
+    secret=os.getenv("JWT_SECRET"),
+    access_minutes=int(os.getenv("ACCESS_TOKEN_MINUTES", "15")),
+    refresh_days=int(os.getenv("REFRESH_TOKEN_DAYS", "14")),
+)
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> TokenUser:
+    """The caller, resolved from the bearer access token (no Firestore read)"""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return token_service.current_user(credentials.credentials)
+    except InvalidTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+
+def require_same_user(caller: TokenUser, user_id: str):
+    if caller.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to act for another user")
+
+# Fallback invites render in worker processes with a bounded queue (see render_service.py)
+render_service = RenderService(
+    workers=int(os.getenv("RENDER_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("RENDER_QUEUE_SIZE")) if os.getenv("RENDER_QUEUE_SIZE") else None,
+)
+
+
+@app.on_event("startup")
+async def start_render_service():
+    render_service.start()
 
-# Fallback AI Alias Generator (if OpenAI fails)
-ADJECTIVES = ["Velvet", "Neon", "Cosmic", "Shadow", "Electric", "Mystic", "Digital", "Urban", "Midnight", "Golden"]
-NOUNS = ["Thunder", "Phantom", "Wolf", "Phoenix", "Viper", "Cipher", "Falcon", "Raven", "Tiger", "Dragon"]
 
-def generate_fallback_alias():
-    """Generate a cool AI alias (fallback)"""
-    return f"{random.choice(ADJECTIVES)} {random.choice(NOUNS)}"
+@app.on_event("shutdown")
+async def stop_render_service():
+    render_service.shutdown()
 
-def generate_ai_invite_image(event_data):
-    """Generate invite image using OpenAI DALL-E and upload to Firebase Storage"""
+
+@app.on_event("startup")
+async def warm_alias_pool():
+    """Load the persisted pool + aliases in use, then top the pool up in the background"""
+    async def _warm():
+        try:
+            await asyncio.to_thread(alias_pool.load)
+            await alias_pool.refill()
+        except Exception as e:
+            print(f"⚠️ Alias pool warmup failed: {e}")
+    spawn_background(_warm())
+
+async def generate_ai_invite_image(event_data, regenerate=False):
+    """
+    Generate invite image using OpenAI DALL-E and upload to Firebase Storage
+    Identical invite inputs reuse the stored image unless regenerate=True
+    Returns {'invitation_image': full-size url, 'invitation_images': {rendition: url}}
+    """
+    cache_key = invite_cache_key(event_data)
+    if not regenerate:
+        try:
+            cached = await asyncio.to_thread(invite_image_cache.lookup, cache_key)
+            if cached:
+                print(f"♻️ Reusing cached invite image: {cached['invitation_image']}")
+                return cached
+        except Exception as e:
+            print(f"⚠️ Invite image cache lookup failed: {e}")
+    
     try:
         print("🎨 Generating AI invite image with DALL-E...")
         
@@ -116,231 +311,86 @@ Design Elements:
         print(f"Prompt: {prompt[:150]}...")
         
         # Generate image with DALL-E 3
-        dalle_response = openai_client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
+        image_url = await llm_gateway.image(
+            "dall-e-3",
+            prompt,
+            timeout=60.0,
             size="1024x1792",  # Vertical format (9:16 ratio for Instagram stories)
             quality="standard",
             n=1,
         )
-        
-        image_url = dalle_response.data[0].url
         print(f"✅ Image URL generated: {image_url[:50]}...")
         
-        # Download image
-        print("📥 Downloading image...")
-        img_response = requests.get(image_url, timeout=30)
+        storage_path = invite_image_cache.storage_path(cache_key, regenerated=regenerate)
+        invite = await asyncio.to_thread(store_ai_invite_image, image_url, storage_path)
         
-        if img_response.status_code == 200:
-            image_bytes = img_response.content
-            print(f"✅ Image downloaded ({len(image_bytes)} bytes)")
-            
-            # Upload to Firebase Storage
-            print("☁️ Uploading to Firebase Storage...")
-            
-            # Generate unique filename
-            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            filename = f"event-invites/{timestamp}_{function_name[:30].replace(' ', '_')}.png"
-            
-            # Upload to Firebase Storage
-            blob = bucket.blob(filename)
-            blob.upload_from_string(
-                image_bytes,
-                content_type='image/png'
-            )
-            
-            # Make the blob publicly accessible
-            blob.make_public()
-            
-            # Get public URL
-            public_url = blob.public_url
-            
-            print(f"✅ Image uploaded to Firebase Storage: {public_url}")
-            return public_url
-        else:
-            raise Exception(f"Failed to download image: HTTP {img_response.status_code}")
+        # Only real DALL-E images are cached - a fallback render shouldn't stick to these inputs
+        try:
+            await asyncio.to_thread(invite_image_cache.record, cache_key, invite, storage_path)
+        except Exception as e:
+            print(f"⚠️ Could not index invite image: {e}")
+        return invite
         
     except Exception as e:
         print(f"❌ Error generating AI image: {e}")
         print(f"🔄 Falling back to traditional image generation")
-        return generate_fallback_invite_image(event_data)
-            
-def generate_fallback_invite_image(event_data):
-    """Generate invite image using PIL (fallback)"""
+        return await generate_fallback_invite_image(event_data)
+
+
+def store_invite_renditions(image):
+    """Card/preview/full WebP renditions, stored by content hash -> {rendition: url} (blocking)"""
     try:
-        # Create image (1080x1920 - Instagram story size)
-        width, height = 1080, 1920
-        
-        # Gradient background based on vibe
-        img = Image.new('RGB', (width, height), color='#1a1a2e')
-        draw = ImageDraw.Draw(img)
-        
-        # Create gradient effect
-        for i in range(height):
-            r = int(26 + (i / height) * 80)  # 1a -> 66
-            g = int(26 + (i / height) * 33)  # 1a -> 33  
-            b = int(46 + (i / height) * 150) # 2e -> cc
-            draw.rectangle([(0, i), (width, i+1)], fill=(r, g, b))
-        
-        # Try to use custom fonts, fallback to default
-        try:
-            title_font = ImageFont.truetype("arial.ttf", 80)
-            emoji_font = ImageFont.truetype("seguiemj.ttf", 120)
-            body_font = ImageFont.truetype("arial.ttf", 50)
-            small_font = ImageFont.truetype("arial.ttf", 40)
-        except:
-            title_font = ImageFont.load_default()
-            emoji_font = ImageFont.load_default()
-            body_font = ImageFont.load_default()
-            small_font = ImageFont.load_default()
-        
-        # Draw content
-        y_position = 200
-        
-        # Vibe emojis at top
-        emoji_text = ' '.join(event_data.get('emoji_vibe', ['🔥', '💃', '🎵']))
-        emoji_bbox = draw.textbbox((0, 0), emoji_text, font=emoji_font)
-        emoji_width = emoji_bbox[2] - emoji_bbox[0]
-        draw.text(((width - emoji_width) / 2, y_position), emoji_text, 
-                 fill='white', font=emoji_font)
-        y_position += 200
-        
-        # "YOU'RE INVITED"
-        invited_text = "YOU'RE INVITED"
-        invited_bbox = draw.textbbox((0, 0), invited_text, font=body_font)
-        invited_width = invited_bbox[2] - invited_bbox[0]
-        draw.text(((width - invited_width) / 2, y_position), invited_text, 
-                 fill='#FFD700', font=body_font)
-        y_position += 100
-        
-        # Function name (wrapped if too long)
-        function_name = event_data.get('function_name', 'Function')
-        if len(function_name) > 20:
-            # Wrap text
-            words = function_name.split()
-            line1 = ' '.join(words[:len(words)//2])
-            line2 = ' '.join(words[len(words)//2:])
-            
-            bbox1 = draw.textbbox((0, 0), line1, font=title_font)
-            width1 = bbox1[2] - bbox1[0]
-            draw.text(((width - width1) / 2, y_position), line1, 
-                     fill='white', font=title_font)
-            y_position += 100
-            
-            bbox2 = draw.textbbox((0, 0), line2, font=title_font)
-            width2 = bbox2[2] - bbox2[0]
-            draw.text(((width - width2) / 2, y_position), line2, 
-                     fill='white', font=title_font)
-        else:
-            name_bbox = draw.textbbox((0, 0), function_name, font=title_font)
-            name_width = name_bbox[2] - name_bbox[0]
-            draw.text(((width - name_width) / 2, y_position), function_name, 
-                     fill='white', font=title_font)
-        
-        y_position += 150
-        
-        # Location
-        location = f"📍 {event_data.get('location', 'TBD')}"
-        loc_bbox = draw.textbbox((0, 0), location, font=body_font)
-        loc_width = loc_bbox[2] - loc_bbox[0]
-        draw.text(((width - loc_width) / 2, y_position), location, 
-                 fill='white', font=body_font)
-        y_position += 100
-        
-        # Date/Time
-        date_str = event_data.get('date', '')
-        if date_str:
-            try:
-                event_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                formatted_date = event_date.strftime('%A, %B %d')
-                formatted_time = event_date.strftime('%I:%M %p')
-                
-                date_text = f"🗓️ {formatted_date}"
-                date_bbox = draw.textbbox((0, 0), date_text, font=body_font)
-                date_width = date_bbox[2] - date_bbox[0]
-                draw.text(((width - date_width) / 2, y_position), date_text, 
-                         fill='white', font=body_font)
-                y_position += 80
-                
-                time_text = f"🕐 {formatted_time}"
-                time_bbox = draw.textbbox((0, 0), time_text, font=body_font)
-                time_width = time_bbox[2] - time_bbox[0]
-                draw.text(((width - time_width) / 2, y_position), time_text, 
-                         fill='white', font=body_font)
-            except:
-                pass
-        
-        y_position += 150
-        
-        # Hosted by
-        organizer = event_data.get('organizer_alias', 'Anonymous')
-        host_text = f"Hosted by {organizer}"
-        host_bbox = draw.textbbox((0, 0), host_text, font=small_font)
-        host_width = host_bbox[2] - host_bbox[0]
-        draw.text(((width - host_width) / 2, y_position), host_text, 
-                 fill='#cccccc', font=small_font)
-        
-        # BCPlugHub branding at bottom
-        y_position = height - 150
-        brand_text = "BCPlugHub"
-        brand_bbox = draw.textbbox((0, 0), brand_text, font=body_font)
-        brand_width = brand_bbox[2] - brand_bbox[0]
-        draw.text(((width - brand_width) / 2, y_position), brand_text, 
-                 fill='#FFD700', font=body_font)
-        
-        # Upload to Firebase Storage instead of base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        
-        # Generate unique filename
-        function_name = event_data.get('function_name', 'Function')
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        filename = f"event-invites/{timestamp}_{function_name[:30].replace(' ', '_')}_fallback.png"
-        
-        # Upload to Firebase Storage
-        blob = bucket.blob(filename)
-        blob.upload_from_file(buffer, content_type='image/png')
-        blob.make_public()
-        
-        public_url = blob.public_url
-        print(f"✅ Fallback image uploaded to Firebase Storage")
-        
-        return public_url
+        derivatives = make_derivatives(image)
+        urls = upload_derivatives(bucket, INVITE_IMAGE_PREFIX, derivatives)
+        metrics.incr('invites.renditions', len(urls))
+        sizes = ', '.join(f"{name} {len(d['data']) // 1024}KB" for name, d in derivatives.items())
+        print(f"✅ Uploaded {len(urls)} invite renditions ({sizes})")
+        return urls
+    except Exception as e:
+        # Cards fall back to the full-size image
+        print(f"⚠️ Could not create invite renditions: {e}")
+        metrics.incr('invites.rendition_errors')
+        return {}
+
+def store_ai_invite_image(image_url, storage_path):
+    """
+    Stream a generated image into Firebase Storage, then upload its renditions (blocking)
+    The download goes chunk by chunk into a public resumable upload (see storage_transfer.py)
+    """
+    print("☁️ Streaming image to Firebase Storage...")
+    with spool_file() as spool:
+        public_url = stream_url_to_blob(bucket, image_url, storage_path, content_type='image/png', spool=spool)
+        print(f"✅ Image uploaded to Firebase Storage: {public_url}")
         
+        return {
+            'invitation_image': public_url,
+            'invitation_images': store_invite_renditions(spool),
+        }
+
+async def generate_fallback_invite_image(event_data):
+    """
+    Generate invite image using PIL (fallback, see invite_renderer.py)
+    Raises RenderQueueFullError when the render service is backed up
+    """
+    try:
+        png_bytes = await render_service.render_invite(event_data)
+        return await asyncio.to_thread(store_fallback_invite_image, png_bytes)
+    except RenderQueueFullError:
+        raise
     except Exception as e:
         print(f"Error generating invite image: {e}")
-        return None
+        return {'invitation_image': None, 'invitation_images': {}}
 
-def generate_ai_alias(description: str, name: str = None) -> str:
-    """Generate an alias using OpenAI based on user's description and name"""
-    user_info = f"Description: {description}"
-    if name:
-        user_info += f", Name: {name}"
+def store_fallback_invite_image(png_bytes):
+    """Upload a rendered fallback invite and its renditions (blocking)"""
+    # Named by content hash: identical renders share one immutable object
+    public_url = upload_immutable(bucket, INVITE_IMAGE_PREFIX, png_bytes, 'image/png', 'png')
+    print(f"✅ Fallback image uploaded to Firebase Storage")
     
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a creative alias generator for BCPlugHub, a college social app. Generate ONLY a cool, mysterious 2-word alias (Adjective + Noun) based on the user's info. Make it edgy, fun, and campus-appropriate. The alias should feel like a secret identity. Examples: 'Neon Thunder', 'Cosmic Wolf', 'Digital Phoenix', 'Velvet Cipher'. Respond with ONLY the 2-word alias, nothing else."
-                },
-                {
-                    "role": "user",
-                    "content": f"Generate an alias for: {user_info}"
-                }
-            ],
-            max_tokens=10,
-            temperature=0.9
-        )
-        alias = response.choices[0].message.content.strip()
-        print(f"Generated alias: {alias}")
-        return alias
-    except Exception as e:
-        print(f"OpenAI error: {e}")
-        # Simple fallback
-        return "Campus Legend"
+    return {
+        'invitation_image': public_url,
+        'invitation_images': store_invite_renditions(png_bytes),
+    }
 
 # Pydantic Models (Request/Response validation)
 class UserCreate(BaseModel):
@@ -351,13 +401,16 @@ class UserCreate(BaseModel):
 
 class AliasGenerate(BaseModel):
     description: str
+    personalized: bool = False  # Spend an LLM call on the description instead of using the pool
 
 class AliasResponse(BaseModel):
     ai_generated_alias: str
 
 class InstagramUpdate(BaseModel):
     instagram_handle: str
-    instagram_followers: list[str] = []
+    # Follower handles to add/remove - the full list is paged and never sent back whole
+    add_followers: list[str] = []
+    remove_followers: list[str] = []
 
 class ClubsUpdate(BaseModel):
     bc_club_affiliations: list[str]
@@ -387,6 +440,7 @@ class CurrentFunction(BaseModel):
     number_of_invites: int
     number_of_invite_shares: int = 0
     invitation_image: str = None
+    invitation_images: Dict[str, str] = {}
 
 class EventCreate(BaseModel):
     function_name: str
@@ -401,6 +455,7 @@ class EventCreate(BaseModel):
     organizer_user_id: str
     organizer_alias: str = "Anonymous"  # Make optional with default
     invitation_image: str | None = None  # Pre-generated AI image
+    invitation_images: Dict[str, str] | None = None  # Its card/preview/full renditions
 
 class UserResponse(BaseModel):
     user_id: str
@@ -414,6 +469,13 @@ class UserCreateResponse(BaseModel):
     bc_email: str
     name: str
     created_at: str
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # Routes
 @app.get("/")
@@ -424,17 +486,14 @@ def read_root():
 async def register_user(user: UserCreate):
     """Register a new user WITHOUT alias (alias comes later)"""
     
-    # Check if user already exists
-    users_ref = db.collection('users')
-    existing = users_ref.where('bc_email', '==', user.bc_email).limit(1).get()
-    
-    if len(list(existing)) > 0:
+    # Check if user already exists (one document get; the transaction below is what guarantees it)
+    if await asyncio.to_thread(user_directory.user_id_for_email, user.bc_email):
         raise HTTPException(status_code=400, detail="User already exists")
     
     # Create user document with full data structure
     user_data = {
         'bc_email': user.bc_email,
-        'password': user.password,  # ⚠️ TODO: Hash this in production!
+        'password_hash': await hash_password_async(user.password),  # Salted PBKDF2 (see auth.py)
         'name': user.name,
         'ai_generated_alias': None,  # Will be set later
         'created_at': datetime.utcnow().isoformat(),
@@ -442,25 +501,37 @@ async def register_user(user: UserCreate):
         # New fields
         'personal_rating': 5,  # Default rating (1-10 scale)
         'instagram_handle': user.instagram_handle if user.instagram_handle else None,
-        'instagram_followers': [],  # List of follower usernames
-        'instagram_follower_count': 0,  # Total follower count
+        'instagram_follower_count': 0,  # Total follower count (handles in the instagram_followers subcollection)
         'bc_club_affiliations': [],  # List of BC clubs
+        
+        # Function history lives in subcollections; the user doc keeps counts + a recent summary
+        'current_functions_count': 0,
+        'past_functions_count': 0,
+        'rated_functions_count': 0,
+        'recent_current_functions': [],
+        'recent_past_functions': [],
+        'functions_schema': FUNCTIONS_SCHEMA_VERSION,
     }
     
-    # Add to Firestore
-    doc_ref = users_ref.add(user_data)
-    user_id = doc_ref[1].id
+    # Add to Firestore together with its users_by_email entry
+    try:
+        user_id = await asyncio.to_thread(user_directory.create_user, user.bc_email, user_data)
+    except EmailTakenError:
+        raise HTTPException(status_code=400, detail="User already exists")
     
     return UserCreateResponse(
         user_id=user_id,
         bc_email=user.bc_email,
         name=user.name,
-        created_at=user_data['created_at']
+        created_at=user_data['created_at'],
+        # Signed in right away so the alias step can authenticate
+        **token_service.issue(user_id, user.bc_email, user.name)
     )
 
 @app.post("/api/users/{user_id}/generate-alias", response_model=AliasResponse)
-async def generate_user_alias(user_id: str, data: AliasGenerate):
-    """Generate AI alias based on user's description"""
+async def generate_user_alias(user_id: str, data: AliasGenerate, caller: TokenUser = Depends(get_current_user)):
+    """Assign an alias from the pre-generated pool (or from the description when personalized=true)"""
+    require_same_user(caller, user_id)
     
     # Check if user exists
     user_ref = db.collection('users').document(user_id)
@@ -471,12 +542,10 @@ async def generate_user_alias(user_id: str, data: AliasGenerate):
     
     user_data = user_doc.to_dict()
     
-    # Generate alias using OpenAI with name and description
-    alias = generate_ai_alias(data.description, user_data.get('name'))
-    
-    # Make sure we have a valid alias
-    if not alias:
-        alias = "Campus Legend"
+    if data.personalized:
+        alias = await alias_pool.personalized(data.description, user_data.get('name'), user_id)
+    else:
+        alias = await alias_pool.claim(user_id)
     
     # Update user with alias
     user_ref.update({
@@ -487,32 +556,56 @@ async def generate_user_alias(user_id: str, data: AliasGenerate):
 
 @app.post("/api/users/login")
 async def login_user(bc_email: EmailStr, password: str):
-    """Login user"""
+    """Login user - returns the profile plus access/refresh tokens"""
     
-    users_ref = db.collection('users')
-    users = users_ref.where('bc_email', '==', bc_email).where('password', '==', password).limit(1).get()
+    user_doc = await asyncio.to_thread(user_directory.get_user_by_email, bc_email)
+    user_data = user_doc.to_dict() if user_doc else None
     
-    user_list = list(users)
-    if len(user_list) == 0:
+    # Hashing runs off the event loop; unknown emails still pay for one hash
+    matches, new_hash = await verify_user_password(password, user_data)
+    if not matches:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    user_doc = user_list[0]
-    user_data = user_doc.to_dict()
+    if new_hash:
+        # Legacy plaintext password (or an outdated hash) - store the current form
+        user_doc.reference.update({'password_hash': new_hash, 'password': firestore.DELETE_FIELD})
     
     return {
         'user_id': user_doc.id,
         'bc_email': user_data['bc_email'],
         'name': user_data['name'],
-        'ai_generated_alias': user_data.get('ai_generated_alias')
+        'ai_generated_alias': user_data.get('ai_generated_alias'),
+        **token_service.issue(user_doc.id, user_data['bc_email'], user_data['name'])
     }
 
+@app.post("/api/auth/refresh")
+async def refresh_tokens(request: RefreshRequest):
+    """Trade a refresh token for a new access/refresh pair"""
+    try:
+        claims = token_service.decode(request.refresh_token, 'refresh')
+    except InvalidTokenError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    
+    # One read per refresh (not per request): picks up profile changes and deleted accounts
+    user_doc = db.collection('users').document(claims['sub']).get()
+    if not user_doc.exists:
+        raise HTTPException(status_code=401, detail="User not found")
+    
+    user_data = user_doc.to_dict()
+    return token_service.issue(user_doc.id, user_data['bc_email'], user_data['name'])
+
+@app.get("/api/auth/me", response_model=TokenUser)
+async def get_me(caller: TokenUser = Depends(get_current_user)):
+    """The signed-in user, straight from the access token"""
+    return caller
+
 @app.get("/api/users/{user_id}")
 async def get_user(user_id: str):
-    """Get user by ID"""
+    """Get user by ID - counts and recent functions only, lists are paginated endpoints"""
     
-    user_doc = db.collection('users').document(user_id).get()
+    user_doc = await asyncio.to_thread(get_user_doc, user_id)
     
-    if not user_doc.exists:
+    if user_doc is None:
         raise HTTPException(status_code=404, detail="User not found")
     
     user_data = user_doc.to_dict()
@@ -524,31 +617,38 @@ async def get_user(user_id: str):
         'created_at': user_data.get('created_at'),
         'personal_rating': user_data.get('personal_rating', 5),
         'instagram_handle': user_data.get('instagram_handle'),
-        'instagram_followers': user_data.get('instagram_followers', []),
         'instagram_follower_count': user_data.get('instagram_follower_count', 0),
-        'bc_club_affiliations': user_data.get('bc_club_affiliations', [])
+        'bc_club_affiliations': user_data.get('bc_club_affiliations', []),
+        'current_functions_count': user_data.get('current_functions_count', 0),
+        'past_functions_count': user_data.get('past_functions_count', 0),
+        'recent_current_functions': user_data.get('recent_current_functions', []),
+        'recent_past_functions': user_data.get('recent_past_functions', [])
     }
 
 @app.put("/api/users/{user_id}/instagram")
-async def update_instagram(user_id: str, data: InstagramUpdate):
+async def update_instagram(user_id: str, data: InstagramUpdate, caller: TokenUser = Depends(get_current_user)):
     """Update user's Instagram info"""
+    require_same_user(caller, user_id)
     
-    user_ref = db.collection('users').document(user_id)
-    user_doc = user_ref.get()
+    user_doc = await asyncio.to_thread(get_user_doc, user_id)
     
-    if not user_doc.exists:
+    if user_doc is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_ref.update({
-        'instagram_handle': data.instagram_handle,
-        'instagram_followers': data.instagram_followers
+    user_doc.reference.update({
+        'instagram_handle': data.instagram_handle
     })
+    # Only the added/removed handles are read and written
+    follower_count = await asyncio.to_thread(
+        user_activity.update_followers, user_id, data.add_followers, data.remove_followers
+    )
     
-    return {"message": "Instagram info updated successfully"}
+    return {"message": "Instagram info updated successfully", "instagram_follower_count": follower_count}
 
 @app.put("/api/users/{user_id}/clubs")
-async def update_clubs(user_id: str, data: ClubsUpdate):
+async def update_clubs(user_id: str, data: ClubsUpdate, caller: TokenUser = Depends(get_current_user)):
     """Update user's BC club affiliations"""
+    require_same_user(caller, user_id)
     
     user_ref = db.collection('users').document(user_id)
     user_doc = user_ref.get()
@@ -563,63 +663,73 @@ async def update_clubs(user_id: str, data: ClubsUpdate):
     return {"message": "Club affiliations updated successfully"}
 
 @app.post("/api/users/{user_id}/past-functions")
-async def add_past_function(user_id: str, function: FunctionHistory):
+async def add_past_function(user_id: str, function: FunctionHistory, caller: TokenUser = Depends(get_current_user)):
     """Add a completed function to user's history"""
+    require_same_user(caller, user_id)
     
-    user_ref = db.collection('users').document(user_id)
-    user_doc = user_ref.get()
+    user_doc = await asyncio.to_thread(get_user_doc, user_id)
     
-    if not user_doc.exists:
+    if user_doc is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_data = user_doc.to_dict()
-    past_functions = user_data.get('past_functions', [])
-    past_functions.append(function.dict())
+    await asyncio.to_thread(user_activity.add_function, user_id, PAST, function.dict())
     
     # Update personal rating based on after_function_user_rating
-    user_ref.update({
-        'past_functions': past_functions,
+    user_doc.reference.update({
         'personal_rating': function.after_function_user_rating
     })
     
     return {"message": "Past function added successfully"}
 
 @app.post("/api/users/{user_id}/current-functions")
-async def add_current_function(user_id: str, function: CurrentFunction):
+async def add_current_function(user_id: str, function: CurrentFunction, caller: TokenUser = Depends(get_current_user)):
     """Add an upcoming function"""
+    require_same_user(caller, user_id)
     
-    user_ref = db.collection('users').document(user_id)
-    user_doc = user_ref.get()
+    user_doc = await asyncio.to_thread(get_user_doc, user_id)
     
-    if not user_doc.exists:
+    if user_doc is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user_data = user_doc.to_dict()
-    current_functions = user_data.get('current_functions', [])
-    current_functions.append(function.dict())
-    
-    user_ref.update({
-        'current_functions': current_functions
-    })
+    await asyncio.to_thread(user_activity.add_function, user_id, CURRENT, function.dict())
     
     return {"message": "Current function added successfully", "function": function.dict()}
 
 @app.get("/api/users/{user_id}/functions")
-async def get_user_functions(user_id: str):
-    """Get user's past and current functions"""
-    
-    user_doc = db.collection('users').document(user_id).get()
-    
-    if not user_doc.exists:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user_data = user_doc.to_dict()
+async def get_user_functions(user_id: str, limit: int = 20, status: Optional[str] = None):
+    """
+    Get the first page of a user's current (soonest first) and past (most recent first) functions
+    Continue with /current-functions and /past-functions?start_after=<next cursor>
+    """
     
-    return {
-        'past_functions': user_data.get('past_functions', []),
-        'current_functions': user_data.get('current_functions', []),
-        'personal_rating': user_data.get('personal_rating', 5)
-    }
+    try:
+        user_doc = await asyncio.to_thread(get_user_doc, user_id)
+        
+        if user_doc is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        user_data = user_doc.to_dict()
+        (current_functions, current_cursor), (past_functions, past_cursor) = await asyncio.gather(
+            asyncio.to_thread(user_activity.list_functions, user_id, CURRENT, limit, None, status),
+            asyncio.to_thread(user_activity.list_functions, user_id, PAST, limit, None, status),
+        )
+        
+        return {
+            "user_id": user_id,
+            "current_functions": current_functions,
+            "past_functions": past_functions,
+            "current_count": user_data.get('current_functions_count', 0),
+            "past_count": user_data.get('past_functions_count', 0),
+            "next_current_cursor": current_cursor,
+            "next_past_cursor": past_cursor,
+            "personal_rating": user_data.get('personal_rating', 5)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error fetching user functions: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch user functions: {str(e)}")
 
 class ImageGenerationRequest(BaseModel):
     function_name: str
@@ -628,6 +738,7 @@ class ImageGenerationRequest(BaseModel):
     emoji_vibe: list[str]
     organizer_alias: str
     description: str = ""
+    regenerate: bool = False  # Skip the image cache and make a new one
 
 @app.post("/api/generate-invite-preview")
 async def generate_invite_preview(request: ImageGenerationRequest):
@@ -648,17 +759,27 @@ async def generate_invite_preview(request: ImageGenerationRequest):
         'description': request.description
     }
     
-    # Generate AI invite image
-    invite_image = generate_ai_invite_image(event_data)
+    # Generate AI invite image (or reuse the one made from identical inputs)
+    try:
+        invite = await generate_ai_invite_image(event_data, regenerate=request.regenerate)
+    except RenderQueueFullError as e:
+        # DALL-E is down and the fallback renderer is saturated - shed load
+        raise HTTPException(
+            status_code=429,
+            detail="Image generator is busy, please try again shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     
     return {
-        "invitation_image": invite_image,
+        "invitation_image": invite['invitation_image'],
+        "invitation_images": invite['invitation_images'],
         "message": "Image generated successfully"
     }
 
 @app.post("/api/events")
-async def create_event(event: EventCreate):
+async def create_event(event: EventCreate, caller: TokenUser = Depends(get_current_user)):
     """Create a new event/function"""
+    require_same_user(caller, event.organizer_user_id)
     
     print(f"\n{'='*60}")
     print(f"📥 EVENT CREATION REQUEST")
@@ -681,6 +802,9 @@ async def create_event(event: EventCreate):
         'public_or_private': event.public_or_private,
         'club_affiliated': event.club_affiliated,
         'club_name': event.club_name,
+        # Canonical ids so scoring does table lookups instead of string matching
+        'location_id': resolve_location(event.location),
+        'club_id': resolve_club(event.club_name) if event.club_affiliated else None,
         'organizer_user_id': event.organizer_user_id,
         'organizer_alias': event.organizer_alias,
         'created_at': datetime.utcnow().isoformat(),
@@ -688,28 +812,31 @@ async def create_event(event: EventCreate):
         'attendees': [],
         'invite_count': 0,
         'rsvp_count': 0,
-        'invitation_image': event.invitation_image  # Use pre-generated image
+        'invitation_image': event.invitation_image,  # Use pre-generated image
+        'invitation_images': event.invitation_images or {}
     }
     
     print(f"✅ Using pre-generated invitation image")
     
+    # Score once at write time so reads don't have to
+    score_fields = score_event_document(event_data)
+    if score_fields:
+        event_data.update(score_fields)
+    
     # Add to events collection
     events_ref = db.collection('events')
     doc_ref = events_ref.add(event_data)
     event_id = doc_ref[1].id
+    goated_leaderboard.mark_dirty()
     
     print(f"✅ Event created with ID: {event_id}")
     
     # Add to organizer's current_functions
     print(f"📝 Adding event to organizer's current_functions...")
     try:
-        user_ref = db.collection('users').document(event.organizer_user_id)
-        user_doc = user_ref.get()
+        user_doc = await asyncio.to_thread(get_user_doc, event.organizer_user_id)
         
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
-            current_functions = user_data.get('current_functions', [])
-            
+        if user_doc is not None:
             # Create the current function object
             current_function = {
                 'function_name': event.function_name,
@@ -720,15 +847,12 @@ async def create_event(event: EventCreate):
                 'public_or_private': event.public_or_private,
                 'number_of_invites': 0,
                 'number_of_invite_shares': 0,
-                'invitation_image': event_data.get('invitation_image')
+                'invitation_image': event_data.get('invitation_image'),
+                'invitation_images': event_data.get('invitation_images')
             }
             
-            current_functions.append(current_function)
-            
-            # Update user document
-            user_ref.update({
-                'current_functions': current_functions
-            })
+            # One subcollection document + the organizer's counter/summary
+            await asyncio.to_thread(user_activity.add_function, event.organizer_user_id, CURRENT, current_function)
             
             print(f"✅ Added to organizer's current_functions")
         else:
@@ -744,6 +868,60 @@ async def create_event(event: EventCreate):
         "event": event_data
     }
 
+# Registered before /api/events/{event_id}, which would otherwise match "historical"
+@app.get("/api/events/historical")
+async def get_historical_events(limit: int = 50, cursor: Optional[str] = None, fields: Optional[str] = None):
+    """
+    Get historical (past) events, most recent first
+    Pass the returned next_cursor as ?cursor= for the next page; ?fields=a,b or ?fields=all
+    picks the fields (default: the list view's, see historical_events.py)
+    """
+    
+    try:
+        event_list, next_cursor = await asyncio.to_thread(
+            list_historical_events, db, limit, cursor, parse_fields(fields)
+        )
+        
+        return {
+            "events": event_list,
+            "count": len(event_list),
+            "next_cursor": next_cursor
+        }
+        
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except Exception as e:
+        print(f"❌ Error fetching historical events: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch historical events: {str(e)}")
+
+@app.get("/api/events/historical/export")
+async def export_historical_events_stream(format: str = "ndjson", fields: Optional[str] = None, limit: Optional[int] = None):
+    """
+    Stream historical events (with ratings) as NDJSON or CSV, one cursor page at a time
+    ?fields=a,b picks the fields (?fields=all: whole documents, NDJSON only); ?limit= caps the rows
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    try:
+        selected_fields = export_fields(fields, format)
+    except ExportFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    stats = ExportStats()
+    chunks = export_historical_events(db, format, selected_fields, limit, stats=stats)
+    
+    def stream():
+        # Starlette iterates sync generators in its threadpool, so Firestore paging doesn't block the loop
+        yield from chunks
+        print(f"📤 Historical export ({format}): {stats.summary()}")
+    
+    filename = f"historical_events_{datetime.utcnow():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.get("/api/events/{event_id}")
 async def get_event(event_id: str):
     """Get event details"""
@@ -794,48 +972,14 @@ async def get_user_events(user_id: str, status: str = None):
     
     return event_list
 
-@app.get("/api/users/{user_id}/functions")
-async def get_user_functions(user_id: str):
-    """Get user's current and past functions"""
-    
-    try:
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        user_data = user_doc.to_dict()
-        current_functions = user_data.get('current_functions', [])
-        past_functions = user_data.get('past_functions', [])
-        
-        # Sort current by date (soonest first)
-        current_functions.sort(key=lambda x: x.get('date', ''))
-        
-        # Sort past by date (most recent first)
-        past_functions.sort(key=lambda x: x.get('date', ''), reverse=True)
-        
-        return {
-            "user_id": user_id,
-            "current_functions": current_functions,
-            "past_functions": past_functions,
-            "current_count": len(current_functions),
-            "past_count": len(past_functions)
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ Error fetching user functions: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch user functions: {str(e)}")
-
 class RSVPRequest(BaseModel):
     user_id: str
     user_alias: str
 
 @app.post("/api/events/{event_id}/rsvp")
-async def rsvp_to_event(event_id: str, rsvp_data: RSVPRequest):
+async def rsvp_to_event(event_id: str, rsvp_data: RSVPRequest, caller: TokenUser = Depends(get_current_user)):
     """RSVP to an event"""
+    require_same_user(caller, rsvp_data.user_id)
     
     print(f"\n{'='*60}")
     print(f"📝 RSVP REQUEST")
@@ -872,11 +1016,12 @@ async def rsvp_to_event(event_id: str, rsvp_data: RSVPRequest):
         'rsvp_time': datetime.utcnow().isoformat()
     })
     
-    # Update event
+    # Update event (rsvp_count is the model's target, not a feature - the stored score stays valid)
     event_ref.update({
         'attendees': attendees,
         'rsvp_count': len(attendees)
     })
+    goated_leaderboard.mark_dirty()
     
     print(f"✅ RSVP successful! Total attendees: {len(attendees)}/{max_capacity}")
     
@@ -912,8 +1057,9 @@ async def rsvp_to_event(event_id: str, rsvp_data: RSVPRequest):
     }
 
 @app.delete("/api/events/{event_id}/rsvp/{user_id}")
-async def cancel_rsvp(event_id: str, user_id: str):
+async def cancel_rsvp(event_id: str, user_id: str, caller: TokenUser = Depends(get_current_user)):
     """Cancel RSVP to an event"""
+    require_same_user(caller, user_id)
     
     print(f"\n{'='*60}")
     print(f"❌ CANCEL RSVP REQUEST")
@@ -940,6 +1086,7 @@ async def cancel_rsvp(event_id: str, user_id: str):
         'attendees': attendees,
         'rsvp_count': len(attendees)
     })
+    goated_leaderboard.mark_dirty()
     
     print(f"✅ RSVP cancelled! Total attendees: {len(attendees)}")
     
@@ -1019,44 +1166,18 @@ async def move_past_events_to_historical():
                         
                         # Move to organizer's past_functions
                         organizer_id = event_data.get('organizer_user_id')
-                        if organizer_id:
-                            user_ref = db.collection('users').document(organizer_id)
-                            user_doc = user_ref.get()
+                        if organizer_id and get_user_doc(organizer_id) is not None:
+                            # Move the function document, with completion data
+                            moved = user_activity.complete_function(organizer_id, event_id, {
+                                'status': 'completed',
+                                'completed_at': current_time.isoformat(),
+                                'final_attendee_count': event_data.get('rsvp_count', 0),
+                                'original_event_id': event_id
+                            })
                             
-                            if user_doc.exists:
-                                user_data = user_doc.to_dict()
-                                current_functions = user_data.get('current_functions', [])
-                                past_functions = user_data.get('past_functions', [])
-                                
-                                # Find and remove from current_functions
-                                function_to_move = None
-                                updated_current = []
-                                
-                                for func in current_functions:
-                                    if func.get('event_id') == event_id:
-                                        function_to_move = func
-                                    else:
-                                        updated_current.append(func)
-                                
-                                if function_to_move:
-                                    # Add to past_functions with completion data
-                                    past_function = {
-                                        **function_to_move,
-                                        'status': 'completed',
-                                        'completed_at': current_time.isoformat(),
-                                        'final_attendee_count': event_data.get('rsvp_count', 0),
-                                        'original_event_id': event_id
-                                    }
-                                    past_functions.append(past_function)
-                                    
-                                    # Update user document
-                                    user_ref.update({
-                                        'current_functions': updated_current,
-                                        'past_functions': past_functions
-                                    })
-                                    
-                                    updated_users.add(organizer_id)
-                                    print(f"  ✅ Moved to user's past_functions")
+                            if moved:
+                                updated_users.add(organizer_id)
+                                print(f"  ✅ Moved to user's past_functions")
                         
                         # Delete from events collection
                         events_ref.document(event_id).delete()
@@ -1074,6 +1195,11 @@ async def move_past_events_to_historical():
         print(f"Users updated: {len(updated_users)}")
         print(f"{'='*60}\n")
         
+        # New outcomes are training data for the goated model
+        if moved_count > 0:
+            schedule_goated_model_refresh()
+            goated_leaderboard.mark_dirty()
+        
         return {
             "message": "Past events moved to historical successfully",
             "events_moved": moved_count,
@@ -1086,12 +1212,13 @@ async def move_past_events_to_historical():
 
 
 @app.post("/api/users/{user_id}/move-past-functions")
-async def move_user_past_functions(user_id: str):
+async def move_user_past_functions(user_id: str, caller: TokenUser = Depends(get_current_user)):
     """
     Move only this user's past events to historical
     Called when user visits MyFunctions page
     More efficient than moving all events
     """
+    require_same_user(caller, user_id)
     
     print(f"\n{'='*60}")
     print(f"🕐 CHECKING USER'S PAST EVENTS")
@@ -1103,17 +1230,15 @@ async def move_user_past_functions(user_id: str):
         moved_count = 0
         
         # Get user document
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
+        user_doc = await asyncio.to_thread(get_user_doc, user_id)
         
-        if not user_doc.exists:
+        if user_doc is None:
             raise HTTPException(status_code=404, detail="User not found")
         
-        user_data = user_doc.to_dict()
-        current_functions = user_data.get('current_functions', [])
-        past_functions = user_data.get('past_functions', [])
-        
-        updated_current = []
+        # Only functions dated before now (date_ts is indexed); later or undated ones stay in current
+        current_functions = await asyncio.to_thread(
+            lambda: list(user_activity.iter_functions(user_id, CURRENT, before=datetime.now(timezone.utc)))
+        )
         
         # Check each current function
         for func in current_functions:
@@ -1185,15 +1310,13 @@ async def move_user_past_functions(user_id: str):
                             except Exception as e:
                                 print(f"  ⚠️ Could not send rating notifications: {e}")
                             
-                            # Add to past_functions with completion data
-                            past_function = {
-                                **func,
+                            # Move to past_functions with completion data
+                            user_activity.complete_function(user_id, event_id, {
                                 'status': 'completed',
                                 'completed_at': current_time.isoformat(),
                                 'final_attendee_count': event_data.get('rsvp_count', 0),
                                 'original_event_id': event_id
-                            }
-                            past_functions.append(past_function)
+                            })
                             
                             # Delete from events collection
                             event_ref.delete()
@@ -1202,35 +1325,24 @@ async def move_user_past_functions(user_id: str):
                         else:
                             # Event doesn't exist in events collection anymore
                             # Just move to past_functions
-                            past_function = {
-                                **func,
+                            user_activity.complete_function(user_id, event_id, {
                                 'status': 'completed',
                                 'completed_at': current_time.isoformat(),
                                 'final_attendee_count': 0,
                                 'original_event_id': event_id
-                            }
-                            past_functions.append(past_function)
+                            })
                             moved_count += 1
                             print(f"  ✅ Moved to past_functions (event already removed)\n")
-                    else:
-                        # Event hasn't passed yet - keep in current
-                        updated_current.append(func)
-                else:
-                    # No date - keep in current
-                    updated_current.append(func)
                     
             except Exception as e:
                 print(f"  ⚠️ Error processing function {event_id}: {e}")
-                # Keep in current if error
-                updated_current.append(func)
+                # Stays in current if error
         
-        # Update user document if changes were made
+        # Each move already updated the user's counters and summaries
         if moved_count > 0:
-            user_ref.update({
-                'current_functions': updated_current,
-                'past_functions': past_functions
-            })
-            print(f"✅ Updated user document: {moved_count} functions moved to past\n")
+            print(f"✅ {moved_count} functions moved to past\n")
+            schedule_goated_model_refresh()
+            goated_leaderboard.mark_dirty()
         else:
             print(f"✅ No past events to move\n")
         
@@ -1246,70 +1358,100 @@ async def move_user_past_functions(user_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to process past events: {str(e)}")
 
 
-@app.get("/api/events/historical")
-async def get_historical_events(limit: int = 50, offset: int = 0):
-    """Get historical (past) events"""
+async def list_user_activity(user_id, kind, limit, start_after, status=None):
+    """One page of a user's functions or followers -> (user_data, items, next cursor token)"""
+    user_doc = await asyncio.to_thread(get_user_doc, user_id)
+    
+    if user_doc is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
     try:
-        historical_ref = db.collection('historical_events')
-        
-        # Get events sorted by date (most recent first)
-        query = historical_ref.order_by('date', direction=firestore.Query.DESCENDING).limit(limit).offset(offset)
-        events = query.stream()
-        
-        event_list = []
-        for event in events:
-            event_data = event.to_dict()
-            event_data['event_id'] = event.id
-            event_data['original_event_id'] = event_data.get('original_event_id', event.id)
-            event_list.append(event_data)
+        if kind == FOLLOWERS:
+            items, next_cursor = await asyncio.to_thread(user_activity.list_followers, user_id, limit, start_after)
+        else:
+            items, next_cursor = await asyncio.to_thread(
+                user_activity.list_functions, user_id, kind, limit, start_after, status
+            )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid start_after cursor")
+    return user_doc.to_dict(), items, next_cursor
+
+@app.get("/api/users/{user_id}/past-functions")
+async def get_user_past_functions(user_id: str, limit: int = 20, start_after: Optional[str] = None,
+                                  status: Optional[str] = None):
+    """Get a page of user's past functions (completed events they organized), most recent first"""
+    
+    try:
+        user_data, past_functions, next_cursor = await list_user_activity(
+            user_id, PAST, limit, start_after, status
+        )
         
         return {
-            "events": event_list,
-            "count": len(event_list)
+            "user_id": user_id,
+            "past_functions": past_functions,
+            "count": user_data.get('past_functions_count', 0),
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error fetching historical events: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch historical events: {str(e)}")
-
+        print(f"❌ Error fetching past functions: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch past functions: {str(e)}")
 
-@app.get("/api/users/{user_id}/past-functions")
-async def get_user_past_functions(user_id: str):
-    """Get user's past functions (completed events they organized)"""
+@app.get("/api/users/{user_id}/current-functions")
+async def get_user_current_functions(user_id: str, limit: int = 20, start_after: Optional[str] = None,
+                                     status: Optional[str] = None):
+    """Get a page of user's upcoming functions, soonest first (?status=upcoming|live|cancelled)"""
     
     try:
-        user_ref = db.collection('users').document(user_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
-            raise HTTPException(status_code=404, detail="User not found")
+        user_data, current_functions, next_cursor = await list_user_activity(
+            user_id, CURRENT, limit, start_after, status
+        )
         
-        user_data = user_doc.to_dict()
-        past_functions = user_data.get('past_functions', [])
+        return {
+            "user_id": user_id,
+            "current_functions": current_functions,
+            "count": user_data.get('current_functions_count', 0),
+            "next_cursor": next_cursor
+        }
         
-        # Sort by date (most recent first)
-        past_functions.sort(key=lambda x: x.get('date', ''), reverse=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error fetching current functions: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch current functions: {str(e)}")
+
+@app.get("/api/users/{user_id}/instagram-followers")
+async def get_user_instagram_followers(user_id: str, limit: int = 50, start_after: Optional[str] = None):
+    """Get a page of user's Instagram follower handles"""
+    
+    try:
+        user_data, followers, next_cursor = await list_user_activity(
+            user_id, FOLLOWERS, limit, start_after
+        )
         
         return {
             "user_id": user_id,
-            "past_functions": past_functions,
-            "count": len(past_functions)
+            "instagram_followers": followers,
+            "count": user_data.get('instagram_follower_count', 0),
+            "next_cursor": next_cursor
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error fetching past functions: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch past functions: {str(e)}")
+        print(f"❌ Error fetching Instagram followers: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch Instagram followers: {str(e)}")
 
 class CancelEventRequest(BaseModel):
     user_id: str
     cancelled_same_day: bool = False
 
 @app.delete("/api/events/{event_id}")
-async def cancel_event(event_id: str, cancel_data: CancelEventRequest):
+async def cancel_event(event_id: str, cancel_data: CancelEventRequest, caller: TokenUser = Depends(get_current_user)):
     """Cancel an event and remove from user's current_functions"""
+    require_same_user(caller, cancel_data.user_id)
     
     print(f"\n{'='*60}")
     print(f"🗑️ EVENT CANCELLATION REQUEST")
@@ -1335,36 +1477,28 @@ async def cancel_event(event_id: str, cancel_data: CancelEventRequest):
     try:
         # Delete event from events collection
         event_ref.delete()
+        prediction_cache.invalidate_event(event_id)
+        goated_leaderboard.mark_dirty()
         print(f"✅ Event deleted from events collection")
         
         # Remove from user's current_functions
-        user_ref = db.collection('users').document(cancel_data.user_id)
-        user_doc = user_ref.get()
+        user_doc = await asyncio.to_thread(get_user_doc, cancel_data.user_id)
+        user_data = user_doc.to_dict() if user_doc else {}
         
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
-            current_functions = user_data.get('current_functions', [])
-            
+        if user_doc is not None:
             # Remove the cancelled function
-            updated_functions = [
-                func for func in current_functions 
-                if func.get('event_id') != event_id
-            ]
+            await asyncio.to_thread(user_activity.remove_function, cancel_data.user_id, CURRENT, event_id)
             
             # Apply rating penalty if cancelled same day
             current_rating = user_data.get('personal_rating', 5)
             
             if cancel_data.cancelled_same_day:
                 new_rating = max(1, current_rating - 2)  # Minimum rating is 1
-                user_ref.update({
-                    'current_functions': updated_functions,
+                user_doc.reference.update({
                     'personal_rating': new_rating
                 })
                 print(f"⚠️ Same-day cancellation! Rating decreased from {current_rating} to {new_rating}")
             else:
-                user_ref.update({
-                    'current_functions': updated_functions
-                })
                 print(f"✅ Event removed from user's current_functions (no rating penalty)")
         
         return {
@@ -1400,7 +1534,7 @@ class RateFunctionRequest(BaseModel):
 
 
 @app.post("/api/events/{event_id}/invite-users")
-async def invite_users_to_private_event(event_id: str, invite_data: InviteUsersRequest):
+async def invite_users_to_private_event(event_id: str, invite_data: InviteUsersRequest, caller: TokenUser = Depends(get_current_user)):
     """Invite specific users to a private event - sends notifications to each invited user"""
     
     print(f"\n{'='*60}")
@@ -1418,6 +1552,7 @@ async def invite_users_to_private_event(event_id: str, invite_data: InviteUsersR
             raise HTTPException(status_code=404, detail="Event not found")
         
         event_data = event_doc.to_dict()
+        require_same_user(caller, event_data.get('organizer_user_id'))
         
         # Verify event is private
         if event_data.get('public_or_private') != 'private':
@@ -1446,14 +1581,10 @@ async def invite_users_to_private_event(event_id: str, invite_data: InviteUsersR
                 # Find user by email or ID
                 users_ref = db.collection('users')
                 
-                # Try to find by email first (BC email)
+                # Try to find by email first (BC email) - a users_by_email get
                 if '@bc.edu' in user_identifier:
-                    user_query = users_ref.where('bc_email', '==', user_identifier).limit(1).stream()
-                    user_docs = list(user_query)
-                    if user_docs:
-                        user_doc = user_docs[0]
-                        invited_user_id = user_doc.id
-                    else:
+                    invited_user_id = user_directory.user_id_for_email(user_identifier)
+                    if not invited_user_id:
                         print(f"⚠️ User not found: {user_identifier}")
                         continue
                 else:
@@ -1558,8 +1689,9 @@ async def get_all_users():
     """Get all registered users (for private event invitations)"""
     
     try:
+        # Only the fields listed below are read, not whole user documents
         users_ref = db.collection('users')
-        users = users_ref.stream()
+        users = users_ref.select(['ai_generated_alias', 'bc_email', 'personal_rating']).stream()
         
         user_list = []
         for user_doc in users:
@@ -1612,8 +1744,9 @@ async def delete_notification(notification_id: str):
 
 
 @app.post("/api/events/{event_id}/rate")
-async def rate_function(event_id: str, rating_data: RateFunctionRequest):
+async def rate_function(event_id: str, rating_data: RateFunctionRequest, caller: TokenUser = Depends(get_current_user)):
     """Rate a completed function - users have 24 hours after event ends to rate"""
+    require_same_user(caller, rating_data.user_id)
     
     print(f"\n{'='*60}")
     print(f"⭐ RATING FUNCTION")
@@ -1723,49 +1856,20 @@ async def finalize_event_rating(event_id: str, event_data: dict, average_rating:
             return
         
         # Get organizer
-        user_ref = db.collection('users').document(organizer_id)
-        user_doc = user_ref.get()
-        
-        if not user_doc.exists:
+        if await asyncio.to_thread(get_user_doc, organizer_id) is None:
             print("⚠️ Organizer not found")
             return
         
-        user_data = user_doc.to_dict()
-        
-        # Get current personal rating
-        current_rating = user_data.get('personal_rating', 5)
-        
-        # Get past functions
-        past_functions = user_data.get('past_functions', [])
-        
-        # Count total rated functions
-        rated_functions_count = len([f for f in past_functions if f.get('final_rating')])
-        
-        # Calculate new weighted average
-        # Formula: (current_rating * rated_count + new_rating) / (rated_count + 1)
-        new_personal_rating = ((current_rating * rated_functions_count) + average_rating) / (rated_functions_count + 1)
-        
-        # Round to 1 decimal place
-        new_personal_rating = round(new_personal_rating, 1)
-        
-        # Update organizer's rating
-        user_ref.update({
-            'personal_rating': new_personal_rating
-        })
-        
-        # Update the function in past_functions with final rating
-        for func in past_functions:
-            if func.get('event_id') == event_id or func.get('original_event_id') == event_id:
-                func['final_rating'] = average_rating
-                func['rating_finalized'] = True
-                break
-        
-        user_ref.update({
-            'past_functions': past_functions
-        })
+        # Weighted average over rated functions (rated_functions_count counter), rounded to
+        # 1 decimal, and mark the past function with its final rating - one transaction
+        result = await asyncio.to_thread(user_activity.finalize_rating, organizer_id, event_id, average_rating)
+        if result is None:
+            print("⚠️ Organizer not found")
+            return
+        current_rating, new_personal_rating, rated_functions_count = result
         
         print(f"✅ Organizer rating updated: {current_rating} → {new_personal_rating}")
-        print(f"📊 Based on {rated_functions_count + 1} rated functions\n")
+        print(f"📊 Based on {rated_functions_count} rated functions\n")
         
         # Mark historical event as rating finalized
         historical_ref = db.collection('historical_events')
@@ -1789,6 +1893,9 @@ class Event(BaseModel):
     club_name: Optional[str]
     emoji_vibe: Optional[List[str]]
     invitation_image: Optional[str]
+    invitation_images: Optional[Dict[str, str]] = None
+    location_id: Optional[str] = None
+    club_id: Optional[str] = None
 
 
 
@@ -1804,127 +1911,17 @@ class SuccessPrediction(BaseModel):
     factors: Dict[str, float]
 
 
+class SuccessScoresRequest(BaseModel):
+    events: Optional[List[Event]] = None  # Score these events...
+    start: Optional[str] = None  # ...or every upcoming event in [start, end] (ISO dates)
+    end: Optional[str] = None
+
+
 class EventInsightsResponse(BaseModel):
     successPredictions: List[SuccessPrediction]
     recommendation: str
 
 
-def calculate_time_score(event_date: str) -> float:
-    """
-    Score based on timing (weekends, evenings = higher scores)
-    """
-    try:
-        dt = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
-        
-        # Weekend bonus
-        is_weekend = dt.weekday() >= 5  # Saturday=5, Sunday=6
-        weekend_score = 0.25 if is_weekend else 0.0
-        
-        # Evening bonus (7pm-11pm is prime time)
-        hour = dt.hour
-        if 19 <= hour <= 23:
-            time_score = 0.3
-        elif 17 <= hour < 19:
-            time_score = 0.2
-        elif 12 <= hour < 17:
-            time_score = 0.1
-        else:
-            time_score = 0.0
-        
-        return min(1.0, weekend_score + time_score)
-    except:
-        return 0.5  # Default if date parsing fails
-
-
-def calculate_location_score(location: str) -> float:
-    """
-    Score based on location popularity and accessibility
-    Popular dorms and central locations score higher
-    """
-    popular_locations = {
-        'gabelli hall': 0.9,
-        'stayer hall': 0.85,
-        '90 st. thomas more': 0.8,
-        'walsh hall': 0.85,
-        'ignacio hall': 0.75,
-        'the mods': 0.7,
-        'rubenstein hall': 0.75,
-        'voute hall': 0.7,
-        'welch hall': 0.65,
-        'roncalli hall': 0.65,
-    }
-    
-    location_lower = location.lower()
-    for key, score in popular_locations.items():
-        if key in location_lower:
-            return score
-    
-    return 0.5  # Default for unknown locations
-
-
-def calculate_capacity_utilization_score(rsvp_count: int, max_capacity: int) -> float:
-    """
-    Optimal utilization is 60-80% (not too empty, not too crowded)
-    """
-    if max_capacity == 0:
-        return 0.5
-    
-    utilization = rsvp_count / max_capacity
-    
-    if 0.6 <= utilization <= 0.8:
-        return 1.0  # Perfect utilization
-    elif 0.4 <= utilization < 0.6:
-        return 0.8
-    elif 0.3 <= utilization < 0.4:
-        return 0.6
-    elif 0.8 < utilization <= 0.95:
-        return 0.7  # A bit crowded but still good
-    elif utilization > 0.95:
-        return 0.5  # Too crowded, might turn people away
-    else:
-        return 0.3  # Too empty, might seem unpopular
-
-
-def calculate_club_affiliation_score(club_affiliated: bool, club_name: Optional[str]) -> float:
-    """
-    Club-affiliated events often have better organization and turnout
-    """
-    if not club_affiliated:
-        return 0.5
-    
-    # Known popular clubs (you'd populate this with actual data)
-    popular_clubs = {
-        'student government': 0.9,
-        'asian caucus': 0.85,
-        'acapella': 0.85,
-        'comedy club': 0.8,
-    }
-    
-    if club_name:
-        club_lower = club_name.lower()
-        for key, score in popular_clubs.items():
-            if key in club_lower:
-                return score
-    
-    return 0.7  # Default for club events
-
-
-def calculate_vibe_score(emoji_vibe: Optional[List[str]]) -> float:
-    """
-    Events with clear vibes/themes tend to attract their target audience better
-    """
-    if not emoji_vibe or len(emoji_vibe) == 0:
-        return 0.5
-    
-    # More emojis = clearer theme
-    if len(emoji_vibe) >= 3:
-        return 0.8
-    elif len(emoji_vibe) >= 2:
-        return 0.7
-    else:
-        return 0.6
-
-
 async def get_ai_insights(events: List[Event]) -> str:
     """
     Use OpenAI to generate natural language insights about the event lineup
@@ -1935,7 +1932,7 @@ async def get_ai_insights(events: List[Event]) -> str:
             for e in events[:5]  # Only send top 5 to keep prompt concise
         ])
         
-        response = openai_client.chat.completions.create(
+        return await cached_chat_completion(
             model="gpt-4o",  # or "gpt-4o-mini" for faster/cheaper
             messages=[
                 {
@@ -1955,8 +1952,6 @@ Respond in 1-2 sentences with actionable insights for students."""
             max_tokens=150,
             temperature=0.7
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         print(f"OpenAI API error: {e}")
         return "Check out the events happening around campus in the next 24 hours!"
@@ -1968,33 +1963,11 @@ def predict_event_success(event: Event) -> SuccessPrediction:
     """
     # Calculate individual factor scores
     time_score = calculate_time_score(event.date)
-    location_score = calculate_location_score(event.location)
+    location_score = calculate_location_score(event.location, event.location_id)
     capacity_score = calculate_capacity_utilization_score(event.rsvp_count, event.max_capacity)
-    club_score = calculate_club_affiliation_score(event.club_affiliated, event.club_name)
+    club_score = calculate_club_affiliation_score(event.club_affiliated, event.club_name, event.club_id)
     vibe_score = calculate_vibe_score(event.emoji_vibe)
     
-    # Weights for each factor (adjust based on historical data)
-    weights = {
-        'timing': 0.25,
-        'location': 0.20,
-        'current_interest': 0.30,  # RSVP momentum
-        'organization': 0.15,  # Club affiliation
-        'presentation': 0.10,  # Vibe/theme clarity
-    }
-    
-    # Calculate weighted score
-    weighted_score = (
-        time_score * weights['timing'] +
-        location_score * weights['location'] +
-        capacity_score * weights['current_interest'] +
-        club_score * weights['organization'] +
-        vibe_score * weights['presentation']
-    )
-    
-    # Convert to 0-100 scale
-    success_score = int(weighted_score * 100)
-    
-    # Generate reason based on top factors
     factors = {
         'timing': time_score,
         'location': location_score,
@@ -2003,18 +1976,15 @@ def predict_event_success(event: Event) -> SuccessPrediction:
         'presentation': vibe_score,
     }
     
-    # Find strongest and weakest factors
+    # Calculate weighted score (see HEURISTIC_WEIGHTS)
+    weighted_score = combine_factor_scores(factors)
+    
+    # Convert to 0-100 scale
+    success_score = int(weighted_score * 100)
+    
+    # Generate human-readable reason from the strongest and weakest factors
     sorted_factors = sorted(factors.items(), key=lambda x: x[1], reverse=True)
-    top_factor = sorted_factors[0]
-    weak_factor = sorted_factors[-1]
-    
-    # Generate human-readable reason
-    if success_score >= 80:
-        reason = f"Strong {top_factor[0].replace('_', ' ')} and good overall setup"
-    elif success_score >= 60:
-        reason = f"Good {top_factor[0].replace('_', ' ')}, but {weak_factor[0].replace('_', ' ')} could be improved"
-    else:
-        reason = f"Consider improving {weak_factor[0].replace('_', ' ')} and {sorted_factors[-2][0].replace('_', ' ')}"
+    reason = success_reason(success_score, [name for name, _ in sorted_factors])
     
     return SuccessPrediction(
         eventId=event.id,
@@ -2025,180 +1995,115 @@ def predict_event_success(event: Event) -> SuccessPrediction:
     )
 
 
-# ==================== ML MODEL FOR GOATED PREDICTION ====================
-
-# In-memory model storage (in production, use file storage or database)
-trained_model = None
-model_scaler = None
-
-def generate_historical_event_data(num_events=500):
+def predict_events_success(events: List[dict]) -> List[SuccessPrediction]:
     """
-    Generate synthetic historical event data for training
-    Based on BC campus event patterns
+    Batch version of predict_event_success (factor columns computed with NumPy)
+    Takes event dicts - pydantic Events, Firestore documents or frontend payloads
     """
-    locations = [
-        'Gabelli Hall', 'Stayer Hall', 'Ignacio Hall', 'Rubenstein Hall', 
-        'Voute Hall', 'The Mods', 'Thomas More Apartments', 'Walsh Hall',
-        'Claver Hall', 'Xavier Hall', 'Loyola Hall', 'Fenwick Hall',
-        'Cheverus Hall', 'Kostka Hall', 'Welch Hall', 'Roncalli Hall', '90 St. Thomas More'
+    batch = score_events_batch(events)
+    factor_rows = [
+        dict(zip(batch['factors'], values))
+        for values in zip(*(column.tolist() for column in batch['factors'].values()))
     ]
-    # Better locations: the mods, ignacio, rubi, then gabelli hall, 
-    # stayer hall, then 90 st. thomas more, walsh hall,
-    # then roncalli hall, kostka hall, welch hall, cheverus hall, xavier hall, loyola hall, fenwick hall, claver hall
-
-    
-    clubs = [
-        'BC Bop', 'Sexual Chocolate', 'FISTS', 'Fuego',
-        'BCCSS', 'ASO', 'Chess Club', 'VIP',
-        'Investment Club', 'Theater Club', 'Heights Men', 'Model United Nations'
-    ]
-    # Better club functions: sexual chocolate, fists, fuego, vip, 
-    # aso, bccss, chess club, investment club, 
-    # theater club, heights men, model united nations
-    
-    emoji_sets = [
-        ['🎉', '🔥', '🎵'], ['💃', '🕺', '🎶'], ['🍻', '🎊', '🎈'],
-        ['🎮', '🏆', '🎯'], ['🍕', '🎂', '🍰'], ['🎨', '🖼️', '✨'],
-        ['🎬', '🎭', '🌟'], ['⚽', '🏀', '🏈'], ['📚', '✏️', '💡'],
-        ['🌮', '🍔', '🍟']
-    ]
-    # Fire party music beer emojis preferred
-    historical_events = []
-    now = datetime.now()
-    
-    for i in range(num_events):
-        # Random date in the past (last 6 months)
-        days_ago = random.randint(1, 180)
-        event_date = now - timedelta(days=days_ago)
-        
-        # Simulate different times
-        event_date = event_date.replace(
-            hour=random.choice([18, 19, 20, 21, 22]),
-            minute=random.randint(0, 59)
+    return [
+        SuccessPrediction(
+            eventId=event.get('id') or event.get('event_id') or '',
+            eventName=event.get('function_name', 'Unknown Event'),
+            score=int(score),
+            reason=reason,
+            factors=factors,
         )
-        
-        # Some events on weekends (more popular)
-        if random.random() < 0.4:
-            days_to_weekend = 5 - event_date.weekday()
-            event_date += timedelta(days=days_to_weekend)
-            event_date = event_date.replace(hour=20)  # Weekend evening
-        
-        # Determine if club affiliated
-        club_affiliated = random.random() < 0.6
-        
-        # Generate realistic RSVP count based on factors
-        max_capacity = random.choice([20, 30, 40, 50, 75, 100])
-        
-        # Success factors:
-        # - Weekend events get more RSVPs
-        # - Evening events (7-11pm) get more
-        # - Club events get more
-        # - Smaller venues can hit capacity more easily
-        
-        base_rsvp = random.randint(5, 30)
-        if event_date.weekday() >= 5:  # Weekend
-            base_rsvp += random.randint(10, 25)
-        if 19 <= event_date.hour <= 22:  # Evening
-            base_rsvp += random.randint(5, 20)
-        if club_affiliated:
-            base_rsvp += random.randint(5, 15)
-        
-        # Popular locations get more RSVPs
-        if random.random() < 0.3:  # 30% chance of high attendance
-            base_rsvp = min(max_capacity, base_rsvp + random.randint(20, 40))
-        
-        rsvp_count = min(max_capacity, max(0, base_rsvp + random.randint(-10, 10)))
-        
-        historical_events.append({
-            'id': f'hist_{i}',
-            'function_name': f'{"Club" if club_affiliated else ""} Event {i+1}',
-            'location': random.choice(locations),
-            'date': event_date.isoformat(),
-            'organizer_alias': random.choice(clubs) if club_affiliated else f'Student_{random.randint(1, 1000)}',
-            'rsvp_count': rsvp_count,
-            'max_capacity': max_capacity,
-            'club_affiliated': club_affiliated,
-            'club_name': random.choice(clubs) if club_affiliated else None,
-            'emoji_vibe': random.choice(emoji_sets),
-            'invitation_image': None if random.random() < 0.5 else f'https://example.com/image_{i}.jpg'
-        })
-    
-    return historical_events
+        for event, score, reason, factors in zip(events, batch['scores'], batch['reasons'], factor_rows)
+    ]
 
 
-def extract_features(event):
-    """
-    Extract ML features from an event for model training/prediction
+def get_upcoming_events_in_window(start: datetime, end: datetime) -> List[dict]:
     """
-    try:
-        dt = datetime.fromisoformat(event.get('date', event.get('date')).replace('Z', '+00:00'))
-    except:
-        dt = datetime.now()
-    
-    features = np.array([
-        # Time features
-        dt.weekday(),  # 0=Monday, 6=Sunday
-        dt.hour,  # Hour of day
-        1.0 if dt.weekday() >= 5 else 0.0,  # Is weekend
-        1.0 if 19 <= dt.hour <= 23 else 0.0,  # Is evening (7-11pm)
-        
-        # Location features (one-hot encoded for popular locations)
-        1.0 if 'Gabelli' in event.get('location', '') else 0.0,
-        1.0 if 'Stayer' in event.get('location', '') else 0.0,
-        1.0 if 'Ignacio' in event.get('location', '') else 0.0,
-        1.0 if 'Mods' in event.get('location', '') else 0.0,
+    Upcoming events whose date falls in [start, end]
 
-        # TODO: use is_holiday increase if halloween, marathon monday, st patricks day 
-        
-        # Organization features
-        1.0 if event.get('club_affiliated', False) else 0.0,
-        len(event.get('emoji_vibe', [])) if event.get('emoji_vibe') else 0.0,  # Engagement vibe
-        
-        # Capacity features
-        event.get('max_capacity', 50),
-        (event.get('max_capacity', 50) - event.get('rsvp_count', 0)) / max(event.get('max_capacity', 50), 1),  # Capacity remaining ratio
-        
-        # Historical RSVP if available (for training data)
-        event.get('rsvp_count', 0) if 'rsvp_count' in event else 0.0,
-    ])
-    
-    return features
+    `date` is stored as ISO text, which sorts chronologically, so Firestore
+    range-filters it (composite index: status ASC, date ASC) and only the
+    window is read. The parsed check below drops the odd format the string
+    bounds let through (a 'Z' suffix, a missing seconds part).
+    """
+    query = (db.collection('events')
+             .where('status', '==', 'upcoming')
+             .where('date', '>=', start.isoformat(timespec='minutes'))
+             .where('date', '<=', end.isoformat() + '\uf8ff')
+             .order_by('date'))
+    events = []
+    for doc in iter_query_documents(query):
+        event = doc.to_dict()
+        try:
+            event_date = datetime.fromisoformat(event.get('date', '').replace('Z', '+00:00')).replace(tzinfo=None)
+        except (AttributeError, ValueError):
+            continue
+        if start <= event_date <= end:
+            event['id'] = doc.id
+            events.append(event)
+    return events
 
 
-def train_goated_model():
+@app.post("/api/events/success-scores")
+async def get_events_success_scores(request: SuccessScoresRequest):
     """
-    Train the ML model on historical event data
+    Heuristic success scores for many events in one call
+    Pass `events`, or a `start`/`end` window (defaults to the next 24 hours)
+    Doesn't need the goated model, so it works as a fallback while no model is live
     """
-    global trained_model, model_scaler
-    
-    print("🎓 Training Goated Event Prediction Model...")
-    
-    # Generate historical training data
-    historical_events = generate_historical_event_data(num_events=500)
-    
-    # Extract features and labels
-    X = np.array([extract_features(event) for event in historical_events])
-    # Use rsvp_count as the target (how successful the event was)
-    y = np.array([event.get('rsvp_count', 0) for event in historical_events])
-    
-    # Normalize features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    # Train Random Forest model
-    model = RandomForestRegressor(
-        n_estimators=100,
-        max_depth=10,
-        random_state=42,
-        n_jobs=-1
-    )
-    model.fit(X_scaled, y)
-    
-    trained_model = model
-    model_scaler = scaler
+    try:
+        if request.events is not None:
+            events = [event.model_dump() for event in request.events]
+        else:
+            try:
+                start = datetime.fromisoformat(request.start.replace('Z', '+00:00')).replace(tzinfo=None) \
+                    if request.start else datetime.utcnow()
+                end = datetime.fromisoformat(request.end.replace('Z', '+00:00')).replace(tzinfo=None) \
+                    if request.end else start + timedelta(hours=24)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="start and end must be ISO dates")
+            events = await asyncio.to_thread(get_upcoming_events_in_window, start, end)
+        
+        with metrics.timer('heuristic.batch_seconds'):
+            predictions = predict_events_success(events)
+        metrics.incr('heuristic.events_scored', len(predictions))
+        
+        predictions.sort(key=lambda p: p.score, reverse=True)
+        return {
+            'successPredictions': predictions,
+            'count': len(predictions)
+        }
     
-    print(f"✅ Model trained on {len(historical_events)} historical events")
-    return model, scaler
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Error scoring events: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to score events: {str(e)}")
+
+
+# ==================== ML MODEL FOR GOATED PREDICTION ====================
+
+# The served model + scaler live together in one immutable bundle.
+# Retraining happens in a separate process and is swapped in atomically.
+model_registry = ModelRegistry()
+# Features extracted from real historical_events, cached locally between runs
+feature_store = FeatureStore()
+training_service = TrainingService(model_registry, store=feature_store)
+# Goated predictions keyed by model version + feature vector hash
+prediction_cache = PredictionCache(maxsize=4096)
+
+
+def heuristic_goated_prediction(event):
+    """Goated prediction from the success heuristic, served until a model bundle is published"""
+    metrics.incr('scoring.heuristic_fallbacks')
+    score = predict_events_success([event])[0].score
+    max_capacity = event.get('max_capacity', 50)
+    return {
+        'predicted_rsvps': int(round(score / 100 * max_capacity)),
+        'goated_score': score,
+        'max_capacity': max_capacity,
+        'model_version': None
+    }
 
 
 def predict_event_goated_score(event):
@@ -2206,102 +2111,324 @@ def predict_event_goated_score(event):
     Predict how "goated" (successful) an event will be
     Returns a score 0-100
     """
-    global trained_model, model_scaler
+    # Read the bundle once so model and scaler always come from the same training run
+    bundle = model_registry.current()
     
-    # Train model if not already trained
-    if trained_model is None or model_scaler is None:
-        train_goated_model()
+    # No model published yet (first training still running in the background) -
+    # never train on a request or leaderboard path, use the heuristic instead
+    if bundle is None:
+        return heuristic_goated_prediction(event)
     
     # Extract features
     features = extract_features(event)
-    features_scaled = model_scaler.transform(features.reshape(1, -1))
+    
+    # Same model + same features = same score, so skip the model entirely on a hit
+    cache_key = prediction_cache.key(bundle.version, features)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
     
     # Predict
-    predicted_rsvps = trained_model.predict(features_scaled)[0]
+    predicted_rsvps = bundle.predict(features.reshape(1, -1))[0]
     max_capacity = event.get('max_capacity', 50)
     
     # Convert predicted RSVPs to a 0-100 score
     # Based on how close to capacity it will get
     score = min(100, (predicted_rsvps / max(max_capacity, 1)) * 100)
     
-    return {
+    prediction = {
         'predicted_rsvps': int(predicted_rsvps),
         'goated_score': int(score),
-        'max_capacity': max_capacity
+        'max_capacity': max_capacity,
+        'model_version': bundle.version
     }
+    prediction_cache.put(cache_key, prediction, event_id=event.get('event_id') or event.get('id'))
+    return dict(prediction)
 
 
-@app.get("/api/goated-prediction")
-async def get_goated_prediction():
+# ==================== WRITE-TIME SCORING ====================
+# Events are scored when they're created or their RSVPs change, and the result
+# is saved on the event document. Reads just return the stored values.
+
+def get_event_factors(event, prediction):
+    """Factor breakdown shown in the AI insights panel"""
+    return {
+        'timing': get_timing_score(event),
+        'location': get_location_score(event),
+        'current_interest': prediction['goated_score'] / 100.0,
+        'organization': 0.7 if event.get('club_affiliated') else 0.5,
+        'presentation': len(event.get('emoji_vibe') or []) / 5.0,
+    }
+
+
+def score_event_document(event):
     """
-    Get the most "goated" (best predicted) event in the next 10 days
-    Runs ML model to find the event most likely to be successful
+    Compute the score fields to store on an event document
+    Returns None if no model has been trained yet (the re-score pass fills them in later)
     """
-    try:
-        # Fetch upcoming events
-        events_ref = db.collection('events')
-        events = events_ref.where('public_or_private', '==', 'public').where('status', '==', 'upcoming').stream()
-        
-        all_events = []
-        for event_doc in events:
-            event = event_doc.to_dict()
-            all_events.append(event)
-        
-        if not all_events:
-            return {
-                'goated_event': None,
-                'message': 'No upcoming events to predict'
-            }
+    if model_registry.current() is None:
+        return None
+    
+    prediction = predict_event_goated_score(event)
+    metrics.incr('scoring.write_time')
+    return {
+        'goated_score': prediction['goated_score'],
+        'predicted_rsvps': prediction['predicted_rsvps'],
+        'model_version': prediction['model_version'],
+        'score_features': extract_features(event).tolist(),
+        'score_factors': get_event_factors(event, prediction),
+        'score_reason': get_prediction_reason(event, prediction),
+        'scored_at': datetime.utcnow().isoformat()
+    }
+
+
+def stored_goated_prediction(event):
+    """The prediction saved on the event at write time, if the live model produced it"""
+    bundle = model_registry.current()
+    if bundle is None or event.get('goated_score') is None or event.get('model_version') != bundle.version:
+        return None
+    
+    return {
+        'predicted_rsvps': event.get('predicted_rsvps', 0),
+        'goated_score': event['goated_score'],
+        'max_capacity': event.get('max_capacity', 50),
+        'model_version': event['model_version']
+    }
+
+
+def get_event_goated_prediction(event):
+    """Stored write-time score when it's current, otherwise compute (and cache) it"""
+    stored = stored_goated_prediction(event)
+    if stored is not None:
+        metrics.incr('scoring.stored_reads')
+        return stored
+    
+    metrics.incr('scoring.read_time_fallbacks')
+    return predict_event_goated_score(event)
+
+
+def rescore_upcoming_events():
+    """
+    Re-score every upcoming event whose stored score came from another model version
+    Blocking - runs in a worker thread after a model swap
+    """
+    bundle = model_registry.current()
+    if bundle is None:
+        return 0
+    
+    start = time.perf_counter()
+    query = db.collection('events').where('status', '==', 'upcoming').order_by(firestore.FieldPath.document_id())
+    rescored = 0
+    
+    for event_doc in iter_query_documents(query, page_size=200):
+        event = event_doc.to_dict()
+        if event.get('model_version') == bundle.version:
+            continue
         
-        # Filter to next 10 days
-        now = datetime.now()
-        ten_days_from_now = now + timedelta(days=10)
+        event['event_id'] = event_doc.id
+        score_fields = score_event_document(event)
+        if score_fields is None:
+            continue
         
-        upcoming_events = []
-        for event in all_events:
-            try:
-                event_date = datetime.fromisoformat(event.get('date', '').replace('Z', '+00:00'))
-                event_date = event_date.replace(tzinfo=None)
-                
-                if now <= event_date <= ten_days_from_now:
-                    upcoming_events.append(event)
-            except:
+        try:
+            # Skip the event if an RSVP rewrote it (and its score) since we read it
+            event_doc.reference.update(
+                score_fields,
+                option=db.write_option(last_update_time=event_doc.update_time)
+            )
+            rescored += 1
+        except Exception as e:
+            print(f"  ⚠️ Skipped re-scoring event {event_doc.id}: {e}")
+    
+    metrics.observe('scoring.rescore_pass_seconds', time.perf_counter() - start)
+    metrics.incr('scoring.rescored_events', rescored)
+    print(f"🔄 Re-scored {rescored} upcoming events with model {bundle.version}")
+    return rescored
+
+
+def schedule_event_rescore(bundle):
+    """Model swap listener: kick off a background re-score pass"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Not on the event loop (e.g. a script) - nothing to schedule on
+        return
+    spawn_background(asyncio.to_thread(rescore_upcoming_events))
+
+
+model_registry.add_listener(schedule_event_rescore)
+
+
+async def refresh_goated_model(full: bool = False, backend: Optional[str] = None):
+    """
+    Pull new historical_events into the feature store, then retrain on them
+    (incrementally when possible). Returns the published bundle or None.
+    """
+    new_rows = await asyncio.to_thread(sync_historical_events, db, feature_store)
+    metrics.incr('model.new_training_rows', new_rows)
+    return await training_service.retrain(full=full, backend=backend)
+
+
+def schedule_goated_model_refresh():
+    """Fire-and-forget refresh, e.g. after events are archived"""
+    async def _refresh():
+        try:
+            await refresh_goated_model()
+        except ModelValidationError as e:
+            print(f"⚠️ Candidate model rejected: {e}")
+        except Exception as e:
+            print(f"⚠️ Background model training failed: {e}")
+    spawn_background(_refresh())
+
+
+@app.on_event("startup")
+async def warm_goated_model():
+    """Train the first model in the background so the first request doesn't pay for it"""
+    schedule_goated_model_refresh()
+
+
+@app.on_event("shutdown")
+async def stop_training_service():
+    training_service.shutdown()
+
+
+@app.post("/api/model/retrain")
+async def retrain_goated_model(full: bool = False, backend: Optional[str] = None):
+    """
+    Retrain the goated model in the training process and hot swap it in if it validates
+    Only new historical events are used unless full=true
+    `backend` picks a predictor (random_forest, hist_gradient_boosting, linear, heuristic)
+    """
+    if backend is not None and backend not in PREDICTOR_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown backend '{backend}'. Options: {', '.join(PREDICTOR_BACKENDS)}"
+        )
+    
+    try:
+        bundle = await refresh_goated_model(full=full, backend=backend)
+    except ModelValidationError as e:
+        raise HTTPException(status_code=409, detail=f"Candidate model rejected: {str(e)}")
+    except Exception as e:
+        print(f"❌ Error retraining model: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to retrain model: {str(e)}")
+    
+    if bundle is None:
+        return {
+            "message": "No new historical events to train on",
+            "model": model_registry.current().describe() if model_registry.current() else None
+        }
+    
+    return {
+        "message": "Model retrained and published",
+        "model": bundle.describe()
+    }
+
+
+@app.post("/api/model/rollback")
+async def rollback_goated_model():
+    """Swap back to the previously served model bundle"""
+    bundle = model_registry.rollback()
+    if bundle is None:
+        raise HTTPException(status_code=409, detail="No previous model to roll back to")
+    
+    return {
+        "message": "Rolled back to previous model",
+        "model": bundle.describe()
+    }
+
+
+@app.get("/api/model")
+async def get_goated_model_status():
+    """Currently served model, rollback history and training/swap metrics"""
+    bundle = model_registry.current()
+    snapshot = metrics.snapshot()
+    return {
+        "current": bundle.describe() if bundle else None,
+        "history": model_registry.history(),
+        "prediction_cache": prediction_cache.stats(),
+        "metrics": {
+            "counters": {k: v for k, v in snapshot['counters'].items() if k.startswith('model.')},
+            "timings": {k: v for k, v in snapshot['timings'].items() if k.startswith('model.')}
+        }
+    }
+
+
+@app.get("/storage/{object_name:path}")
+async def get_storage_object(object_name: str):
+    """Serve public objects of the local storage backend (STORAGE_BACKEND=local)"""
+    blob = bucket.public_blob(object_name) if isinstance(bucket, LocalBucket) else None
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Object not found")
+    
+    metadata = blob.metadata()
+    headers = {"Cache-Control": metadata['cache_control']} if metadata.get('cache_control') else None
+    return FileResponse(blob.path, media_type=metadata.get('content_type'), headers=headers)
+
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """All in-process metrics (counters, gauges, timing summaries) plus cache hit rates"""
+    return {
+        **metrics.snapshot(),
+        "caches": {
+            "prediction_cache": prediction_cache.stats(),
+            "llm_cache": llm_cache.stats(),
+        },
+        "llm_circuits": llm_gateway.stats(),
+        "render_service": render_service.stats()
+    }
+
+
+# ==================== GOATED LEADERBOARD ====================
+# Top upcoming public events by goated score, rebuilt in the background
+# (timer + event/RSVP/model changes) so /api/goated-prediction is just a read.
+
+GOATED_LEADERBOARD_SIZE = 10
+
+
+def _goated_confidence(score):
+    return 'High' if score > 80 else 'Medium' if score > 60 else 'Low'
+
+
+def build_goated_leaderboard():
+    """
+    Score upcoming public events in the next 10 days and return the top ones
+    Blocking - runs in a worker thread. Returns (entries, total_events_analyzed).
+    """
+    # Fetch upcoming events
+    events_ref = db.collection('events')
+    events = events_ref.where('public_or_private', '==', 'public').where('status', '==', 'upcoming').stream()
+    
+    # Filter to next 10 days
+    now = datetime.now()
+    ten_days_from_now = now + timedelta(days=10)
+    
+    predictions = []
+    for event_doc in events:
+        event = event_doc.to_dict()
+        event['event_id'] = event_doc.id
+        try:
+            event_date = datetime.fromisoformat(event.get('date', '').replace('Z', '+00:00'))
+            event_date = event_date.replace(tzinfo=None)
+            if not (now <= event_date <= ten_days_from_now):
                 continue
-        
-        if not upcoming_events:
-            return {
-                'goated_event': None,
-                'message': 'No events in the next 10 days'
-            }
+        except:
+            continue
         
         # Predict goated scores for each event
-        predictions = []
-        for event in upcoming_events:
-            try:
-                prediction = predict_event_goated_score(event)
-                predictions.append({
-                    'event': event,
-                    'prediction': prediction
-                })
-            except Exception as e:
-                print(f"Error predicting for event: {e}")
-                continue
-        
-        if not predictions:
-            return {
-                'goated_event': None,
-                'message': 'Error generating predictions'
-            }
-        
-        # Find the most goated event
-        predictions.sort(key=lambda x: x['prediction']['goated_score'], reverse=True)
-        goated_event = predictions[0]
-        
-        # Format response
-        event = goated_event['event']
-        pred = goated_event['prediction']
-        
-        return {
+        try:
+            predictions.append((event, get_event_goated_prediction(event)))
+        except Exception as e:
+            print(f"Error predicting for event: {e}")
+            continue
+    
+    # Most goated first
+    predictions.sort(key=lambda x: x[1]['goated_score'], reverse=True)
+    
+    entries = []
+    for event, pred in predictions[:GOATED_LEADERBOARD_SIZE]:
+        entries.append({
             'goated_event': {
                 'id': event.get('event_id', event.get('id')),
                 'function_name': event.get('function_name', 'Unknown Event'),
@@ -2313,14 +2440,93 @@ async def get_goated_prediction():
                 'max_capacity': event.get('max_capacity', 50),
                 'emoji_vibe': event.get('emoji_vibe', []),
                 'invitation_image': event.get('invitation_image'),
+                'invitation_images': event.get('invitation_images') or {},
             },
             'prediction': {
                 'goated_score': pred['goated_score'],
                 'predicted_rsvps': pred['predicted_rsvps'],
-                'confidence': 'High' if pred['goated_score'] > 80 else 'Medium' if pred['goated_score'] > 60 else 'Low'
-            },
-            'total_events_analyzed': len(predictions),
-            'message': f"🏆 Most Goated Event: {pred['goated_score']}% predicted success"
+                'confidence': _goated_confidence(pred['goated_score'])
+            }
+        })
+    
+    return entries, len(predictions)
+
+
+def save_goated_leaderboard(snapshot):
+    """Persist the leaderboard as a summary document (survives restarts)"""
+    db.collection('leaderboards').document('goated_events').set({
+        **snapshot,
+        'entries': list(snapshot['entries'])
+    })
+
+
+def load_goated_leaderboard():
+    summary = db.collection('leaderboards').document('goated_events').get()
+    return summary.to_dict() if summary.exists else None
+
+
+goated_leaderboard = Leaderboard(
+    'goated_leaderboard',
+    rebuild=build_goated_leaderboard,
+    refresh_interval=300,
+    on_refresh=save_goated_leaderboard
+)
+
+# A new model changes every score
+model_registry.add_listener(lambda bundle: goated_leaderboard.mark_dirty())
+
+
+@app.on_event("startup")
+async def start_goated_leaderboard():
+    try:
+        goated_leaderboard.load(await asyncio.to_thread(load_goated_leaderboard))
+    except Exception as e:
+        print(f"⚠️ Could not load saved goated leaderboard: {e}")
+    goated_leaderboard.mark_dirty()
+    spawn_background(goated_leaderboard.run())
+
+
+def _not_started(entry, now):
+    try:
+        event_date = datetime.fromisoformat(entry['goated_event']['date'].replace('Z', '+00:00'))
+        return event_date.replace(tzinfo=None) >= now
+    except:
+        return False
+
+
+@app.get("/api/goated-prediction")
+async def get_goated_prediction(k: int = 1):
+    """
+    Get the most "goated" (best predicted) event in the next 10 days
+    Reads the precomputed leaderboard; ?k= returns the top k events in top_events
+    """
+    try:
+        k = max(1, min(k, GOATED_LEADERBOARD_SIZE))
+        
+        # Only the very first request after startup waits for a build
+        if not goated_leaderboard.ready:
+            await goated_leaderboard.refresh()
+        snapshot = goated_leaderboard.snapshot()
+        
+        # Drop anything that started since the last rebuild
+        now = datetime.now()
+        entries = [entry for entry in snapshot['entries'] if _not_started(entry, now)][:k]
+        
+        if not entries:
+            return {
+                'goated_event': None,
+                'top_events': [],
+                'message': 'No events in the next 10 days'
+            }
+        
+        best = entries[0]
+        return {
+            'goated_event': best['goated_event'],
+            'prediction': best['prediction'],
+            'top_events': entries,
+            'total_events_analyzed': snapshot['total_analyzed'],
+            'leaderboard_refreshed_at': snapshot['refreshed_at'],
+            'message': f"🏆 Most Goated Event: {best['prediction']['goated_score']}% predicted success"
         }
         
     except Exception as e:
@@ -2328,6 +2534,41 @@ async def get_goated_prediction():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_insight_predictions(events):
+    """Success predictions for the insights panel, best first"""
+    # No model published yet (first training still running) - use the
+    # heuristic rather than making this request train one inline
+    if model_registry.current() is None:
+        metrics.incr('scoring.heuristic_fallbacks')
+        predictions = [p.model_dump() for p in predict_events_success(events)]
+        predictions.sort(key=lambda x: x['score'], reverse=True)
+        return predictions
+    
+    # Generate predictions for each event using ML model
+    predictions = []
+    for event in events:
+        try:
+            # Stored write-time score when current, model otherwise
+            prediction = get_event_goated_prediction(event)
+            is_stored = (event.get('model_version') == prediction['model_version']
+                         and event.get('score_factors') is not None)
+            
+            predictions.append({
+                'eventId': event.get('id', event.get('event_id', '')),
+                'eventName': event.get('function_name', 'Unknown Event'),
+                'score': prediction['goated_score'],
+                'reason': event.get('score_reason') if is_stored else get_prediction_reason(event, prediction),
+                'factors': event['score_factors'] if is_stored else get_event_factors(event, prediction)
+            })
+        except Exception as e:
+            print(f"Error predicting for event {event.get('id')}: {e}")
+            continue
+    
+    # Sort by score
+    predictions.sort(key=lambda x: x['score'], reverse=True)
+    return predictions
+
+
 @app.post("/api/ai/event-insights")
 async def get_event_insights(request: dict):
     """
@@ -2340,35 +2581,10 @@ async def get_event_insights(request: dict):
         if not events:
             return {
                 'successPredictions': [],
-                'recommendation': 'No events to analyze in the next 24 hours.'
+                'recommendation': NO_EVENTS_RECOMMENDATION
             }
         
-        # Generate predictions for each event using ML model
-        predictions = []
-        for event in events:
-            try:
-                # Use your existing predict_event_goated_score function
-                prediction = predict_event_goated_score(event)
-                
-                predictions.append({
-                    'eventId': event.get('id', ''),
-                    'eventName': event.get('function_name', 'Unknown Event'),
-                    'score': prediction['goated_score'],
-                    'reason': get_prediction_reason(event, prediction),
-                    'factors': {
-                        'timing': get_timing_score(event),
-                        'location': get_location_score(event),
-                        'current_interest': prediction['goated_score'] / 100.0,
-                        'organization': 0.7 if event.get('club_affiliated') else 0.5,
-                        'presentation': len(event.get('emoji_vibe', [])) / 5.0,
-                    }
-                })
-            except Exception as e:
-                print(f"Error predicting for event {event.get('id')}: {e}")
-                continue
-        
-        # Sort by score
-        predictions.sort(key=lambda x: x['score'], reverse=True)
+        predictions = build_insight_predictions(events)
         
         # Generate natural language recommendation using OpenAI
         recommendation = await generate_insights_recommendation(events, predictions)
@@ -2385,6 +2601,58 @@ async def get_event_insights(request: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(name, data):
+    """One Server-Sent Event frame"""
+    return f"event: {name}\ndata: {json.dumps(data, default=float)}\n\n"
+
+
+@app.post("/api/ai/event-insights/stream")
+async def stream_event_insights(request: dict):
+    """
+    Streaming version of /api/ai/event-insights (Server-Sent Events)
+    
+    Sends `predictions` as soon as they're computed, then the recommendation
+    as `token` events while the LLM generates it, then `done` with the full text.
+    """
+    events = request.get('events', [])
+    
+    async def event_stream():
+        start = time.perf_counter()
+        try:
+            predictions = build_insight_predictions(events) if events else []
+        except Exception as e:
+            print(f"Error in event insights: {e}")
+            yield sse_event('error', {'detail': str(e)})
+            return
+        
+        yield sse_event('predictions', {'successPredictions': predictions})
+        metrics.observe('insights.first_content_seconds', time.perf_counter() - start)
+        
+        if not events:
+            recommendation = NO_EVENTS_RECOMMENDATION
+            yield sse_event('token', {'text': recommendation})
+        else:
+            parts = []
+            try:
+                async for text in stream_cached_chat_completion(**insights_recommendation_request(events, predictions)):
+                    parts.append(text)
+                    yield sse_event('token', {'text': text})
+            except Exception as e:
+                print(f"Error generating AI recommendation: {e}")
+                # Nothing streamed yet - send the canned recommendation instead
+                if not parts:
+                    parts.append(fallback_recommendation(predictions))
+                    yield sse_event('token', {'text': parts[0]})
+            recommendation = ''.join(parts)
+        
+        metrics.observe('insights.stream_seconds', time.perf_counter() - start)
+        yield sse_event('done', {'recommendation': recommendation})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/api/events")
@@ -2418,6 +2686,12 @@ async def get_events():
                 'club_name': event_data.get('club_name', ''),
                 'emoji_vibe': event_data.get('emoji_vibe', []),
                 'invitation_image': event_data.get('invitation_image', None),
+                'invitation_images': event_data.get('invitation_images') or {},
+                # Write-time scores (see score_event_document)
+                'goated_score': event_data.get('goated_score'),
+                'model_version': event_data.get('model_version'),
+                'score_factors': event_data.get('score_factors'),
+                'score_reason': event_data.get('score_reason'),
             }
             
             events_list.append(formatted_event)
@@ -2494,63 +2768,65 @@ def get_timing_score(event):
 
 def get_location_score(event):
     """Calculate location score based on BC preferences"""
-    location = event.get('location', '').lower()
-    
-    # Your ranked locations
-    if any(loc in location for loc in ['mods', 'ignacio', 'rubenstein']):
-        return 1.0
-    elif any(loc in location for loc in ['gabelli', 'stayer', '90 st']):
-        return 0.85
-    elif any(loc in location for loc in ['walsh', 'roncalli', 'kostka']):
-        return 0.7
-    else:
-        return 0.5
+    return location_preference_score(event_location_id(event))
 
 
-async def generate_insights_recommendation(events, predictions):
-    """Generate natural language recommendation using OpenAI"""
-    try:
-        # Prepare summary of events
-        event_summary = []
-        for i, event in enumerate(events[:5]):  # Top 5 events
-            pred_score = predictions[i]['score'] if i < len(predictions) else 0
-            event_summary.append(
-                f"- {event.get('function_name')} at {event.get('location')} "
-                f"({pred_score}% predicted success)"
-            )
-        
-        summary_text = "\n".join(event_summary)
-        
-        # Call OpenAI
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Cheaper and faster for short responses
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant analyzing BC campus events. Provide brief, friendly insights in 1-2 sentences."
-                },
-                {
-                    "role": "user",
-                    "content": f"""Analyze these BC campus events happening in the next 24 hours and provide a brief, encouraging insight:
+NO_EVENTS_RECOMMENDATION = 'No events to analyze in the next 24 hours.'
+
+
+def insights_recommendation_request(events, predictions):
+    """Chat completion arguments for the insights recommendation"""
+    # Prepare summary of the top 5 predicted events (predictions are sorted best-first),
+    # so the same lineup always produces the same prompt and hits the cache
+    events_by_id = {event.get('id', event.get('event_id', '')): event for event in events}
+    event_summary = []
+    for prediction in predictions[:5]:
+        event = events_by_id.get(prediction['eventId'], {})
+        event_summary.append(
+            f"- {prediction['eventName']} at {event.get('location')} "
+            f"({prediction['score']}% predicted success)"
+        )
+    
+    summary_text = "\n".join(event_summary)
+    
+    return {
+        'model': "gpt-4o-mini",  # Cheaper and faster for short responses
+        'messages': [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant analyzing BC campus events. Provide brief, friendly insights in 1-2 sentences."
+            },
+            {
+                "role": "user",
+                "content": f"""Analyze these BC campus events happening in the next 24 hours and provide a brief, encouraging insight:
 
 {summary_text}
 
 Respond in 1-2 sentences with actionable insights for students."""
-                }
-            ],
-            max_tokens=100,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content
+            }
+        ],
+        'max_tokens': 100,
+        'temperature': 0.7
+    }
+
+
+def fallback_recommendation(predictions):
+    if predictions:
+        top_event = predictions[0]['eventName']
+        return f"Check out {top_event} - it's predicted to be the hottest event in the next 24 hours! 🔥"
+    else:
+        return "Great events happening around campus - check them out on the map!"
+
+
+async def generate_insights_recommendation(events, predictions):
+    """Generate natural language recommendation using OpenAI"""
+    try:
+        # Call OpenAI (or reuse the answer for this exact lineup)
+        return await cached_chat_completion(**insights_recommendation_request(events, predictions))
     except Exception as e:
         print(f"Error generating AI recommendation: {e}")
         # Fallback recommendation
-        if predictions:
-            top_event = predictions[0]['eventName']
-            return f"Check out {top_event} - it's predicted to be the hottest event in the next 24 hours! 🔥"
-        else:
-            return "Great events happening around campus - check them out on the map!"
+        return fallback_recommendation(predictions)
 
 
 # Debug endpoint
@@ -0,0 +1,84 @@
+"""
+Tiny in-process metrics registry (counters + timing summaries)
+Exposed through GET /api/metrics in main.py
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and timing samples keyed by dotted names"""
+
+    def __init__(self, max_samples=1000):
+        self._lock = threading.Lock()
+        self._max_samples = max_samples
+        self._counters = {}
+        self._gauges = {}
+        self._timings = {}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name, seconds):
+        """Record one timing sample (in seconds)"""
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = {
+                    'count': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'samples': deque(maxlen=self._max_samples),
+                }
+                self._timings[name] = timing
+            timing['count'] += 1
+            timing['total'] += seconds
+            timing['max'] = max(timing['max'], seconds)
+            timing['samples'].append(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        """Time a block: `with metrics.timer('model.training_seconds'): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Return a JSON-serializable view of every metric"""
+        with self._lock:
+            timings = {}
+            for name, timing in self._timings.items():
+                samples = sorted(timing['samples'])
+                timings[name] = {
+                    'count': timing['count'],
+                    'total_seconds': round(timing['total'], 6),
+                    'mean_seconds': round(timing['total'] / timing['count'], 6),
+                    'max_seconds': round(timing['max'], 6),
+                    'p50_seconds': round(_percentile(samples, 50), 6),
+                    'p99_seconds': round(_percentile(samples, 99), 6),
+                }
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'timings': timings,
+            }
+
+
+def _percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+# Shared registry for the whole backend
+metrics = MetricsRegistry()
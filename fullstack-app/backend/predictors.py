@@ -0,0 +1,260 @@
+"""
+Pluggable predictor backends for the goated model
+
+Every backend takes raw extract_features() rows and predicts RSVP counts, so
+they are interchangeable behind ModelBundle. Pick one with the
+GOATED_MODEL_BACKEND env var (default: random_forest).
+
+Run `python predictors.py` for the accuracy-versus-latency benchmark.
+"""
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+
+from compiled_forest import CompiledForest
+from event_features import FEATURE_NAMES
+from success_heuristic import (
+    calculate_club_affiliation_score,
+    calculate_location_score,
+    calculate_vibe_score,
+    combine_factor_scores,
+    score_time_slot,
+)
+
+# Trees added per incremental update, and the cap on forest size
+INCREMENTAL_TREES = 20
+MAX_TREES = 200
+
+
+class GoatedPredictor:
+    """Base interface: fit/predict on raw feature rows, optional incremental update"""
+    name = None
+    supports_incremental = False
+
+    def fit(self, X, y):
+        raise NotImplementedError
+
+    def predict(self, X):
+        raise NotImplementedError
+
+    def update(self, X_new, y_new, random_state=42):
+        raise NotImplementedError(f"{self.name} does not support incremental updates")
+
+    def compile(self):
+        """Optional fast serving path (object with .predict). None = use predict()."""
+        return None
+
+
+class RandomForestPredictor(GoatedPredictor):
+    """StandardScaler + RandomForestRegressor (the original goated model)"""
+    name = 'random_forest'
+    supports_incremental = True
+
+    def __init__(self, n_estimators=100, max_depth=10, random_state=42):
+        self.scaler = StandardScaler()
+        self.model = RandomForestRegressor(
+            n_estimators=n_estimators,
+            max_depth=max_depth,
+            random_state=random_state,
+            n_jobs=-1
+        )
+
+    def fit(self, X, y):
+        self.model.fit(self.scaler.fit_transform(X), y)
+        return self
+
+    def predict(self, X):
+        return self.model.predict(self.scaler.transform(X))
+
+    def update(self, X_new, y_new, random_state=42):
+        """
+        Grow the forest with INCREMENTAL_TREES trees fitted on the new rows only
+        (warm_start) and drop the oldest trees past MAX_TREES. The scaler is
+        kept as-is so the existing trees' split thresholds stay valid.
+        """
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + INCREMENTAL_TREES,
+            random_state=random_state
+        )
+        self.model.fit(self.scaler.transform(X_new), y_new)
+        if len(self.model.estimators_) > MAX_TREES:
+            self.model.estimators_ = self.model.estimators_[-MAX_TREES:]
+        self.model.set_params(warm_start=False, n_estimators=len(self.model.estimators_))
+        return self
+
+    def compile(self):
+        return CompiledForest.from_sklearn(self.model, self.scaler)
+
+
+class HistGradientBoostingPredictor(GoatedPredictor):
+    """Histogram gradient boosting - scale invariant, so no scaler"""
+    name = 'hist_gradient_boosting'
+
+    def __init__(self, max_iter=200, max_depth=6, learning_rate=0.1, random_state=42):
+        self.model = HistGradientBoostingRegressor(
+            max_iter=max_iter,
+            max_depth=max_depth,
+            learning_rate=learning_rate,
+            random_state=random_state
+        )
+
+    def fit(self, X, y):
+        self.model.fit(X, y)
+        return self
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+
+class LinearPredictor(GoatedPredictor):
+    """StandardScaler + ridge regression over the same feature schema"""
+    name = 'linear'
+
+    def __init__(self, alpha=1.0):
+        self.scaler = StandardScaler()
+        self.model = Ridge(alpha=alpha)
+
+    def fit(self, X, y):
+        self.model.fit(self.scaler.fit_transform(X), y)
+        return self
+
+    def predict(self, X):
+        # Plain matrix math - skips sklearn's per-call validation
+        X_scaled = (np.asarray(X, dtype=float) - self.scaler.mean_) / self.scaler.scale_
+        return X_scaled @ self.model.coef_ + self.model.intercept_
+
+
+# One-hot location columns -> a location name the heuristic knows
+_HEURISTIC_LOCATIONS = {
+    'location_gabelli': 'Gabelli Hall',
+    'location_stayer': 'Stayer Hall',
+    'location_ignacio': 'Ignacio Hall',
+    'location_mods': 'The Mods',
+}
+
+
+class HeuristicPredictor(GoatedPredictor):
+    """
+    The hand-weighted predict_event_success heuristic, evaluated on feature rows
+
+    Nothing is learned: the 0-1 weighted score is read as expected capacity
+    utilization, so predicted RSVPs = score * max_capacity.
+    """
+    name = 'heuristic'
+
+    def __init__(self):
+        self._columns = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+    def fit(self, X, y):
+        return self
+
+    def _score_row(self, row):
+        col = self._columns
+        location = next(
+            (name for column, name in _HEURISTIC_LOCATIONS.items() if row[col[column]]),
+            ''
+        )
+        factors = {
+            'timing': score_time_slot(int(row[col['weekday']]), int(row[col['hour']])),
+            'location': calculate_location_score(location),
+            # RSVPs are the target, not a feature - score interest as unknown
+            'current_interest': 0.5,
+            'organization': calculate_club_affiliation_score(bool(row[col['club_affiliated']]), None),
+            'presentation': calculate_vibe_score(['·'] * int(row[col['emoji_count']])),
+        }
+        return combine_factor_scores(factors)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=float).reshape(-1, len(FEATURE_NAMES))
+        scores = np.array([self._score_row(row) for row in X])
+        return scores * X[:, self._columns['max_capacity']]
+
+
+PREDICTOR_BACKENDS = {
+    backend.name: backend
+    for backend in (RandomForestPredictor, HistGradientBoostingPredictor, LinearPredictor, HeuristicPredictor)
+}
+
+
+def make_predictor(name):
+    try:
+        return PREDICTOR_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown predictor backend '{name}'. Options: {', '.join(PREDICTOR_BACKENDS)}")
+
+
+def benchmark_backends(X, y, holdout_fraction=0.2, latency_repeats=200, random_state=42):
+    """
+    Train every backend on the same split and report training time, single-row
+    and batch inference latency, pickled size and holdout MAE
+    """
+    import pickle
+    import time
+
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(X))
+    holdout_size = max(1, int(len(X) * holdout_fraction))
+    holdout_idx, train_idx = order[:holdout_size], order[holdout_size:]
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_test, y_test = X[holdout_idx], y[holdout_idx]
+
+    results = []
+    for name, backend in PREDICTOR_BACKENDS.items():
+        predictor = backend()
+        start = time.perf_counter()
+        predictor.fit(X_train, y_train)
+        training_seconds = time.perf_counter() - start
+
+        # Serve the way ModelBundle would: compiled fast path when there is one
+        serving = predictor.compile() or predictor
+        mae = float(np.mean(np.abs(serving.predict(X_test) - y_test)))
+
+        single_samples = []
+        for i in range(latency_repeats):
+            row = X_test[i % len(X_test):i % len(X_test) + 1]
+            start = time.perf_counter()
+            serving.predict(row)
+            single_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        serving.predict(X_test)
+        batch_seconds = time.perf_counter() - start
+
+        results.append({
+            'backend': name,
+            'training_seconds': training_seconds,
+            'single_p50_ms': float(np.percentile(single_samples, 50) * 1000),
+            'single_p99_ms': float(np.percentile(single_samples, 99) * 1000),
+            'batch_us_per_row': batch_seconds / len(X_test) * 1e6,
+            'size_kb': len(pickle.dumps(predictor)) / 1024,
+            'mae': mae,
+        })
+    return results
+
+
+def _print_benchmark(title, results):
+    print(f"\n{title}")
+    print(f"{'backend':<24}{'train s':>9}{'p50 ms':>9}{'p99 ms':>9}{'batch us/row':>14}{'size KB':>10}{'MAE':>8}")
+    for r in results:
+        print(
+            f"{r['backend']:<24}{r['training_seconds']:>9.3f}{r['single_p50_ms']:>9.3f}"
+            f"{r['single_p99_ms']:>9.3f}{r['batch_us_per_row']:>14.2f}{r['size_kb']:>10.1f}{r['mae']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    from goated_model import build_training_set
+    from training_data import FeatureStore
+
+    X, y, _ = build_training_set(np.empty((0, len(FEATURE_NAMES))), np.empty(0), num_events=2000)
+    _print_benchmark(f"Synthetic dataset ({len(X)} events, fixed seed)", benchmark_backends(X, y))
+
+    store = FeatureStore()
+    if store.rows >= 50:
+        X_hist, y_hist = store.read()
+        _print_benchmark(f"Historical dataset ({len(X_hist)} events from the feature store)",
+                         benchmark_backends(X_hist, y_hist))
+    else:
+        print(f"\nHistorical dataset skipped: feature store at {store.path} has {store.rows} rows "
+              f"(sync historical_events first, e.g. POST /api/model/retrain)")
@@ -0,0 +1,208 @@
+"""
+Process-pool service for fallback invite renders
+
+PIL drawing holds the GIL for most of a render, so rendering on the serving
+process (even via asyncio.to_thread) slows every other request down when
+DALL-E fails and everyone falls back at once. Renders run in a pool of
+worker processes instead, one per core, each keeping its own warm fonts and
+vibe templates (see invite_renderer.py).
+
+Submissions are bounded: at most `workers` renders run and `max_queue` wait.
+Past that, render() raises RenderQueueFullError right away (the API answers
+429 with a Retry-After) instead of letting the backlog grow unbounded.
+
+Metrics: renders.seconds (in the worker), renders.wait_seconds (queueing),
+renders.completed / .rejected / .timeouts / .errors counters and the
+renders.in_flight gauge.
+
+Run `python render_service.py` to compare event-loop latency during a
+fallback storm with to_thread rendering vs the pool.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from metrics import metrics
+
+
+class RenderQueueFullError(Exception):
+    """Every worker is busy and the queue is full - retry later"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Render queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def _warm_worker():
+    from invite_renderer import background, load_fonts
+    load_fonts()
+    background()
+
+
+def _render_invite_job(event_data):
+    """Runs in a worker process -> (png bytes, render seconds)"""
+    from invite_renderer import render_invite_png
+    start = time.perf_counter()
+    png_bytes = render_invite_png(event_data)
+    return png_bytes, time.perf_counter() - start
+
+
+class RenderService:
+
+    def __init__(self, workers=None, max_queue=None, timeout=20.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = self.workers * 4 if max_queue is None else max_queue
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def start(self):
+        """Spin up the worker processes (otherwise done on first render)"""
+        with self._lock:
+            self._ensure_pool()
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            # forkserver: don't fork a process that has Firestore/gRPC threads running
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(method),
+                initializer=_warm_worker,
+            )
+        return self._pool
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    def _retry_after(self):
+        """Rough seconds until a queue slot frees up"""
+        typical = metrics.snapshot()['timings'].get('renders.seconds', {}).get('p50_seconds') or 0.1
+        return max(1, round(self.max_queue / self.workers * typical))
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                metrics.incr('renders.rejected')
+                raise RenderQueueFullError(self._retry_after())
+            future = self._ensure_pool().submit(fn, *args)
+            self._in_flight += 1
+            metrics.gauge('renders.in_flight', self._in_flight)
+        # A slot is only freed once the worker is done, even if the caller gave up earlier
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+            metrics.gauge('renders.in_flight', self._in_flight)
+
+    async def render_invite(self, event_data):
+        """PNG bytes of the fallback invite for event_data"""
+        submitted = time.perf_counter()
+        future = self._submit(_render_invite_job, event_data)
+        try:
+            png_bytes, render_seconds = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            metrics.incr('renders.timeouts')
+            raise
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault) - start a fresh pool for the next render
+            metrics.incr('renders.errors')
+            with self._lock:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+            raise
+        except Exception:
+            metrics.incr('renders.errors')
+            raise
+
+        metrics.incr('renders.completed')
+        metrics.observe('renders.seconds', render_seconds)
+        metrics.observe('renders.wait_seconds', time.perf_counter() - submitted - render_seconds)
+        return png_bytes
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'in_flight': self._in_flight,
+            'queued': max(0, self._in_flight - self.workers),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+if __name__ == "__main__":
+    import statistics
+
+    STORM = 64  # concurrent fallback previews
+    PROBE_INTERVAL = 0.005
+
+    events = [
+        {
+            'function_name': f'Darty {i}',
+            'location': 'The Mods',
+            'date': '2025-04-12T21:00:00',
+            'emoji_vibe': ['🎉', '🔥', '🎵'] if i % 2 else ['💃', '🕺', '🎶'],
+            'organizer_alias': 'Neon Wolf',
+        }
+        for i in range(STORM)
+    ]
+
+    async def loop_lag(stop):
+        """How late a 5ms sleep wakes up - what every other request on this loop would feel"""
+        lags = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+        return lags
+
+    async def storm(render):
+        stop = asyncio.Event()
+        probe = asyncio.create_task(loop_lag(stop))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(render(event) for event in events), return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        lags = sorted(await probe)
+        rejected = sum(isinstance(r, RenderQueueFullError) for r in results)
+        return elapsed, lags, rejected
+
+    async def main():
+        from invite_renderer import render_invite_png
+        render_invite_png(events[0])  # warm this process's caches too
+
+        bounded = RenderService()
+        unbounded = RenderService(max_queue=STORM)
+        for service in (bounded, unbounded):
+            service.start()
+            await service.render_invite(events[0])  # wait for workers to come up
+
+        print(f"{STORM} concurrent fallback renders, {bounded.workers} workers")
+        print(f"{'renderer':<22}{'total s':>9}{'loop lag p50 ms':>17}{'p99 ms':>9}{'max ms':>9}{'429s':>6}")
+        for label, render in [
+            ('to_thread', lambda event: asyncio.to_thread(render_invite_png, event)),
+            (f'process, queue {unbounded.max_queue}', unbounded.render_invite),
+            (f'process, queue {bounded.max_queue}', bounded.render_invite),
+        ]:
+            elapsed, lags, rejected = await storm(render)
+            p99 = lags[int(len(lags) * 0.99)] if lags else 0
+            print(f"{label:<22}{elapsed:>9.2f}{statistics.median(lags) * 1000:>17.1f}"
+                  f"{p99 * 1000:>9.1f}{lags[-1] * 1000:>9.1f}{rejected:>6}")
+        for service in (bounded, unbounded):
+            service.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+Storage backends, streamed HTTP -> Storage transfers and immutable uploads
+
+Downloads share one keep-alive requests.Session, so repeated DALL-E fetches
+reuse pooled connections instead of a fresh TLS handshake each time. The
+response body is read UPLOAD_CHUNK_SIZE at a time straight into a resumable
+upload whose public-read ACL is set by the upload itself, so there is no
+separate make_public() round-trip and peak memory is one chunk, not the
+whole image. Callers that need the bytes afterwards (renditions) pass a
+spool file that the stream is copied into as it goes.
+
+Objects are never overwritten: bytes known up front are stored under their
+content hash (upload_immutable, which skips objects that already exist), and
+every upload carries IMMUTABLE_CACHE_CONTROL so browsers and CDNs can keep
+them for a year.
+
+STORAGE_BACKEND=local swaps Firebase Storage for local_storage.LocalBucket
+(files under LOCAL_STORAGE_DIR, served by main.py's /storage route), so the
+whole image path can run and be load-tested offline (tests/test_storage_transfer.py
+runs it against a local HTTP server and a LocalBucket).
+"""
+import hashlib
+import os
+import tempfile
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import metrics
+
+# Resumable uploads send multiples of 256KB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Spooled copies stay in memory up to this size, then roll over to a temp file
+SPOOL_MAX_MEMORY = 2 * 1024 * 1024
+DOWNLOAD_TIMEOUT = (5, 30)  # connect, read (between bytes)
+PUBLIC_ACL = 'publicRead'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_storage_bucket():
+    """Firebase default bucket, or a LocalBucket when STORAGE_BACKEND=local"""
+    if os.getenv('STORAGE_BACKEND', 'firebase') == 'local':
+        from local_storage import LocalBucket
+        root = os.getenv('LOCAL_STORAGE_DIR', 'local-storage')
+        print(f"🗂️ Using local storage in {os.path.abspath(root)}")
+        return LocalBucket(root, os.getenv('LOCAL_STORAGE_URL', 'http://localhost:8000/storage'))
+
+    from firebase_admin import storage
+    return storage.bucket()
+
+
+def http_session():
+    """Process-wide pooled keep-alive session (GETs retried on connection errors and 502/503/504)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=16,
+                    max_retries=Retry(
+                        total=2,
+                        backoff_factor=0.5,
+                        status_forcelist=(502, 503, 504),
+                        allowed_methods=frozenset({'GET'}),
+                    ),
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def spool_file():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+
+
+class _StreamReader:
+    """File-like view of a response body that counts bytes and copies them into an optional spool"""
+
+    def __init__(self, raw, spool=None):
+        self.raw = raw
+        self.spool = spool
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        if chunk:
+            self.bytes_read += len(chunk)
+            if self.spool is not None:
+                self.spool.write(chunk)
+        return chunk
+
+
+def stream_url_to_blob(bucket, url, storage_path, content_type='image/png', spool=None,
+                       chunk_size=UPLOAD_CHUNK_SIZE, timeout=DOWNLOAD_TIMEOUT):
+    """
+    Stream url into a public blob at storage_path -> public url (blocking)
+    If spool is given the body is also written to it and it's rewound afterwards
+    """
+    with metrics.timer('storage.transfer_seconds'):
+        with http_session().get(url, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise Exception(f"Failed to download image: HTTP {response.status_code}")
+            response.raw.decode_content = True
+            reader = _StreamReader(response.raw, spool)
+
+            blob = bucket.blob(storage_path)
+            blob.chunk_size = chunk_size
+            blob.cache_control = IMMUTABLE_CACHE_CONTROL
+            # size=None keeps it a chunked resumable upload even for small images
+            blob.upload_from_file(reader, size=None, content_type=content_type, predefined_acl=PUBLIC_ACL)
+
+    metrics.incr('storage.transfers')
+    metrics.incr('storage.bytes_transferred', reader.bytes_read)
+    if spool is not None:
+        spool.seek(0)
+    return blob.public_url
+
+
+def content_hash_path(prefix, data, extension):
+    return f"{prefix}/{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+
+
+def upload_immutable(bucket, prefix, data, content_type, extension):
+    """
+    Upload bytes as a public, content-addressed blob in one request -> public url (blocking)
+    Identical bytes were already uploaded if the name exists, so that isn't an error
+    """
+    blob = bucket.blob(content_hash_path(prefix, data, extension))
+    blob.cache_control = IMMUTABLE_CACHE_CONTROL
+    try:
+        blob.upload_from_string(data, content_type=content_type, predefined_acl=PUBLIC_ACL, if_generation_match=0)
+        metrics.incr('storage.uploads')
+    except Exception as e:
+        if getattr(e, 'code', None) != 412:
+            raise
+        metrics.incr('storage.dedup_hits')
+    return blob.public_url
+
@@ -0,0 +1,215 @@
+"""
+Hand-weighted event success heuristic (no ML model needed)
+Each factor is scored 0-1 and combined with HEURISTIC_WEIGHTS
+"""
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from campus_registry import club_score, location_popularity_score, resolve_club, resolve_location
+
+
+# Weights for each factor (adjust based on historical data)
+HEURISTIC_WEIGHTS = {
+    'timing': 0.25,
+    'location': 0.20,
+    'current_interest': 0.30,  # RSVP momentum
+    'organization': 0.15,  # Club affiliation
+    'presentation': 0.10,  # Vibe/theme clarity
+}
+
+
+def calculate_time_score(event_date: str) -> float:
+    """
+    Score based on timing (weekends, evenings = higher scores)
+    """
+    try:
+        dt = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
+    except:
+        return 0.5  # Default if date parsing fails
+    
+    return score_time_slot(dt.weekday(), dt.hour)
+
+
+def score_time_slot(weekday: int, hour: int) -> float:
+    """
+    Timing score from the day of week (0=Monday) and hour of day
+    """
+    # Weekend bonus
+    is_weekend = weekday >= 5  # Saturday=5, Sunday=6
+    weekend_score = 0.25 if is_weekend else 0.0
+    
+    # Evening bonus (7pm-11pm is prime time)
+    if 19 <= hour <= 23:
+        time_score = 0.3
+    elif 17 <= hour < 19:
+        time_score = 0.2
+    elif 12 <= hour < 17:
+        time_score = 0.1
+    else:
+        time_score = 0.0
+    
+    return min(1.0, weekend_score + time_score)
+
+
+def calculate_location_score(location: str, location_id: Optional[str] = None) -> float:
+    """
+    Score based on location popularity and accessibility
+    Popular dorms and central locations score higher (see LOCATION_POPULARITY_SCORES)
+    """
+    return location_popularity_score(location_id or resolve_location(location))
+
+
+def calculate_capacity_utilization_score(rsvp_count: int, max_capacity: int) -> float:
+    """
+    Optimal utilization is 60-80% (not too empty, not too crowded)
+    """
+    if max_capacity == 0:
+        return 0.5
+    
+    utilization = rsvp_count / max_capacity
+    
+    if 0.6 <= utilization <= 0.8:
+        return 1.0  # Perfect utilization
+    elif 0.4 <= utilization < 0.6:
+        return 0.8
+    elif 0.3 <= utilization < 0.4:
+        return 0.6
+    elif 0.8 < utilization <= 0.95:
+        return 0.7  # A bit crowded but still good
+    elif utilization > 0.95:
+        return 0.5  # Too crowded, might turn people away
+    else:
+        return 0.3  # Too empty, might seem unpopular
+
+
+def calculate_club_affiliation_score(club_affiliated: bool, club_name: Optional[str],
+                                     club_id: Optional[str] = None) -> float:
+    """
+    Club-affiliated events often have better organization and turnout
+    """
+    if not club_affiliated:
+        return 0.5
+    
+    # Known popular clubs are in CLUB_SCORES, other club events get the default
+    return club_score(club_id or resolve_club(club_name))
+
+
+def calculate_vibe_score(emoji_vibe: Optional[List[str]]) -> float:
+    """
+    Events with clear vibes/themes tend to attract their target audience better
+    """
+    if not emoji_vibe or len(emoji_vibe) == 0:
+        return 0.5
+    
+    # More emojis = clearer theme
+    if len(emoji_vibe) >= 3:
+        return 0.8
+    elif len(emoji_vibe) >= 2:
+        return 0.7
+    else:
+        return 0.6
+
+
+def combine_factor_scores(factors: dict) -> float:
+    """
+    Weighted 0-1 success score from a dict of factor scores
+    """
+    return sum(factors[name] * weight for name, weight in HEURISTIC_WEIGHTS.items())
+
+
+def success_reason(score: int, ranked_factors: List[str]) -> str:
+    """
+    Human-readable reason from the 0-100 score and factor names ranked strongest first
+    """
+    top_factor = ranked_factors[0].replace('_', ' ')
+    weak_factor = ranked_factors[-1].replace('_', ' ')
+    
+    if score >= 80:
+        return f"Strong {top_factor} and good overall setup"
+    elif score >= 60:
+        return f"Good {top_factor}, but {weak_factor} could be improved"
+    else:
+        return f"Consider improving {weak_factor} and {ranked_factors[-2].replace('_', ' ')}"
+
+
+def _event_time_slot(event_date) -> tuple:
+    try:
+        dt = datetime.fromisoformat(event_date.replace('Z', '+00:00'))
+    except:
+        return -1, -1  # Unparseable, scored 0.5 like calculate_time_score
+    return dt.weekday(), dt.hour
+
+
+def score_events_batch(events: List[dict]) -> dict:
+    """
+    Vectorized predict_event_success over many events at once
+    
+    One pass over the events pulls out the raw columns, then every factor is
+    computed for all events with NumPy. Matches the per-event functions above.
+    Returns {'factors': {name: array}, 'scores': int array (0-100), 'reasons': [str]}
+    """
+    n = len(events)
+    slots = np.array([_event_time_slot(e.get('date')) for e in events], dtype=np.int64).reshape(n, 2)
+    weekday, hour = slots[:, 0], slots[:, 1]
+    location = np.array([
+        calculate_location_score(e.get('location') or '', e.get('location_id')) for e in events
+    ], dtype=np.float64)
+    club = np.array([
+        club_score(e.get('club_id') or resolve_club(e.get('club_name'))) for e in events
+    ], dtype=np.float64)
+    club_affiliated = np.array([bool(e.get('club_affiliated')) for e in events], dtype=bool)
+    rsvp_count = np.array([e.get('rsvp_count') or 0 for e in events], dtype=np.float64)
+    max_capacity = np.array([e.get('max_capacity') or 0 for e in events], dtype=np.float64)
+    emoji_count = np.array([len(e.get('emoji_vibe') or []) for e in events], dtype=np.int64)
+    
+    # Timing (score_time_slot)
+    weekend_score = np.where(weekday >= 5, 0.25, 0.0)
+    time_score = np.select(
+        [(hour >= 19) & (hour <= 23), (hour >= 17) & (hour < 19), (hour >= 12) & (hour < 17)],
+        [0.3, 0.2, 0.1],
+        0.0,
+    )
+    timing = np.where(weekday < 0, 0.5, np.minimum(1.0, weekend_score + time_score))
+    
+    # Capacity utilization (calculate_capacity_utilization_score)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        utilization = rsvp_count / max_capacity
+    current_interest = np.select(
+        [
+            max_capacity == 0,
+            (utilization >= 0.6) & (utilization <= 0.8),
+            (utilization >= 0.4) & (utilization < 0.6),
+            (utilization >= 0.3) & (utilization < 0.4),
+            (utilization > 0.8) & (utilization <= 0.95),
+            utilization > 0.95,
+        ],
+        [0.5, 1.0, 0.8, 0.6, 0.7, 0.5],
+        0.3,
+    )
+    
+    factors = {
+        'timing': timing,
+        'location': location,
+        'current_interest': current_interest,
+        'organization': np.where(club_affiliated, club, 0.5),
+        'presentation': np.select([emoji_count >= 3, emoji_count >= 2, emoji_count >= 1], [0.8, 0.7, 0.6], 0.5),
+    }
+    
+    # Same accumulation order as combine_factor_scores so scores match exactly
+    weighted = 0
+    for name, weight in HEURISTIC_WEIGHTS.items():
+        weighted = weighted + factors[name] * weight
+    scores = (np.asarray(weighted, dtype=np.float64) * 100).astype(np.int64)
+    
+    # Stable descending sort = sorted(factors.items(), key=..., reverse=True)
+    names = list(factors)
+    matrix = np.column_stack([factors[name] for name in names]) if n else np.empty((0, len(names)))
+    ranking = np.argsort(-matrix, axis=1, kind='stable')
+    reasons = [
+        success_reason(int(score), [names[i] for i in order])
+        for score, order in zip(scores, ranking)
+    ]
+    
+    return {'factors': factors, 'scores': scores, 'reasons': reasons}
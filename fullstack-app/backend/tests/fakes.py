@@ -0,0 +1,239 @@
+"""
+In-memory stand-ins for the slice of the Firestore client the backend uses
+
+FakeFirestore.collection(name) returns a FakeQuery supporting order_by
+(including '__name__' and DESCENDING), select, start_after (a snapshot or a
+dict of order values, like decode_cursor returns), limit and stream. Every
+streamed document is counted in `reads`, as Firestore bills them.
+
+Documents (collection(...).document(id)) support get/set/create/update/delete
+and subcollections; updates apply firestore.Increment and DELETE_FIELD.
+Batches, get_all() and @firestore.transactional functions (writes applied
+at commit) work on them too. Collections are keyed by their full path,
+e.g. 'users/u1/instagram_followers'.
+"""
+import uuid
+
+from google.cloud.firestore_v1 import DELETE_FIELD, Increment
+
+
+class NotFound(Exception):
+    """Same shape as google.api_core.exceptions.NotFound (checked via .code)"""
+    code = 404
+
+
+class AlreadyExists(Exception):
+    """Same shape as google.api_core.exceptions.AlreadyExists / Conflict (checked via .code)"""
+    code = 409
+
+
+class FakeSnapshot:
+
+    def __init__(self, doc_id, data, reference=None):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+        self.reference = reference
+
+    def to_dict(self):
+        return dict(self._data) if self.exists else None
+
+
+class FakeDocumentRef:
+
+    def __init__(self, db, collection_path, doc_id):
+        self.db = db
+        self.collection_path = collection_path
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f'{self.collection_path}/{self.id}'
+
+    def _docs(self):
+        return self.db.collections.setdefault(self.collection_path, {})
+
+    def collection(self, name):
+        return FakeQuery(self.db, f'{self.path}/{name}')
+
+    def get(self, transaction=None):
+        self.db.reads += 1
+        data = self._docs().get(self.id)
+        return FakeSnapshot(self.id, None if data is None else dict(data), self)
+
+    def set(self, data):
+        self._docs()[self.id] = dict(data)
+
+    def create(self, data):
+        if self.id in self._docs():
+            raise AlreadyExists(self.path)
+        self.set(data)
+
+    def update(self, changes):
+        if self.id not in self._docs():
+            raise NotFound(self.path)
+        data = self._docs()[self.id]
+        for field, value in changes.items():
+            if value is DELETE_FIELD:
+                data.pop(field, None)
+            elif isinstance(value, Increment):
+                data[field] = (data.get(field) or 0) + value.value
+            else:
+                data[field] = value
+
+    def delete(self):
+        self._docs().pop(self.id, None)
+
+
+class FakeTransaction:
+    """Buffers writes until commit; just enough of Transaction for @firestore.transactional"""
+
+    _read_only = False
+    _max_attempts = 5
+
+    def __init__(self, db):
+        self.db = db
+        self._id = None
+        self._writes = []
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._id = b'fake-transaction'
+
+    def _rollback(self):
+        self._clean_up()
+
+    def _commit(self):
+        # All or nothing, like Firestore: a create() of an existing document fails the whole commit
+        for op, ref, _ in self._writes:
+            if op == 'create' and ref.get().exists:
+                raise AlreadyExists(ref.path)
+        self.db.commits += 1
+        for op, ref, data in self._writes:
+            getattr(ref, op)(*(() if data is None else (data,)))
+        self._clean_up()
+        return []
+
+    def get(self, ref):
+        return ref.get(transaction=self)
+
+    def set(self, ref, data):
+        self._writes.append(('set', ref, data))
+
+    def create(self, ref, data):
+        self._writes.append(('create', ref, data))
+
+    def update(self, ref, changes):
+        self._writes.append(('update', ref, changes))
+
+    def delete(self, ref):
+        self._writes.append(('delete', ref, None))
+
+
+class FakeBatch:
+
+    def __init__(self, db):
+        self.db = db
+        self._writes = []
+
+    def set(self, ref, data):
+        self._writes.append(lambda: ref.set(data))
+
+    def update(self, ref, changes):
+        self._writes.append(lambda: ref.update(changes))
+
+    def delete(self, ref):
+        self._writes.append(ref.delete)
+
+    def commit(self):
+        self.db.batches += 1
+        for write in self._writes:
+            write()
+
+
+class FakeQuery:
+
+    def __init__(self, db, name, orders=(), cursor=None, limit_count=None, fields=None):
+        self.db = db
+        self.name = name
+        self.orders = list(orders)
+        self.cursor = cursor
+        self.limit_count = limit_count
+        self.fields = fields
+
+    def document(self, doc_id=None):
+        return FakeDocumentRef(self.db, self.name, doc_id or uuid.uuid4().hex[:20])
+
+    def _copy(self, **changes):
+        state = dict(orders=self.orders, cursor=self.cursor, limit_count=self.limit_count, fields=self.fields)
+        state.update(changes)
+        return FakeQuery(self.db, self.name, **state)
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(orders=self.orders + [(field, direction)])
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def limit(self, count):
+        return self._copy(limit_count=count)
+
+    def start_after(self, cursor):
+        if isinstance(cursor, FakeSnapshot):
+            cursor = {**cursor.to_dict(), '__name__': cursor.id}
+        return self._copy(cursor=cursor)
+
+    @staticmethod
+    def _value(doc_id, data, field):
+        return doc_id if field == '__name__' else data.get(field)
+
+    def _after_cursor(self, doc_id, data):
+        for field, direction in self.orders:
+            value, cursor_value = self._value(doc_id, data, field), self.cursor.get(field)
+            if value == cursor_value:
+                continue
+            return (value > cursor_value) == (direction == 'ASCENDING')
+        return False
+
+    def stream(self):
+        docs = sorted(self.db.collections.get(self.name, {}).items())
+        for field, direction in reversed(self.orders):
+            docs.sort(key=lambda item: self._value(item[0], item[1], field), reverse=direction == 'DESCENDING')
+        if self.cursor is not None:
+            docs = [(doc_id, data) for doc_id, data in docs if self._after_cursor(doc_id, data)]
+        if self.limit_count is not None:
+            docs = docs[:self.limit_count]
+        for doc_id, data in docs:
+            self.db.reads += 1
+            if self.fields is not None:
+                data = {field: data[field] for field in self.fields if field in data}
+            yield FakeSnapshot(doc_id, data, self.document(doc_id))
+
+
+class FakeFirestore:
+
+    def __init__(self, collections=None):
+        self.collections = collections or {}
+        self.reads = 0
+        self.batches = 0
+        self.commits = 0
+
+    def collection(self, name):
+        return FakeQuery(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def get_all(self, refs):
+        for ref in refs:
+            yield ref.get()
+
+    def docs(self, path):
+        """{doc id: data} stored under a collection path"""
+        return self.collections.get(path, {})
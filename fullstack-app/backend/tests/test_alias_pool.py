@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+
+from alias_pool import ADJECTIVES, NOUNS, AliasPool, normalize_alias
+from fakes import FakeFirestore
+from metrics import metrics
+
+
+class FakeGateway:
+    """Answers chat() with queued texts (or raises queued exceptions)"""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def chat(self, model, messages, timeout=None, **kwargs):
+        self.calls += 1
+        reply = self.replies.pop(0) if self.replies else ''
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def _pool_aliases(db):
+    return db.docs('alias_pool').get('available', {}).get('aliases', [])
+
+
+def _claims(db):
+    return db.docs('alias_claims')
+
+
+def _counter(name):
+    return metrics.snapshot()['counters'].get(name, 0)
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore({
+        'alias_pool': {'available': {'aliases': ['Neon Thunder', 'Cosmic Wolf', 'Velvet Cipher']}},
+        'users': {'u1': {'ai_generated_alias': 'Golden Tiger'}, 'u2': {'name': 'No alias yet'}},
+    })
+
+
+def _pool(db, gateway=None, **kwargs):
+    pool = AliasPool(db, gateway or FakeGateway(), **kwargs)
+    pool.load()
+    return pool
+
+
+@pytest.mark.parametrize('text, alias', [
+    ('neon thunder', 'Neon Thunder'),
+    ('  3. neon   THUNDER ', 'Neon Thunder'),
+    ('- "Cosmic Wolf"', 'Cosmic Wolf'),
+    ('• velvet cipher', 'Velvet Cipher'),
+    ('12) Mystic Raven', 'Mystic Raven'),
+    ('Neon', None),
+    ('Neon Thunder Wolf', None),
+    ('Neon-Thunder', None),
+    ('', None),
+    (None, None),
+])
+def test_normalize_alias(text, alias):
+    assert normalize_alias(text) == alias
+
+
+def test_load_claims_existing_aliases_once(db):
+    pool = _pool(db)
+
+    assert _claims(db)['golden tiger']['user_id'] == 'u1'
+    assert len(pool) == 3
+
+    del db.collections['alias_claims']
+    _pool(db)
+    assert 'alias_claims' not in db.collections
+
+
+def test_take_pops_from_the_pool_document_and_claims(db):
+    pool = _pool(db)
+
+    alias = pool.take('u2')
+
+    assert alias == 'Neon Thunder'
+    assert _pool_aliases(db) == ['Cosmic Wolf', 'Velvet Cipher']
+    assert _claims(db)['neon thunder']['user_id'] == 'u2'
+    assert len(pool) == 2
+
+
+def test_restart_and_other_workers_never_reuse_an_alias(db):
+    first, second = _pool(db), _pool(db)
+
+    taken = [first.take('a'), second.take('b'), first.take('c'), AliasPool(db, FakeGateway()).take('d')]
+
+    assert taken[:3] == ['Neon Thunder', 'Cosmic Wolf', 'Velvet Cipher']
+    assert len(set(alias.lower() for alias in taken)) == 4
+    assert taken[3] != 'Golden Tiger'
+
+
+def test_take_skips_and_drops_aliases_claimed_elsewhere(db):
+    pool = _pool(db)
+    db.collections['alias_claims']['neon thunder'] = {'user_id': 'someone'}
+    db.collections['alias_claims']['cosmic wolf'] = {'user_id': 'someone else'}
+
+    assert pool.take('u2') == 'Velvet Cipher'
+    assert _pool_aliases(db) == []
+
+
+def test_take_falls_back_to_unclaimed_combination(db):
+    db.collections['alias_pool']['available'] = {'aliases': []}
+    pool = _pool(db)
+    fallbacks = _counter('alias_pool.fallbacks')
+
+    alias = pool.take('u2')
+
+    adjective, noun = alias.split()
+    assert adjective in ADJECTIVES and noun in NOUNS
+    assert alias != 'Golden Tiger'
+    assert _claims(db)[alias.lower()]['user_id'] == 'u2'
+    assert _counter('alias_pool.fallbacks') == fallbacks + 1
+
+
+def test_fallback_numbers_aliases_once_every_combination_is_claimed(db):
+    db.collections['alias_pool']['available'] = {'aliases': ['Neon Thunder']}
+    db.collections['alias_claims'] = {
+        f'{adjective} {noun}'.lower(): {'user_id': 'x'} for adjective in ADJECTIVES for noun in NOUNS
+    }
+    pool = _pool(db)
+
+    alias = pool.take('u2')
+
+    *words, number = alias.split()
+    assert len(words) == 2 and 10 <= int(number) <= 99
+    assert _pool_aliases(db) == []
+
+
+def test_claim_schedules_refill_when_low(db):
+    gateway = FakeGateway('\n'.join(['mystic raven', 'digital falcon', 'urban viper']))
+    pool = _pool(db, gateway, target_size=5, low_watermark=3)
+
+    async def run():
+        alias = await pool.claim('u2')
+        await pool._refill_task
+        return alias
+
+    assert asyncio.run(run()) == 'Neon Thunder'
+    assert _pool_aliases(db) == ['Cosmic Wolf', 'Velvet Cipher', 'Mystic Raven', 'Digital Falcon', 'Urban Viper']
+    assert gateway.calls == 1
+
+
+def test_refill_dedupes_and_stops_when_a_batch_adds_nothing(db):
+    gateway = FakeGateway(
+        '1. Neon thunder\n2. golden tiger\n3. Shadow Phoenix\nnot an alias here\n- shadow phoenix',
+        'Neon Thunder\nShadow Phoenix',
+    )
+    pool = _pool(db, gateway, target_size=10)
+
+    added = asyncio.run(pool.refill())
+
+    assert added == 1
+    assert _pool_aliases(db) == ['Neon Thunder', 'Cosmic Wolf', 'Velvet Cipher', 'Shadow Phoenix']
+    assert gateway.calls == 2
+    assert len(pool) == 4
+
+
+def test_refill_survives_llm_failure(db):
+    pool = _pool(db, FakeGateway(RuntimeError('upstream down')), target_size=10)
+    errors = _counter('alias_pool.refill_errors')
+
+    assert asyncio.run(pool.refill()) == 0
+    assert _counter('alias_pool.refill_errors') == errors + 1
+    assert len(_pool_aliases(db)) == 3
+
+
+def test_personalized_claims_the_generated_alias(db):
+    pool = _pool(db, FakeGateway('mystic raven'))
+
+    assert asyncio.run(pool.personalized('likes nights out', 'Eagle', 'u2')) == 'Mystic Raven'
+    assert _claims(db)['mystic raven']['user_id'] == 'u2'
+    assert len(_pool_aliases(db)) == 3
+
+
+@pytest.mark.parametrize('reply', ['Golden Tiger', 'not an alias at all', RuntimeError('timeout')])
+def test_personalized_falls_back_to_the_pool(db, reply):
+    pool = _pool(db, FakeGateway(reply))
+
+    assert asyncio.run(pool.personalized('likes nights out', user_id='u2')) == 'Neon Thunder'
+    assert _claims(db)['golden tiger']['user_id'] == 'u1'
+
+
+def test_personalized_loses_race_to_another_worker(db):
+    pool = _pool(db, FakeGateway('Mystic Raven'))
+    db.collections['alias_claims']['mystic raven'] = {'user_id': 'other worker'}
+
+    assert asyncio.run(pool.personalized('likes nights out', user_id='u2')) == 'Neon Thunder'
+    assert _claims(db)['mystic raven']['user_id'] == 'other worker'
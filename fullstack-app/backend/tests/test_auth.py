@@ -0,0 +1,120 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from jose import jwt
+
+import auth
+from auth import InvalidTokenError, TokenService, hash_password, needs_rehash, verify_password
+
+SECRET = 'test-secret'
+
+
+@pytest.fixture
+def service():
+    return TokenService(SECRET, access_minutes=15, refresh_days=14)
+
+
+@pytest.fixture
+def tokens(service):
+    return service.issue('u1', 'eagle@bc.edu', 'Eagle')
+
+
+def test_access_token_resolves_caller(service, tokens):
+    user = service.current_user(tokens['access_token'])
+
+    assert (user.user_id, user.bc_email, user.name) == ('u1', 'eagle@bc.edu', 'Eagle')
+    assert tokens['expires_in'] == 15 * 60
+
+
+def test_refresh_token_decodes_only_as_refresh(service, tokens):
+    assert service.decode(tokens['refresh_token'], 'refresh')['sub'] == 'u1'
+
+    with pytest.raises(InvalidTokenError):
+        service.decode(tokens['refresh_token'], 'access')
+
+
+def test_access_token_cannot_be_used_as_refresh(service, tokens):
+    with pytest.raises(InvalidTokenError):
+        service.decode(tokens['access_token'], 'refresh')
+
+
+def _signed(claims, secret=SECRET):
+    now = int(time.time())
+    return jwt.encode({'iat': now, 'exp': now + 60, **claims}, secret, algorithm='HS256')
+
+
+@pytest.mark.parametrize('claims', [
+    {'sub': 'u1'},
+    {'sub': 'u1', 'type': 'ACCESS'},
+    {'type': 'access'},
+    {'sub': '', 'type': 'access'},
+])
+def test_decode_rejects_missing_or_wrong_type_and_subject(service, claims):
+    with pytest.raises(InvalidTokenError, match='Invalid token'):
+        service.decode(_signed(claims), 'access')
+
+
+def test_decode_rejects_expired_token(service):
+    expired = _signed({'sub': 'u1', 'type': 'access', 'exp': int(time.time()) - 10})
+
+    with pytest.raises(InvalidTokenError, match='expired'):
+        service.decode(expired, 'access')
+
+
+@pytest.mark.parametrize('token', ['', 'not.a.jwt', _signed({'sub': 'u1', 'type': 'access'}, secret='other')])
+def test_decode_rejects_malformed_or_foreign_tokens(service, token):
+    with pytest.raises(InvalidTokenError, match='Invalid token'):
+        service.decode(token, 'access')
+
+
+def test_decode_rejects_unsigned_token(service):
+    unsigned = _signed({'sub': 'u1', 'type': 'access'}).rsplit('.', 1)[0] + '.'
+
+    with pytest.raises(InvalidTokenError):
+        service.decode(unsigned, 'access')
+
+
+def test_password_hash_round_trip():
+    stored = hash_password('correct horse', iterations=1000)
+
+    assert verify_password('correct horse', stored)
+    assert not verify_password('wrong', stored)
+    assert not verify_password('correct horse', 'plaintext')
+    assert needs_rehash(stored)
+
+
+def test_import_does_not_hash():
+    # A fresh interpreter, so the import really runs
+    script = (
+        "import hashlib\n"
+        "calls = []\n"
+        "hashlib.pbkdf2_hmac = lambda *args, **kwargs: calls.append(args)\n"
+        "import auth\n"
+        "print(len(calls))\n"
+    )
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', script], cwd=backend, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == '0'
+
+
+def test_unknown_email_verifies_against_one_cached_dummy_hash(monkeypatch):
+    hashed = []
+
+    def fake_hash(password, iterations=1000):
+        hashed.append(password)
+        return hash_password(password, iterations=iterations)
+
+    monkeypatch.setattr(auth, 'hash_password', fake_hash)
+    auth._dummy_hash.cache_clear()
+
+    async def run():
+        return [await auth.verify_user_password('guess', None) for _ in range(3)]
+
+    assert asyncio.run(run()) == [(False, None)] * 3
+    assert len(hashed) == 1
+    auth._dummy_hash.cache_clear()
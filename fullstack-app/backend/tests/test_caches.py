@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+import caches
+from caches import LLMResponseCache, LRUCache
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(caches.time, 'monotonic', clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, name='test_lru')
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert len(cache) == 2
+
+
+def test_lru_entries_expire_after_ttl(clock):
+    cache = LRUCache(maxsize=8, name='test_ttl', ttl=60)
+    cache.set('a', 1)
+
+    clock.now += 59.9
+    assert cache.get('a') == 1
+
+    clock.now += 0.1
+    assert cache.get('a', 'gone') == 'gone'
+    assert len(cache) == 0
+    assert cache.stats()['expirations'] == 1
+
+
+def test_lru_set_refreshes_ttl(clock):
+    cache = LRUCache(name='test_ttl_refresh', ttl=60)
+    cache.set('a', 1)
+    clock.now += 50
+    cache.set('a', 2)
+
+    clock.now += 50
+
+    assert cache.get('a') == 2
+
+
+def test_lru_without_ttl_never_expires(clock):
+    cache = LRUCache(name='test_no_ttl')
+    cache.set('a', 1)
+
+    clock.now += 10 ** 9
+
+    assert cache.get('a') == 1
+
+
+def test_lru_counts_expired_read_as_miss(clock):
+    cache = LRUCache(name='test_ttl_miss', ttl=1)
+    cache.set('a', 1)
+    cache.get('a')
+    clock.now += 2
+    cache.get('a')
+
+    stats = cache.stats()
+
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_llm_key_is_canonical():
+    assert LLMResponseCache.key('gpt', {'a': 1, 'b': [1, 2]}) == LLMResponseCache.key('gpt', {'b': [1, 2], 'a': 1})
+    assert LLMResponseCache.key('gpt', {'a': 1}) != LLMResponseCache.key('other', {'a': 1})
+
+
+def test_llm_single_flight_shares_one_upstream_call():
+    cache = LLMResponseCache(name='test_llm_single_flight')
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 'insight'
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_call('k', call) for _ in range(5)))
+        return results, await cache.get_or_call('k', call)
+
+    results, cached = asyncio.run(run())
+
+    assert results == ['insight'] * 5
+    assert cached == 'insight'
+    assert calls == 1
+    stats = cache.stats()
+    assert (stats['coalesced'], stats['in_flight']) == (4, 0)
+
+
+def test_llm_failure_reaches_every_waiter_and_is_not_cached():
+    cache = LLMResponseCache(name='test_llm_failure')
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError('upstream down')
+
+    async def succeeding():
+        return 'recovered'
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_call('k', failing) for _ in range(3)),
+                                       return_exceptions=True)
+        return results, await cache.get_or_call('k', succeeding)
+
+    results, retried = asyncio.run(run())
+
+    assert calls == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == 'recovered'
+
+
+def test_llm_cancelled_leader_fails_waiters_with_ordinary_error():
+    cache = LLMResponseCache(name='test_llm_cancel')
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def waiter_with_fallback():
+        # Like get_ai_insights: any Exception -> fallback text
+        try:
+            return await cache.get_or_call('k', slow)
+        except Exception as e:
+            return f'fallback ({type(e).__name__})'
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_call('k', slow))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(waiter_with_fallback()) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await asyncio.gather(leader, *waiters, return_exceptions=True)
+
+    leader, *waiters = asyncio.run(run())
+
+    assert isinstance(leader, asyncio.CancelledError)
+    assert waiters == ['fallback (LLMUnavailableError)'] * 2
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_llm_call_after_cancelled_leader_goes_upstream():
+    cache = LLMResponseCache(name='test_llm_cancel_retry')
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return 'fresh'
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_call('k', slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.gather(leader, return_exceptions=True)
+        return await cache.get_or_call('k', fast)
+
+    assert asyncio.run(run()) == 'fresh'
+
+
+def test_llm_cached_response_expires(clock):
+    cache = LLMResponseCache(ttl=600, name='test_llm_ttl')
+    cache.put('k', 'old', latency=1.5)
+
+    assert cache.get('k') == 'old'
+    clock.now += 601
+    assert cache.get('k') is None
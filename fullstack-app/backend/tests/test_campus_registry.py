@@ -0,0 +1,99 @@
+import pytest
+
+from campus_registry import (
+    CLUBS,
+    LOCATIONS,
+    _legacy_calculate_location_score,
+    _legacy_club_score,
+    _legacy_get_location_score,
+    _legacy_one_hot,
+    club_score,
+    event_club_id,
+    event_location_id,
+    location_one_hot,
+    location_popularity_score,
+    location_preference_score,
+    resolve_club,
+    resolve_location,
+)
+from success_heuristic import calculate_club_affiliation_score, calculate_location_score
+
+LOCATION_TEXTS = [name for name, _ in LOCATIONS.values()] + [
+    'Gabelli Hall 3rd floor', 'the mods', 'Ignacio Hall Lounge', '90 St. Thomas More 204',
+    'Rubenstein Hall', 'Off campus', 'Cleveland Circle', '',
+]
+CLUB_TEXTS = [name for name, _ in CLUBS.values()] + [
+    'BC Student Government', 'Boston College Acapella', 'Comedy Club Improv Night', 'Hiking Club', '', None,
+]
+
+
+@pytest.mark.parametrize('text, location_id', [
+    ('Gabelli Hall', 'gabelli'),
+    ('gabelli hall room 301', 'gabelli'),
+    ('The Mods', 'mods'),
+    ('Mods 12A', 'mods'),
+    ('90 St. Thomas More', 'ninety_stm'),
+    ('90 st thomas more', 'ninety_stm'),
+    ('Thomas More Apartments', 'thomas_more_apts'),
+    ('Walsh', 'walsh'),
+    ('Gabellis', None),
+    ('Commodore Lounge', None),
+    ('Off campus', None),
+    ('', None),
+    (None, None),
+])
+def test_resolve_location(text, location_id):
+    assert resolve_location(text) == location_id
+
+
+@pytest.mark.parametrize('text, club_id', [
+    ('Student Government', 'student_government'),
+    ('BC Bop!', 'bc_bop'),
+    ('Theatre Club', 'theater_club'),
+    ('Model UN', 'model_un'),
+    ('FISTS', 'fists'),
+    ('Basoon Society', None),
+    ('', None),
+    (None, None),
+])
+def test_resolve_club(text, club_id):
+    assert resolve_club(text) == club_id
+
+
+def test_stored_ids_win_over_text():
+    assert event_location_id({'location_id': 'walsh', 'location': 'Gabelli Hall'}) == 'walsh'
+    assert event_location_id({'location': 'Gabelli Hall'}) == 'gabelli'
+    assert event_club_id({'club_id': 'vip', 'club_name': 'FISTS'}) == 'vip'
+    assert event_club_id({'club_name': None}) is None
+
+
+@pytest.mark.parametrize('text', LOCATION_TEXTS)
+def test_full_names_score_like_the_old_tables(text):
+    location_id = resolve_location(text)
+
+    assert calculate_location_score(text) == location_popularity_score(location_id) == \
+        _legacy_calculate_location_score(text)
+    assert location_preference_score(location_id) == _legacy_get_location_score({'location': text})
+
+
+@pytest.mark.parametrize('text', [name for name, _ in LOCATIONS.values()])
+def test_one_hot_matches_old_features_for_display_names(text):
+    assert location_one_hot(resolve_location(text)) == tuple(float(flag) for flag in _legacy_one_hot({'location': text}))
+
+
+@pytest.mark.parametrize('text', CLUB_TEXTS)
+def test_club_scores_match_the_old_table(text):
+    assert club_score(resolve_club(text)) == _legacy_club_score(text)
+    assert calculate_club_affiliation_score(True, text) == _legacy_club_score(text)
+
+
+@pytest.mark.parametrize('text, popularity, legacy_popularity', [
+    ('Walsh', 0.85, 0.5),
+    ('mods', 0.7, 0.5),
+    ('Mods 12A', 0.7, 0.5),
+    ('Stayer', 0.85, 0.5),
+])
+def test_short_forms_now_get_the_full_name_popularity(text, popularity, legacy_popularity):
+    # Deliberate change: the old popularity scan only matched full names
+    assert calculate_location_score(text) == popularity
+    assert _legacy_calculate_location_score(text) == legacy_popularity
@@ -0,0 +1,99 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from fakes import FakeFirestore, FakeSnapshot
+from firestore_paging import InvalidCursorError, decode_cursor, encode_cursor, fetch_page
+
+
+def _page_ids(docs):
+    return [doc.id for doc in docs]
+
+
+@pytest.fixture
+def db():
+    # Pairs of events share a date, so paging has to break ties on the document id
+    return FakeFirestore({'events': {
+        f'e{i:02d}': {'date': f'2025-04-{10 + i // 2:02d}', 'name': f'Event {i}'} for i in range(7)
+    }})
+
+
+def _query(db):
+    return db.collection('events').order_by('date', direction='DESCENDING').order_by('__name__', direction='DESCENDING')
+
+
+def test_cursor_round_trip():
+    snapshot = FakeSnapshot('abc', {'date': '2025-04-12', 'rsvp_count': 7})
+
+    token = encode_cursor(snapshot, ['date', 'rsvp_count'])
+
+    assert decode_cursor(token, ['date', 'rsvp_count']) == {'date': '2025-04-12', 'rsvp_count': 7, '__name__': 'abc'}
+
+
+def test_cursor_round_trips_datetimes_and_missing_values():
+    moved_at = datetime(2025, 4, 12, 21, 30, 5)
+    snapshot = FakeSnapshot('abc', {'moved_at': moved_at})
+
+    cursor = decode_cursor(encode_cursor(snapshot, ['moved_at', 'date']), ['moved_at', 'date'])
+
+    assert cursor == {'moved_at': moved_at, 'date': None, '__name__': 'abc'}
+
+
+def test_cursor_token_is_url_safe():
+    token = encode_cursor(FakeSnapshot('a/b?c', {'date': '🎉' * 20}), ['date'])
+
+    assert set(token) <= set('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=')
+
+
+@pytest.mark.parametrize('token', [
+    'not base64!',
+    base64.urlsafe_b64encode(b'not json').decode(),
+    base64.urlsafe_b64encode(b'{"date": "x"}').decode(),
+    base64.urlsafe_b64encode(json.dumps(['2025-04-12']).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps(['2025-04-12', 'a', 'b']).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps(['2025-04-12', 7]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps([{'no_ts': 1}, 'a']).encode()).decode(),
+    'é',
+])
+def test_decode_rejects_foreign_tokens(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, ['date'])
+
+
+def test_invalid_cursor_is_a_value_error():
+    assert issubclass(InvalidCursorError, ValueError)
+
+
+def test_fetch_page_walks_every_document_once_across_ties(db):
+    pages, cursor = [], None
+    while True:
+        docs, cursor = fetch_page(_query(db), ['date'], 2, cursor)
+        pages.append(_page_ids(docs))
+        if cursor is None:
+            break
+
+    assert pages == [['e06', 'e05'], ['e04', 'e03'], ['e02', 'e01'], ['e00']]
+
+
+def test_fetch_page_has_no_next_cursor_on_exact_last_page(db):
+    docs, cursor = fetch_page(_query(db), ['date'], 7)
+
+    assert len(docs) == 7
+    assert cursor is None
+
+
+def test_fetch_page_reads_one_document_past_the_page(db):
+    _, cursor = fetch_page(_query(db), ['date'], 3)
+    db.reads = 0
+
+    docs, _ = fetch_page(_query(db), ['date'], 3, cursor)
+
+    assert _page_ids(docs) == ['e03', 'e02', 'e01']
+    assert db.reads == 4
+
+
+def test_fetch_page_rejects_bad_cursor(db):
+    with pytest.raises(InvalidCursorError):
+        fetch_page(_query(db), ['date'], 3, 'garbage')
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import goated_model
+from event_features import FEATURE_NAMES
+from goated_model import ModelBundle, ModelRegistry, ModelValidationError, TrainingService
+from metrics import metrics
+from predictors import GoatedPredictor
+
+HOLDOUT_X = np.arange(20, dtype=float).reshape(10, 2)
+HOLDOUT_Y = np.full(10, 30.0)
+
+
+class OffsetPredictor(GoatedPredictor):
+    """Predicts the holdout target plus a fixed error, optionally with a compiled export"""
+    name = 'offset'
+
+    def __init__(self, error, compiled_error=None):
+        self.error = error
+        self.compiled_error = compiled_error
+
+    def predict(self, X):
+        return np.full(len(X), 30.0 + self.error)
+
+    def compile(self):
+        if self.compiled_error is None:
+            return None
+        return OffsetPredictor(self.compiled_error)
+
+
+def _result(predictor, holdout_mae=None, baseline_mae=8.0):
+    return {
+        'predictor': predictor,
+        'holdout_X': HOLDOUT_X,
+        'holdout_y': HOLDOUT_Y,
+        'holdout_mae': abs(predictor.error) if holdout_mae is None else holdout_mae,
+        'baseline_mae': baseline_mae,
+        'train_size': 40,
+        'training_seconds': 0.5,
+        'incremental': False,
+    }
+
+
+def _service_serving(live_error):
+    registry = ModelRegistry()
+    registry.publish(ModelBundle(version='live', predictor=OffsetPredictor(live_error), trained_at='',
+                                 training_seconds=0.0, holdout_mae=abs(live_error), train_size=40))
+    return TrainingService(registry, max_regression=0.10, mae_slack=1.0)
+
+
+def _rejected():
+    return metrics.snapshot()['counters'].get('model.rejected', 0)
+
+
+def test_publishes_first_candidate_that_beats_baseline():
+    service = TrainingService(ModelRegistry())
+    swapped = []
+    service.registry.add_listener(swapped.append)
+
+    bundle = service._validate_and_publish(_result(OffsetPredictor(3.0)), trained_rows=40, data_source='historical')
+
+    assert service.registry.current() is bundle
+    assert swapped == [bundle]
+    assert (bundle.holdout_mae, bundle.train_size, bundle.trained_rows, bundle.data_source) == \
+        (3.0, 40, 40, 'historical')
+    assert bundle.compiled is None
+
+
+@pytest.mark.parametrize('holdout_mae', [8.0, 9.5, float('nan'), float('inf')])
+def test_rejects_candidate_not_beating_mean_baseline(holdout_mae):
+    service = TrainingService(ModelRegistry())
+    rejected = _rejected()
+
+    with pytest.raises(ModelValidationError, match='baseline'):
+        service._validate_and_publish(_result(OffsetPredictor(3.0), holdout_mae=holdout_mae), 40, 'historical')
+
+    assert service.registry.current() is None
+    assert _rejected() == rejected + 1
+
+
+def test_rejects_candidate_regressing_past_relative_allowance():
+    # Live MAE 6 -> allowed max(6 * 1.1, 6 + 1) = 7
+    service = _service_serving(6.0)
+
+    with pytest.raises(ModelValidationError, match='live model live'):
+        service._validate_and_publish(_result(OffsetPredictor(7.5), baseline_mae=20.0), 40, 'historical')
+
+    assert service.registry.current().version == 'live'
+
+
+@pytest.mark.parametrize('live_error, candidate_error', [(6.0, 7.0), (2.0, 2.9), (20.0, 21.9), (5.0, 1.0)])
+def test_accepts_candidate_within_allowance(live_error, candidate_error):
+    service = _service_serving(live_error)
+
+    bundle = service._validate_and_publish(_result(OffsetPredictor(candidate_error), baseline_mae=30.0),
+                                           40, 'historical')
+
+    assert service.registry.current() is bundle
+    assert service.registry.history()[0]['version'] == 'live'
+
+
+def test_rejects_small_regression_past_absolute_slack():
+    # Live MAE 2 -> allowed max(2.2, 3.0) = 3
+    service = _service_serving(2.0)
+
+    with pytest.raises(ModelValidationError):
+        service._validate_and_publish(_result(OffsetPredictor(3.1)), 40, 'historical')
+
+
+def test_serves_compiled_export_only_when_it_matches():
+    service = TrainingService(ModelRegistry())
+
+    matching = service._validate_and_publish(_result(OffsetPredictor(3.0, compiled_error=3.0)), 40, 'historical')
+    mismatching = service._validate_and_publish(_result(OffsetPredictor(3.0, compiled_error=4.0)), 40, 'historical')
+
+    assert matching.compiled is not None
+    assert mismatching.compiled is None
+    assert service.registry.current() is mismatching
+
+
+def test_retrain_plans_off_the_event_loop(monkeypatch):
+    read_threads = []
+
+    class RecordingStore:
+        rows = 0
+
+        def read(self, start_row=0):
+            read_threads.append(threading.get_ident())
+            return np.empty((0, len(FEATURE_NAMES))), np.empty(0)
+
+    service = TrainingService(ModelRegistry(), store=RecordingStore())
+    service._executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(goated_model, 'train_goated_model', lambda X, y, backend: _result(OffsetPredictor(1.0)))
+
+    bundle = asyncio.run(service.retrain())
+
+    assert bundle is service.registry.current()
+    assert read_threads and threading.main_thread().ident not in read_threads
@@ -0,0 +1,70 @@
+import pytest
+
+from fakes import FakeFirestore
+from historical_events import HISTORICAL_LIST_FIELDS, MAX_PAGE_SIZE, list_historical_events, parse_fields
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore({'historical_events': {
+        f'h{i:03d}': {
+            'function_name': f'Function {i}',
+            'date': f'2025-{1 + i // 28:02d}-{1 + i % 28:02d}T21:00:00',
+            'rsvp_count': i % 40,
+            'attendees': [{'user_id': f'u{j}'} for j in range(3)],
+            **({'original_event_id': f'evt{i}'} if i % 2 else {}),
+        } for i in range(150)
+    }})
+
+
+def test_parse_fields_defaults_to_list_fields():
+    fields = parse_fields(None)
+
+    assert fields == HISTORICAL_LIST_FIELDS
+    assert fields is not HISTORICAL_LIST_FIELDS
+
+
+def test_parse_fields_all_means_whole_documents():
+    assert parse_fields(' all ') is None
+
+
+def test_parse_fields_adds_the_order_field():
+    assert parse_fields(' function_name, ,location ') == ['function_name', 'location', 'date']
+    assert parse_fields('date,function_name') == ['date', 'function_name']
+
+
+@pytest.mark.parametrize('limit, expected', [(0, 1), (-5, 1), (20, 20), (MAX_PAGE_SIZE, MAX_PAGE_SIZE),
+                                             (10_000, MAX_PAGE_SIZE)])
+def test_list_historical_events_caps_page_size(db, limit, expected):
+    events, next_cursor = list_historical_events(db, limit=limit, fields=parse_fields(None))
+
+    assert len(events) == expected
+    assert next_cursor is not None
+    assert db.reads == expected + 1
+
+
+def test_list_historical_events_pages_most_recent_first(db):
+    first, cursor = list_historical_events(db, limit=100, fields=parse_fields(None))
+    second, end = list_historical_events(db, limit=100, cursor=cursor, fields=parse_fields(None))
+
+    ids = [event['event_id'] for event in first + second]
+    assert ids == [f'h{i:03d}' for i in reversed(range(150))]
+    assert end is None
+
+
+def test_list_historical_events_projects_fields_and_fills_ids(db):
+    events, _ = list_historical_events(db, limit=2, fields=parse_fields('function_name'))
+
+    assert events == [
+        {'function_name': 'Function 149', 'date': '2025-06-10T21:00:00', 'event_id': 'h149',
+         'original_event_id': 'h149'},
+        {'function_name': 'Function 148', 'date': '2025-06-09T21:00:00', 'event_id': 'h148',
+         'original_event_id': 'h148'},
+    ]
+
+
+def test_list_historical_events_keeps_stored_original_id(db):
+    events, _ = list_historical_events(db, limit=1, fields=None)
+
+    assert events[0]['original_event_id'] == 'evt149'
+    assert 'attendees' in events[0]
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from fakes import FakeFirestore
+from historical_export import (
+    EXPORT_FIELDS,
+    ExportFieldsError,
+    ExportStats,
+    export_fields,
+    export_historical_events,
+    format_chunks,
+)
+from metrics import metrics
+
+PAGES = [
+    [
+        {'event_id': 'e1', 'function_name': 'Mods Darty', 'date': datetime(2025, 4, 12, 21, 0),
+         'emoji_vibe': ['🎉', '🔥'], 'rsvp_count': 42, 'ratings': [{'user_id': 'u1', 'rating': 5}]},
+        {'event_id': 'e2', 'function_name': 'Chess, "Night"', 'date': '2025-04-11T19:00:00',
+         'rsvp_count': 8, 'note': 'not exported'},
+    ],
+    [
+        {'event_id': 'e3', 'function_name': 'Line\nbreak', 'date': '2025-04-10T20:00:00', 'rsvp_count': None},
+    ],
+]
+
+
+def test_export_fields():
+    assert export_fields(None, 'csv') == EXPORT_FIELDS
+    assert export_fields('all', 'ndjson') is None
+    assert export_fields(' event_id, function_name ,,date', 'csv') == ['function_name', 'date']
+
+
+@pytest.mark.parametrize('fields, fmt', [('all', 'csv'), (' , event_id', 'ndjson')])
+def test_export_fields_rejects(fields, fmt):
+    with pytest.raises(ExportFieldsError):
+        export_fields(fields, fmt)
+
+
+def test_ndjson_one_chunk_per_page_with_selected_fields():
+    fields = ['function_name', 'date', 'rsvp_count', 'ratings']
+
+    chunks = list(format_chunks(iter(PAGES), 'ndjson', fields))
+
+    assert len(chunks) == 2
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert rows == [
+        {'event_id': 'e1', 'function_name': 'Mods Darty', 'date': '2025-04-12T21:00:00', 'rsvp_count': 42,
+         'ratings': [{'user_id': 'u1', 'rating': 5}]},
+        {'event_id': 'e2', 'function_name': 'Chess, "Night"', 'date': '2025-04-11T19:00:00', 'rsvp_count': 8,
+         'ratings': None},
+        {'event_id': 'e3', 'function_name': 'Line\nbreak', 'date': '2025-04-10T20:00:00', 'rsvp_count': None,
+         'ratings': None},
+    ]
+    assert chunks[0].endswith('\n')
+
+
+def test_ndjson_whole_documents():
+    chunks = list(format_chunks(iter(PAGES[:1]), 'ndjson', None))
+
+    row = json.loads(chunks[0].splitlines()[1])
+    assert row['note'] == 'not exported'
+    first = json.loads(chunks[0].splitlines()[0])
+    assert first['emoji_vibe'] == ['🎉', '🔥']
+
+
+def test_csv_header_chunk_then_rows():
+    fields = ['function_name', 'date', 'emoji_vibe', 'rsvp_count']
+
+    chunks = list(format_chunks(iter(PAGES), 'csv', fields))
+
+    assert chunks[0] == 'event_id,function_name,date,emoji_vibe,rsvp_count\n'
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(''.join(chunks))))
+    assert rows[1:] == [
+        ['e1', 'Mods Darty', '2025-04-12T21:00:00', '["🎉", "🔥"]', '42'],
+        ['e2', 'Chess, "Night"', '2025-04-11T19:00:00', '', '8'],
+        ['e3', 'Line\nbreak', '2025-04-10T20:00:00', '', ''],
+    ]
+
+
+def test_stats_and_metrics_count_rows_and_bytes():
+    rows_before = metrics.snapshot()['counters'].get('exports.rows', 0)
+    stats = ExportStats()
+
+    chunks = list(format_chunks(iter(PAGES), 'csv', ['function_name'], stats))
+
+    assert stats.rows == 3
+    assert stats.bytes == sum(len(chunk.encode('utf-8')) for chunk in chunks)
+    assert stats.seconds > 0
+    assert metrics.snapshot()['counters']['exports.rows'] - rows_before == 3
+
+
+def test_stats_recorded_when_consumer_stops_early():
+    stats = ExportStats()
+    chunks = format_chunks(iter(PAGES), 'ndjson', ['function_name'], stats)
+
+    next(chunks)
+    chunks.close()
+
+    assert stats.rows == 2
+    assert stats.seconds > 0
+
+
+def test_export_historical_events_pages_and_limits():
+    db = FakeFirestore({'historical_events': {
+        f'h{i}': {'function_name': f'Function {i}', 'date': f'2025-04-{10 + i:02d}'} for i in range(5)
+    }})
+
+    chunks = list(export_historical_events(db, 'ndjson', ['function_name', 'date'], limit=3, page_size=2))
+
+    assert [json.loads(line)['event_id'] for chunk in chunks for line in chunk.splitlines()] == ['h4', 'h3', 'h2']
+    assert len(chunks) == 2
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from invite_renderer import HEIGHT, WIDTH, _legacy_render, render_invite, vibe_strip
+
+EVENT = {'function_name': 'Mods Darty', 'location': 'The Mods',
+         'date': '2025-04-12T21:00:00', 'organizer_alias': 'Neon Wolf'}
+
+
+@pytest.mark.parametrize('vibe', [['🎉', '🔥', '🎵'], ['💃'], [], ['🍻', '🎊', '🎈', '🎮', '🏆']])
+def test_render_matches_the_uncached_renderer(vibe):
+    event = {**EVENT, 'emoji_vibe': vibe}
+
+    assert np.array_equal(np.asarray(render_invite(event)), np.asarray(_legacy_render(event)))
+
+
+def test_vibe_cache_holds_strips_not_full_frames():
+    _, strip = vibe_strip(('🎉', '🔥', '🎵'))
+
+    assert strip.width <= WIDTH and strip.height < HEIGHT // 4
@@ -0,0 +1,221 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_gateway
+from llm_gateway import CircuitBreaker, CircuitOpenError, LLMGateway, LLMUnavailableError
+from llm_stub import StubAsyncOpenAI, stub_completion
+
+MODEL = 'gpt-test'
+MESSAGES = [{'role': 'user', 'content': 'What should I do tonight?'}]
+
+
+class FlakyStubOpenAI(StubAsyncOpenAI):
+    """The stub client, failing calls while `failing` is set and tracking peak concurrency"""
+
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.failing = False
+        self.fail_mid_stream = False
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        completions = self.chat.completions
+        client = self
+
+        async def create(model, messages, stream=False, **kwargs):
+            client.in_flight += 1
+            client.peak_in_flight = max(client.peak_in_flight, client.in_flight)
+            try:
+                if client.failing:
+                    await asyncio.sleep(client.latency)
+                    raise RuntimeError('HTTP 500')
+                result = await completions.create(model, messages, stream=stream, **kwargs)
+            finally:
+                client.in_flight -= 1
+            if stream and client.fail_mid_stream:
+                return client._broken_stream(result)
+            return result
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    async def _broken_stream(self, stream):
+        async for chunk in stream:
+            yield chunk
+            raise ConnectionError('stream reset')
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the gateway's view of time - the event loop keeps the real clock
+    monkeypatch.setattr(llm_gateway, 'time', SimpleNamespace(monotonic=clock.monotonic, perf_counter=time.perf_counter))
+    return clock
+
+
+async def _collect(stream):
+    return [text async for text in stream]
+
+
+def test_chat_returns_stub_completion():
+    gateway = LLMGateway(StubAsyncOpenAI(latency=0))
+
+    assert asyncio.run(gateway.chat(MODEL, MESSAGES)) == stub_completion(MODEL, MESSAGES)
+    assert gateway.stats() == {MODEL: {'state': 'closed', 'consecutive_failures': 0}}
+
+
+def test_chat_deadline_raises_unavailable_and_counts_failure():
+    gateway = LLMGateway(StubAsyncOpenAI(latency=1.0))
+
+    start = time.perf_counter()
+    with pytest.raises(LLMUnavailableError, match='timed out'):
+        asyncio.run(gateway.chat(MODEL, MESSAGES, timeout=0.05))
+
+    assert time.perf_counter() - start < 0.5
+    assert gateway.breaker(MODEL).failures == 1
+
+
+def test_queueing_for_a_slot_counts_against_the_deadline():
+    gateway = LLMGateway(StubAsyncOpenAI(latency=0.3), concurrency={MODEL: 1})
+
+    async def run():
+        return await asyncio.gather(gateway.chat(MODEL, MESSAGES, timeout=1.0),
+                                    gateway.chat(MODEL, MESSAGES, timeout=0.1), return_exceptions=True)
+
+    first, second = asyncio.run(run())
+
+    assert first == stub_completion(MODEL, MESSAGES)
+    assert isinstance(second, LLMUnavailableError)
+
+
+def test_per_model_semaphore_caps_in_flight_calls():
+    client = FlakyStubOpenAI(latency=0.02)
+    gateway = LLMGateway(client, concurrency={MODEL: 2}, default_concurrency=5)
+
+    async def run():
+        await asyncio.gather(*(gateway.chat(MODEL, MESSAGES) for _ in range(8)))
+        capped = client.peak_in_flight
+        client.peak_in_flight = 0
+        await asyncio.gather(*(gateway.chat('other-model', MESSAGES) for _ in range(8)))
+        return capped, client.peak_in_flight
+
+    assert asyncio.run(run()) == (2, 5)
+    assert client.calls == 16
+
+
+def test_circuit_opens_half_opens_closes_and_reopens(clock):
+    client = FlakyStubOpenAI()
+    gateway = LLMGateway(client, failure_threshold=3, reset_timeout=30.0)
+    breaker = gateway.breaker(MODEL)
+
+    async def chat():
+        return await gateway.chat(MODEL, MESSAGES)
+
+    client.failing = True
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError):
+            asyncio.run(chat())
+    assert breaker.state == 'open'
+
+    # Open: rejected without calling upstream
+    calls = client.calls
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(chat())
+    assert client.calls == calls
+
+    # Half open: one trial call; a failure re-opens immediately
+    clock.now += 30
+    assert breaker.state == 'half_open'
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(chat())
+    assert breaker.state == 'open'
+
+    # A successful trial closes it again
+    clock.now += 30
+    client.failing = False
+    assert asyncio.run(chat()) == stub_completion(MODEL, MESSAGES)
+    assert breaker.state == 'closed'
+    assert breaker.failures == 0
+
+    # And it takes the full threshold to open it once more
+    client.failing = True
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            asyncio.run(chat())
+    assert breaker.state == 'closed'
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(chat())
+    assert breaker.state == 'open'
+
+
+def test_half_open_lets_only_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_cancelled()
+    assert breaker.allow()
+
+
+def test_chat_stream_yields_deltas():
+    gateway = LLMGateway(StubAsyncOpenAI(latency=0))
+
+    chunks = asyncio.run(_collect(gateway.chat_stream(MODEL, MESSAGES)))
+
+    assert ''.join(chunks) == stub_completion(MODEL, MESSAGES)
+    assert len(chunks) > 1
+
+
+def test_chat_stream_failure_raises_unavailable_and_frees_slot():
+    client = FlakyStubOpenAI()
+    client.fail_mid_stream = True
+    gateway = LLMGateway(client, concurrency={MODEL: 1}, failure_threshold=2)
+
+    async def run():
+        received = []
+        with pytest.raises(LLMUnavailableError, match='stream failed: stream reset'):
+            async for text in gateway.chat_stream(MODEL, MESSAGES):
+                received.append(text)
+        client.fail_mid_stream = False
+        # The single slot was released, so the next stream isn't stuck behind it
+        return received, await asyncio.wait_for(_collect(gateway.chat_stream(MODEL, MESSAGES)), timeout=2)
+
+    received, retried = asyncio.run(run())
+
+    assert len(received) == 1
+    assert ''.join(retried) == stub_completion(MODEL, MESSAGES)
+    assert gateway.breaker(MODEL).failures == 0
+
+
+def test_chat_stream_failures_open_the_circuit(clock):
+    client = FlakyStubOpenAI()
+    client.failing = True
+    gateway = LLMGateway(client, failure_threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError, match='stream failed'):
+            asyncio.run(_collect(gateway.chat_stream(MODEL, MESSAGES)))
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_collect(gateway.chat_stream(MODEL, MESSAGES)))
+
+
+def test_chat_stream_deadline_covers_the_whole_stream():
+    gateway = LLMGateway(StubAsyncOpenAI(latency=0))
+
+    with pytest.raises(LLMUnavailableError, match='stream timed out'):
+        asyncio.run(_collect(gateway.chat_stream(MODEL, MESSAGES, timeout=0.1)))
+
+    assert gateway.breaker(MODEL).failures == 1
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from local_storage import LocalBucket, PreconditionFailed
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    bucket = LocalBucket(str(tmp_path / 'bucket'), 'http://storage.test/')
+    _upload(bucket, 'event-invites/inside.png')
+    return bucket
+
+
+def _upload(bucket, name, data=b'png', public=True):
+    bucket.blob(name).upload_from_string(data, content_type='image/png',
+                                         predefined_acl='publicRead' if public else None)
+
+
+def test_public_blob_serves_public_objects(bucket):
+    _upload(bucket, 'event-invites/a b.png')
+
+    blob = bucket.public_blob('event-invites/a b.png')
+
+    assert blob.download_as_bytes() == b'png'
+    assert blob.public_url == 'http://storage.test/event-invites/a%20b.png'
+
+
+def test_public_blob_hides_private_missing_and_internal_files(bucket):
+    _upload(bucket, 'private.png', public=False)
+    _upload(bucket, 'public.png')
+
+    assert bucket.public_blob('private.png') is None
+    assert bucket.public_blob('missing.png') is None
+    assert bucket.public_blob('event-invites') is None
+    assert bucket.public_blob('public.png.meta.json') is None
+    assert bucket.public_blob('public.png.part') is None
+
+
+@pytest.mark.parametrize('name', [
+    '../secret.png',
+    'event-invites/../../secret.png',
+    '/secret.png',
+    '..',
+])
+def test_public_blob_rejects_path_escapes(bucket, tmp_path, name):
+    # A "public" object just outside the bucket root
+    (tmp_path / 'secret.png').write_bytes(b'secret')
+    (tmp_path / 'secret.png.meta.json').write_text('{"acl": "publicRead"}')
+
+    assert bucket.public_blob(name) is None
+
+
+def test_public_blob_rejects_symlink_out_of_root(bucket, tmp_path):
+    (tmp_path / 'secret.png').write_bytes(b'secret')
+    _upload(bucket, 'link.png')
+    os.remove(bucket.blob('link.png').path)
+    os.symlink(tmp_path / 'secret.png', bucket.blob('link.png').path)
+
+    assert bucket.public_blob('link.png') is None
+
+
+def test_public_blob_rejects_sibling_directory_with_root_prefix(bucket, tmp_path):
+    sibling = tmp_path / 'bucket-other'
+    sibling.mkdir()
+    (sibling / 'x.png').write_bytes(b'secret')
+    (sibling / 'x.png.meta.json').write_text('{"acl": "publicRead"}')
+
+    assert bucket.public_blob('../bucket-other/x.png') is None
+
+
+def test_if_generation_match_zero_refuses_overwrite(bucket):
+    _upload(bucket, 'a.png', b'first')
+
+    with pytest.raises(PreconditionFailed) as error:
+        bucket.blob('a.png').upload_from_string(b'second', if_generation_match=0)
+
+    assert error.value.code == 412
+    assert bucket.blob('a.png').download_as_bytes() == b'first'
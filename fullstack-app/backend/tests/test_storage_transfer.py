@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from local_storage import LocalBucket
+from storage_transfer import (
+    IMMUTABLE_CACHE_CONTROL,
+    PUBLIC_ACL,
+    content_hash_path,
+    spool_file,
+    stream_url_to_blob,
+    upload_immutable,
+)
+
+PAYLOAD = os.urandom(3 * 256 * 1024 + 123)
+
+
+@pytest.fixture(scope='module')
+def image_server():
+    """Keep-alive HTTP server serving PAYLOAD at /image.png (404 elsewhere); records client ports"""
+    client_ports = set()
+
+    class ImageHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            client_ports.add(self.client_address[1])
+            if self.path != '/image.png':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(PAYLOAD)))
+            self.end_headers()
+            for i in range(0, len(PAYLOAD), 64 * 1024):
+                self.wfile.write(PAYLOAD[i:i + 64 * 1024])
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", client_ports
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    return LocalBucket(str(tmp_path), 'http://storage.test')
+
+
+def test_stream_url_to_blob_uploads_public_immutable_blob_in_chunks(image_server, bucket):
+    base_url, _ = image_server
+
+    public_url = stream_url_to_blob(bucket, f"{base_url}/image.png", 'event-invites/a.png', chunk_size=256 * 1024)
+
+    blob = bucket.blob('event-invites/a.png')
+    assert public_url == 'http://storage.test/event-invites/a.png'
+    assert blob.download_as_bytes() == PAYLOAD
+    assert blob.metadata() == {'content_type': 'image/png', 'cache_control': IMMUTABLE_CACHE_CONTROL,
+                               'acl': PUBLIC_ACL}
+    assert bucket.chunks_uploaded == 4
+
+
+def test_stream_url_to_blob_copies_body_into_rewound_spool(image_server, bucket):
+    base_url, _ = image_server
+
+    with spool_file() as spool:
+        stream_url_to_blob(bucket, f"{base_url}/image.png", 'event-invites/b.png', spool=spool)
+        assert spool.tell() == 0
+        assert hashlib.sha256(spool.read()).digest() == hashlib.sha256(PAYLOAD).digest()
+
+
+def test_stream_url_to_blob_reuses_one_connection(image_server, bucket):
+    base_url, client_ports = image_server
+    client_ports.clear()
+
+    for i in range(3):
+        stream_url_to_blob(bucket, f"{base_url}/image.png", f"event-invites/c{i}.png")
+
+    assert len(client_ports) == 1
+
+
+def test_stream_url_to_blob_rejects_non_200_without_creating_blob(image_server, bucket):
+    base_url, _ = image_server
+
+    with pytest.raises(Exception, match='HTTP 404'):
+        stream_url_to_blob(bucket, f"{base_url}/missing.png", 'event-invites/d.png')
+
+    assert not bucket.blob('event-invites/d.png').exists()
+
+
+def test_upload_immutable_stores_under_content_hash(bucket):
+    public_url = upload_immutable(bucket, 'event-invites', b'png bytes', 'image/png', 'png')
+
+    path = content_hash_path('event-invites', b'png bytes', 'png')
+    assert public_url == f'http://storage.test/{path}'
+    blob = bucket.blob(path)
+    assert blob.download_as_bytes() == b'png bytes'
+    assert blob.metadata()['cache_control'] == IMMUTABLE_CACHE_CONTROL
+    assert blob.acl == PUBLIC_ACL
+
+
+def test_upload_immutable_skips_existing_object(bucket):
+    first = upload_immutable(bucket, 'event-invites', b'same bytes', 'image/png', 'png')
+    path = content_hash_path('event-invites', b'same bytes', 'png')
+    mtime = os.stat(bucket.blob(path).path).st_mtime_ns
+
+    second = upload_immutable(bucket, 'event-invites', b'same bytes', 'image/png', 'png')
+
+    assert second == first
+    assert os.stat(bucket.blob(path).path).st_mtime_ns == mtime
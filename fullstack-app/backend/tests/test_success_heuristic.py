@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from event_features import generate_historical_event_data
+from success_heuristic import (
+    calculate_capacity_utilization_score,
+    calculate_club_affiliation_score,
+    calculate_location_score,
+    calculate_time_score,
+    calculate_vibe_score,
+    combine_factor_scores,
+    score_events_batch,
+    success_reason,
+)
+
+
+def scalar_prediction(event):
+    """main.predict_event_success on an event dict (main needs Firebase credentials to import)"""
+    factors = {
+        'timing': calculate_time_score(event.get('date')),
+        'location': calculate_location_score(event.get('location') or '', event.get('location_id')),
+        'current_interest': calculate_capacity_utilization_score(
+            event.get('rsvp_count') or 0, event.get('max_capacity') or 0),
+        'organization': calculate_club_affiliation_score(
+            bool(event.get('club_affiliated')), event.get('club_name'), event.get('club_id')),
+        'presentation': calculate_vibe_score(event.get('emoji_vibe')),
+    }
+    score = int(combine_factor_scores(factors) * 100)
+    ranked = sorted(factors.items(), key=lambda x: x[1], reverse=True)
+    return factors, score, success_reason(score, [name for name, _ in ranked])
+
+
+EDGE_EVENTS = [
+    # Every hour of a weekday and a weekend day
+    *({'date': f'2025-04-{day}T{hour:02d}:30:00', 'location': 'The Mods'}
+      for day in (9, 12) for hour in range(24)),
+    {'date': 'not a date', 'location': 'Walsh Hall'},
+    {'date': '2025-04-12T21:00:00Z', 'location': 'Unknown Basement'},
+    # Utilization boundaries
+    *({'date': '2025-04-12T21:00:00', 'rsvp_count': rsvp, 'max_capacity': 100}
+      for rsvp in (0, 29, 30, 39, 40, 59, 60, 80, 81, 95, 96, 100, 120)),
+    {'date': '2025-04-12T21:00:00', 'rsvp_count': 10, 'max_capacity': 0},
+    {'date': '2025-04-12T21:00:00', 'rsvp_count': None, 'max_capacity': None},
+    # Club and vibe variants
+    {'date': '2025-04-12T21:00:00', 'club_affiliated': True, 'club_name': 'FISTS'},
+    {'date': '2025-04-12T21:00:00', 'club_affiliated': True, 'club_name': 'Not A Club'},
+    {'date': '2025-04-12T21:00:00', 'club_affiliated': False, 'club_name': 'FISTS'},
+    *({'date': '2025-04-12T21:00:00', 'emoji_vibe': ['🔥'] * count} for count in range(5)),
+    {'date': '2025-04-12T21:00:00', 'emoji_vibe': None},
+]
+
+
+@pytest.mark.parametrize('events', [
+    generate_historical_event_data(num_events=300, seed=7, now=datetime(2025, 4, 12)),
+    EDGE_EVENTS,
+], ids=['generated', 'edge_cases'])
+def test_batch_matches_scalar_prediction(events):
+    batch = score_events_batch(events)
+
+    for i, event in enumerate(events):
+        factors, score, reason = scalar_prediction(event)
+        assert {name: float(column[i]) for name, column in batch['factors'].items()} == factors, event
+        assert int(batch['scores'][i]) == score, event
+        assert batch['reasons'][i] == reason, event
+
+
+def test_batch_of_no_events():
+    batch = score_events_batch([])
+
+    assert len(batch['scores']) == 0
+    assert batch['reasons'] == []
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from fakes import FakeFirestore
+from user_activity import (
+    CURRENT,
+    FOLLOWERS,
+    FUNCTIONS_SCHEMA_VERSION,
+    PAST,
+    UserActivity,
+    follower_doc_id,
+)
+
+FOLLOWERS_PATH = f'users/u1/{FOLLOWERS}'
+
+
+def _followers(db):
+    return sorted(data['handle'] for data in db.docs(FOLLOWERS_PATH).values())
+
+
+def _user(db):
+    return db.docs('users')['u1']
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore({'users': {'u1': {'name': 'Eagle', 'instagram_follower_count': 0}}})
+
+
+@pytest.fixture
+def activity(db):
+    return UserActivity(db, recent_size=2)
+
+
+def test_set_followers_replaces_the_stored_set(db, activity):
+    activity.set_followers('u1', ['@alice', 'bob', 'carol'])
+
+    count = activity.set_followers('u1', ['bob', ' @Dave ', 'BOB', '', '@'])
+
+    assert _followers(db) == ['@Dave', 'bob']
+    assert set(db.docs(FOLLOWERS_PATH)) == {'bob', 'dave'}
+    assert count == 3
+    assert _user(db)['instagram_follower_count'] == 3
+
+
+def test_set_followers_keeps_a_larger_scraped_total(db, activity):
+    _user(db)['instagram_follower_count'] = 1200
+
+    count = activity.set_followers('u1', ['alice', 'bob'])
+
+    assert count == 1200
+    assert _user(db)['instagram_follower_count'] == 1200
+
+
+def test_set_followers_writes_only_changes(db, activity):
+    activity.set_followers('u1', ['alice', 'bob'])
+    added_at = db.docs(FOLLOWERS_PATH)['alice']['added_at']
+    db.docs(FOLLOWERS_PATH)['alice']['added_at'] = 'original'
+
+    activity.set_followers('u1', ['alice', 'carol'])
+
+    assert db.docs(FOLLOWERS_PATH)['alice']['added_at'] == 'original'
+    assert added_at != 'original'
+
+
+def test_update_followers_never_touches_unnamed_handles(db, activity):
+    # More followers than a profile page loads
+    db.collections[FOLLOWERS_PATH] = {f'f{i:03d}': {'handle': f'f{i:03d}'} for i in range(150)}
+    _user(db)['instagram_follower_count'] = 900
+
+    count = activity.update_followers('u1', add=['@new', 'f001'], remove=['f002', 'missing'])
+
+    assert len(db.docs(FOLLOWERS_PATH)) == 150
+    assert 'new' in db.docs(FOLLOWERS_PATH) and 'f002' not in db.docs(FOLLOWERS_PATH)
+    assert count == 900
+    assert _user(db)['instagram_follower_count'] == 900
+
+
+def test_update_followers_moves_count_by_net_change(db, activity):
+    _user(db)['instagram_follower_count'] = 10
+
+    assert activity.update_followers('u1', add=['a', 'b', 'A']) == 12
+    assert activity.update_followers('u1', remove=['@a']) == 11
+    assert activity.update_followers('u1', add=['b'], remove=['b']) == 11
+    assert _followers(db) == ['b']
+
+
+def test_update_followers_without_changes_reads_no_followers(db, activity):
+    _user(db)['instagram_follower_count'] = 7
+    db.reads = 0
+
+    assert activity.update_followers('u1') == 7
+    assert db.batches == 0
+    assert db.reads == 1
+
+
+def test_follower_doc_id_is_case_insensitive_and_slash_safe():
+    assert follower_doc_id(' @Alice ') == follower_doc_id('alice') == 'alice'
+    assert '/' not in follower_doc_id('a/b')
+
+
+def _legacy_user():
+    return {
+        'name': 'Eagle',
+        CURRENT: [
+            {'event_id': 'later', 'function_name': 'Later', 'date': '2025-05-02T21:00:00'},
+            {'event_id': 'soon', 'function_name': 'Soon', 'date': '2025-05-01T21:00:00'},
+            {'event_id': 'soon', 'function_name': 'Soon (edited)', 'date': '2025-05-01T20:00:00'},
+            {'event_id': 'undated', 'function_name': 'Undated'},
+        ],
+        PAST: [
+            {'event_id': 'old', 'function_name': 'Old', 'date': '2025-01-01T21:00:00', 'final_rating': 4.5},
+            {'original_event_id': 'recent', 'function_name': 'Recent', 'date': '2025-03-01T21:00:00'},
+            {'function_name': 'No id', 'date': '2025-02-01T21:00:00Z'},
+        ],
+        FOLLOWERS: ['alice', '@Alice', 'bob', ''],
+        'instagram_follower_count': 640,
+    }
+
+
+def test_migrate_user_moves_arrays_into_subcollections(db, activity):
+    db.collections['users']['u1'] = _legacy_user()
+    user_ref = db.collection('users').document('u1')
+
+    activity.migrate_user(user_ref, _legacy_user())
+
+    current = db.docs(f'users/u1/{CURRENT}')
+    assert set(current) == {'later', 'soon', 'undated'}
+    assert current['soon']['function_name'] == 'Soon (edited)'
+    assert current['soon']['date_ts'] == datetime(2025, 5, 1, 20, tzinfo=timezone.utc)
+    assert current['undated']['date_ts'] is None
+    past = db.docs(f'users/u1/{PAST}')
+    assert len(past) == 3 and 'recent' in past
+    assert _followers(db) == ['alice', 'bob']
+
+
+def test_migrate_user_updates_counters_and_recent_summaries(db, activity):
+    db.collections['users']['u1'] = _legacy_user()
+
+    activity.migrate_user(db.collection('users').document('u1'), _legacy_user())
+
+    user = _user(db)
+    assert not any(field in user for field in (CURRENT, PAST, FOLLOWERS))
+    assert (user['current_functions_count'], user['past_functions_count'], user['rated_functions_count']) == \
+        (3, 3, 1)
+    # The scraped total is larger than the stored handles, so it is kept
+    assert user['instagram_follower_count'] == 640
+    # Undated functions sort first when ascending, like the date_ts query
+    assert [f['event_id'] for f in user['recent_current_functions']] == ['undated', 'soon']
+    assert [f['function_name'] for f in user['recent_past_functions']] == ['Recent', 'No id']
+    assert user['functions_schema'] == FUNCTIONS_SCHEMA_VERSION
+
+
+def test_migrate_user_counts_followers_when_no_total_was_stored(db, activity):
+    legacy = {**_legacy_user(), 'instagram_follower_count': None}
+    db.collections['users']['u1'] = dict(legacy)
+
+    activity.migrate_user(db.collection('users').document('u1'), legacy)
+
+    assert _user(db)['instagram_follower_count'] == 2
+
+
+def test_ensure_migrated_is_a_no_op_once_upgraded(db, activity):
+    db.collections['users']['u1'] = _legacy_user()
+    user_ref = db.collection('users').document('u1')
+
+    assert activity.ensure_migrated(user_ref.get())
+    assert not activity.ensure_migrated(user_ref.get())
@@ -0,0 +1,153 @@
+"""
+Training data pipeline for the goated model
+
+Streams the real `historical_events` collection in pages, extracts features
+once and appends them to a local columnar feature store (one little-endian
+float64 file per column + a manifest). Only documents we haven't seen are
+fetched, so retraining can pick up just the new rows.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from event_features import FEATURE_NAMES, extract_features
+from firestore_paging import iter_query_pages
+
+DEFAULT_STORE_PATH = os.getenv(
+    'GOATED_FEATURE_STORE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'goated_features')
+)
+
+TARGET_COLUMN = 'target_rsvp_count'
+COLUMNS = list(FEATURE_NAMES) + [TARGET_COLUMN]
+
+
+class FeatureStore:
+    """
+    Append-only columnar feature file
+
+    Each column is a raw float64 file that only ever grows. The manifest is
+    rewritten atomically after the column appends, and its `rows` count is the
+    source of truth - bytes past it (from a crash mid-append) are ignored and
+    overwritten by the next append.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.manifest = self._load_manifest()
+
+    @property
+    def rows(self):
+        return self.manifest['rows']
+
+    @property
+    def last_doc_id(self):
+        return self.manifest.get('last_doc_id')
+
+    def _manifest_path(self):
+        return os.path.join(self.path, 'manifest.json')
+
+    def _column_path(self, column):
+        return os.path.join(self.path, f'{column}.f64')
+
+    def _empty_manifest(self):
+        return {'columns': COLUMNS, 'rows': 0, 'last_doc_id': None, 'updated_at': None}
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self._empty_manifest()
+
+        # Feature schema changed - cached rows are no longer valid
+        if manifest.get('columns') != COLUMNS:
+            print("⚠️ Feature schema changed, resetting goated feature store")
+            self.reset()
+            return self._empty_manifest()
+        return manifest
+
+    def reset(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.manifest = self._empty_manifest()
+
+    def append(self, X, targets, last_doc_id):
+        """Append a block of rows (X: n x len(FEATURE_NAMES))"""
+        X = np.asarray(X, dtype='<f8').reshape(-1, len(FEATURE_NAMES))
+        if len(X) == 0:
+            return 0
+
+        os.makedirs(self.path, exist_ok=True)
+        block = np.column_stack([X, np.asarray(targets, dtype='<f8')])
+        offset = self.rows * 8
+
+        for i, column in enumerate(COLUMNS):
+            column_path = self._column_path(column)
+            mode = 'r+b' if os.path.exists(column_path) else 'wb'
+            with open(column_path, mode) as f:
+                f.seek(offset)
+                f.write(np.ascontiguousarray(block[:, i]).tobytes())
+                f.truncate()
+
+        manifest = {
+            **self.manifest,
+            'rows': self.rows + len(X),
+            'last_doc_id': last_doc_id,
+            'updated_at': datetime.utcnow().isoformat(),
+        }
+        tmp_path = self._manifest_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+        self.manifest = manifest
+        return len(X)
+
+    def read(self, start_row=0):
+        """Return (X, y) for rows [start_row, rows)"""
+        count = max(0, self.rows - start_row)
+        if count == 0:
+            return np.empty((0, len(FEATURE_NAMES))), np.empty(0)
+
+        columns = []
+        for column in FEATURE_NAMES + [TARGET_COLUMN]:
+            columns.append(np.fromfile(self._column_path(column), dtype='<f8',
+                                       count=count, offset=start_row * 8))
+        data = np.column_stack(columns)
+        return data[:, :-1], data[:, -1]
+
+
+def sync_historical_events(db, store, page_size=500):
+    """
+    Pull historical_events we haven't cached yet into the feature store
+
+    Ordered by (moved_to_historical_at, document id) - events are only ever
+    appended to the archive, so resuming after the last cached document picks
+    up exactly the new ones. Blocking; run it in a thread from async code.
+    """
+    query = db.collection('historical_events').order_by('moved_to_historical_at')
+
+    start_after = None
+    if store.last_doc_id:
+        last_doc = db.collection('historical_events').document(store.last_doc_id).get()
+        if last_doc.exists:
+            start_after = last_doc
+        else:
+            # Cursor document is gone, so we can't tell what's new - rebuild from scratch
+            print("⚠️ Feature store cursor missing, rebuilding from historical_events")
+            store.reset()
+
+    added = 0
+    for page in iter_query_pages(query, page_size=page_size, start_after=start_after):
+        X, targets = [], []
+        for doc in page:
+            event = doc.to_dict()
+            X.append(extract_features(event))
+            targets.append(event.get('rsvp_count', 0) or 0)
+        added += store.append(X, targets, last_doc_id=page[-1].id)
+
+    if added:
+        print(f"📦 Cached features for {added} new historical events ({store.rows} total)")
+    return added
@@ -0,0 +1,405 @@
+"""
+Per-user function history and Instagram followers, kept in subcollections
+
+User documents used to embed `current_functions`, `past_functions` and
+`instagram_followers` arrays, so every profile read loaded a user's whole
+history and every change rewrote it. They now live one document each in
+
+    users/{uid}/current_functions/{event_id}
+    users/{uid}/past_functions/{event_id}
+    users/{uid}/instagram_followers/{handle}
+
+and the user document only keeps compact counters
+(`current_functions_count`, `past_functions_count`,
+`instagram_follower_count`, `rated_functions_count`) plus the
+`recent_current_functions` / `recent_past_functions` summaries (the
+RECENT_SIZE soonest upcoming / latest past functions, a few fields each).
+Counters move in the same transaction as the subcollection write.
+
+Function documents carry `date_ts`, the ISO `date` parsed to a UTC timestamp,
+so lists are queried in date order (date_ts, then document id) and paged
+with firestore_paging cursor tokens - a first page costs the same however
+long the history is. Filtering by status needs a composite index on each
+subcollection: (status ASC, date_ts ASC) for current_functions and
+(status ASC, date_ts DESC) for past_functions.
+
+Users that still embed the arrays, or whose functions predate `date_ts`
+(`functions_schema` below FUNCTIONS_SCHEMA_VERSION), are upgraded once at
+startup (the `meta/user_activity` document records the schema it reached)
+and, until then, inline by ensure_migrated() on the paths that touch them.
+"""
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from firebase_admin import firestore
+
+from firestore_paging import fetch_page, iter_query_documents
+from metrics import metrics
+
+CURRENT = 'current_functions'
+PAST = 'past_functions'
+FOLLOWERS = 'instagram_followers'
+EMBEDDED_FIELDS = (CURRENT, PAST, FOLLOWERS)
+
+FUNCTIONS_SCHEMA_VERSION = 3  # 2: subcollections, 3: + date_ts
+RECENT_SIZE = 5
+MAX_PAGE_SIZE = 100
+BATCH_SIZE = 400  # Firestore allows 500 writes per batch
+
+COUNT_FIELDS = {
+    CURRENT: 'current_functions_count',
+    PAST: 'past_functions_count',
+    FOLLOWERS: 'instagram_follower_count',
+}
+# Soonest upcoming first, most recent past first
+FUNCTION_ORDER = {CURRENT: firestore.Query.ASCENDING, PAST: firestore.Query.DESCENDING}
+FUNCTION_CURSOR_FIELDS = ['date_ts']
+SUMMARY_FIELDS = ('event_id', 'function_name', 'date', 'status', 'emoji_vibe',
+                  'invitation_image', 'invitation_images', 'final_rating')
+_NO_DATE = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def recent_field(kind):
+    return f"recent_{kind}"
+
+
+def function_summary(function):
+    """The few fields profile cards need"""
+    return {field: function[field] for field in SUMMARY_FIELDS if function.get(field) is not None}
+
+
+def function_timestamp(date):
+    """UTC datetime for an ISO `date` (naive dates count as UTC, like the move-to-past check), or None"""
+    if not date:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(date).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+
+def with_timestamp(function):
+    return {**function, 'date_ts': function_timestamp(function.get('date'))}
+
+
+def public_function(function):
+    """A function document as the API returns it (date_ts is for ordering only)"""
+    function.pop('date_ts', None)
+    return function
+
+
+def function_doc_id(function):
+    return function.get('event_id') or function.get('original_event_id')
+
+
+def follower_doc_id(handle):
+    # One document per account; '/' can't appear in a document id
+    return quote(handle.strip().lstrip('@').lower(), safe='')
+
+
+def _follower_handles(handles):
+    """{document id: handle as given} for the non-empty handles, first spelling wins"""
+    followers = {}
+    for handle in handles:
+        if handle and handle.strip().lstrip('@'):
+            followers.setdefault(follower_doc_id(handle), handle.strip())
+    return followers
+
+
+def clamp_page_size(limit):
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+class UserActivity:
+
+    def __init__(self, db, recent_size=RECENT_SIZE):
+        self.db = db
+        self.recent_size = recent_size
+
+    def _user_ref(self, user_id):
+        return self.db.collection('users').document(user_id)
+
+    def _collection(self, user_id, kind):
+        return self._user_ref(user_id).collection(kind)
+
+    def _marker_ref(self):
+        return self.db.collection('meta').document('user_activity')
+
+    # Function history
+
+    def add_function(self, user_id, kind, function):
+        """Store a current/past function (replacing one with the same event id) (blocking)"""
+        user_ref = self._user_ref(user_id)
+        function_ref = self._collection(user_id, kind).document(function_doc_id(function))
+
+        @firestore.transactional
+        def add(transaction):
+            is_new = not function_ref.get(transaction=transaction).exists
+            transaction.set(function_ref, with_timestamp(function))
+            if is_new:
+                transaction.update(user_ref, {COUNT_FIELDS[kind]: firestore.Increment(1)})
+
+        add(self.db.transaction())
+        self.refresh_recent(user_id, kind)
+
+    def remove_function(self, user_id, kind, event_id):
+        """Delete a function -> whether it existed (blocking)"""
+        user_ref = self._user_ref(user_id)
+        function_ref = self._collection(user_id, kind).document(event_id)
+
+        @firestore.transactional
+        def remove(transaction):
+            if not function_ref.get(transaction=transaction).exists:
+                return False
+            transaction.delete(function_ref)
+            transaction.update(user_ref, {COUNT_FIELDS[kind]: firestore.Increment(-1)})
+            return True
+
+        removed = remove(self.db.transaction())
+        if removed:
+            self.refresh_recent(user_id, kind)
+        return removed
+
+    def complete_function(self, user_id, event_id, updates):
+        """Move a current function to past_functions, merged with updates -> whether it moved (blocking)"""
+        user_ref = self._user_ref(user_id)
+        current_ref = self._collection(user_id, CURRENT).document(event_id)
+        past_ref = self._collection(user_id, PAST).document(event_id)
+
+        @firestore.transactional
+        def complete(transaction):
+            current_doc = current_ref.get(transaction=transaction)
+            if not current_doc.exists:
+                return False
+            already_past = past_ref.get(transaction=transaction).exists
+            transaction.set(past_ref, with_timestamp({**current_doc.to_dict(), **updates}))
+            transaction.delete(current_ref)
+            counters = {COUNT_FIELDS[CURRENT]: firestore.Increment(-1)}
+            if not already_past:
+                counters[COUNT_FIELDS[PAST]] = firestore.Increment(1)
+            transaction.update(user_ref, counters)
+            return True
+
+        moved = complete(self.db.transaction())
+        if moved:
+            self.refresh_recent(user_id, CURRENT)
+            self.refresh_recent(user_id, PAST)
+        return moved
+
+    def finalize_rating(self, user_id, event_id, average_rating):
+        """
+        Fold a finished function's average rating into the organizer's rating (blocking)
+        new = (current * rated_count + average) / (rated_count + 1)
+        Returns (old rating, new rating, rated functions count), or None if the user is gone
+        """
+        user_ref = self._user_ref(user_id)
+        past_ref = self._collection(user_id, PAST).document(event_id)
+
+        @firestore.transactional
+        def finalize(transaction):
+            user_doc = user_ref.get(field_paths=['personal_rating', 'rated_functions_count'],
+                                    transaction=transaction)
+            if not user_doc.exists:
+                return None
+            past_doc = past_ref.get(transaction=transaction)
+
+            user_data = user_doc.to_dict()
+            current_rating = user_data.get('personal_rating', 5)
+            rated_count = user_data.get('rated_functions_count', 0)
+            if past_doc.exists and past_doc.to_dict().get('rating_finalized'):
+                return current_rating, current_rating, rated_count
+
+            new_rating = round(((current_rating * rated_count) + average_rating) / (rated_count + 1), 1)
+            transaction.update(user_ref, {
+                'personal_rating': new_rating,
+                'rated_functions_count': firestore.Increment(1),
+            })
+            if past_doc.exists:
+                transaction.update(past_ref, {'final_rating': average_rating, 'rating_finalized': True})
+            return current_rating, new_rating, rated_count + 1
+
+        result = finalize(self.db.transaction())
+        if result:
+            self.refresh_recent(user_id, PAST)
+        return result
+
+    def _ordered(self, user_id, kind, status=None):
+        """Functions of a kind in date order, ties broken by document id"""
+        direction = FUNCTION_ORDER[kind]
+        query = self._collection(user_id, kind)
+        if status:
+            query = query.where('status', '==', status)
+        return query.order_by('date_ts', direction=direction).order_by('__name__', direction=direction)
+
+    def refresh_recent(self, user_id, kind):
+        """Rewrite the user's recent_<kind> summary from the subcollection (blocking)"""
+        query = self._ordered(user_id, kind).limit(self.recent_size)
+        recent = [function_summary(doc.to_dict()) for doc in query.stream()]
+        self._user_ref(user_id).update({recent_field(kind): recent})
+
+    def list_functions(self, user_id, kind, limit=50, cursor=None, status=None):
+        """One page of functions in date order -> (functions, next cursor token or None) (blocking)"""
+        docs, next_cursor = fetch_page(self._ordered(user_id, kind, status), FUNCTION_CURSOR_FIELDS,
+                                       clamp_page_size(limit), cursor)
+        metrics.incr('user_activity.page_reads')
+        return [public_function(doc.to_dict()) for doc in docs], next_cursor
+
+    def iter_functions(self, user_id, kind, before=None):
+        """Every function of a kind in date order, optionally only those dated before a UTC datetime (blocking)"""
+        query = self._ordered(user_id, kind)
+        if before is not None:
+            query = query.where('date_ts', '<', before)
+        for doc in iter_query_documents(query):
+            yield public_function(doc.to_dict())
+
+    # Instagram followers
+
+    def set_followers(self, user_id, handles):
+        """
+        Replace the user's follower list with a complete set of handles (e.g. a fresh
+        scrape), writing only what changed -> follower count (blocking)
+
+        The count never drops below a previously stored total - a scrape may store
+        fewer handles than the account's real follower count.
+        """
+        collection = self._collection(user_id, FOLLOWERS)
+        wanted = _follower_handles(handles)
+
+        existing = {doc.id for doc in iter_query_documents(collection.order_by('__name__').select([]))}
+        added_at = datetime.utcnow().isoformat()
+        writes = [('delete', doc_id, None) for doc_id in existing - wanted.keys()]
+        writes += [('set', doc_id, {'handle': wanted[doc_id], 'added_at': added_at})
+                   for doc_id in wanted.keys() - existing]
+        self._commit_writes(collection, writes)
+
+        user_ref = self._user_ref(user_id)
+        stored = (user_ref.get().to_dict() or {}).get(COUNT_FIELDS[FOLLOWERS]) or 0
+        count = max(stored, len(wanted))
+        user_ref.update({COUNT_FIELDS[FOLLOWERS]: count})
+        return count
+
+    def update_followers(self, user_id, add=(), remove=()):
+        """
+        Add and remove individual follower handles -> follower count (blocking)
+
+        Only the named handles are read and written, so callers never need the
+        whole list; the count moves by the net change. A handle in both lists is kept.
+        """
+        collection = self._collection(user_id, FOLLOWERS)
+        added = _follower_handles(add)
+        removed = _follower_handles(remove).keys() - added.keys()
+
+        refs = [collection.document(doc_id) for doc_id in [*added, *removed]]
+        existing = {snapshot.id for snapshot in self.db.get_all(refs) if snapshot.exists} if refs else set()
+        added_at = datetime.utcnow().isoformat()
+        writes = [('set', doc_id, {'handle': handle, 'added_at': added_at})
+                  for doc_id, handle in added.items() if doc_id not in existing]
+        writes += [('delete', doc_id, None) for doc_id in removed if doc_id in existing]
+        self._commit_writes(collection, writes)
+
+        user_ref = self._user_ref(user_id)
+        net = sum(1 if op == 'set' else -1 for op, _, _ in writes)
+        if net:
+            user_ref.update({COUNT_FIELDS[FOLLOWERS]: firestore.Increment(net)})
+        return (user_ref.get().to_dict() or {}).get(COUNT_FIELDS[FOLLOWERS]) or 0
+
+    def list_followers(self, user_id, limit=50, cursor=None):
+        """One page of follower handles -> (handles, next cursor token or None) (blocking)"""
+        query = self._collection(user_id, FOLLOWERS).order_by('__name__')
+        docs, next_cursor = fetch_page(query, [], clamp_page_size(limit), cursor)
+        metrics.incr('user_activity.page_reads')
+        return [doc.to_dict()['handle'] for doc in docs], next_cursor
+
+    def _commit_writes(self, collection, writes):
+        for start in range(0, len(writes), BATCH_SIZE):
+            batch = self.db.batch()
+            for op, doc_id, data in writes[start:start + BATCH_SIZE]:
+                if op == 'delete':
+                    batch.delete(collection.document(doc_id))
+                elif op == 'update':
+                    batch.update(collection.document(doc_id), data)
+                else:
+                    batch.set(collection.document(doc_id), data)
+            batch.commit()
+
+    # Migration from embedded arrays
+
+    def ensure_migrated(self, user_doc):
+        """Upgrade a user snapshot to the current functions schema -> whether it had to (blocking)"""
+        return self._upgrade(user_doc.reference, user_doc.to_dict() or {})
+
+    def _upgrade(self, user_ref, user_data):
+        if any(field in user_data for field in EMBEDDED_FIELDS):
+            self.migrate_user(user_ref, user_data)
+            return True
+        if user_data.get('functions_schema', 0) < FUNCTIONS_SCHEMA_VERSION:
+            self.backfill_timestamps(user_ref)
+            return True
+        return False
+
+    def backfill_timestamps(self, user_ref):
+        """Add date_ts to function documents written before it existed (blocking)"""
+        for kind in (CURRENT, PAST):
+            collection = user_ref.collection(kind)
+            docs = iter_query_documents(collection.order_by('__name__').select(['date', 'date_ts']))
+            self._commit_writes(collection, [
+                ('update', doc.id, {'date_ts': function_timestamp(doc.to_dict().get('date'))})
+                for doc in docs if 'date_ts' not in doc.to_dict()
+            ])
+        user_ref.update({'functions_schema': FUNCTIONS_SCHEMA_VERSION})
+        for kind in (CURRENT, PAST):
+            self.refresh_recent(user_ref.id, kind)
+        metrics.incr('user_activity.timestamps_backfilled')
+
+    def migrate_user(self, user_ref, user_data):
+        """Copy the embedded arrays into subcollections, then drop them from the user document (blocking)"""
+        functions = {}
+        for kind in (CURRENT, PAST):
+            by_id = {}
+            for function in user_data.get(kind) or []:
+                # Later entries win, like the last write to the array did
+                by_id[function_doc_id(function) or user_ref.collection(kind).document().id] = with_timestamp(function)
+            functions[kind] = by_id
+            self._commit_writes(user_ref.collection(kind),
+                                [('set', doc_id, function) for doc_id, function in by_id.items()])
+
+        followers = _follower_handles(user_data.get(FOLLOWERS) or [])
+        migrated_at = datetime.utcnow().isoformat()
+        self._commit_writes(user_ref.collection(FOLLOWERS),
+                            [('set', doc_id, {'handle': handle, 'added_at': migrated_at})
+                             for doc_id, handle in followers.items()])
+
+        # Same order as the queries: undated first when ascending, last when descending
+        upcoming = sorted(functions[CURRENT].values(), key=lambda f: f['date_ts'] or _NO_DATE)
+        past = sorted(functions[PAST].values(), key=lambda f: f['date_ts'] or _NO_DATE, reverse=True)
+        user_ref.update({
+            COUNT_FIELDS[CURRENT]: len(upcoming),
+            COUNT_FIELDS[PAST]: len(past),
+            # The scraped total may exceed the stored list, keep it if so
+            COUNT_FIELDS[FOLLOWERS]: max(len(followers), user_data.get(COUNT_FIELDS[FOLLOWERS]) or 0),
+            'rated_functions_count': len([f for f in past if f.get('final_rating')]),
+            recent_field(CURRENT): [function_summary(f) for f in upcoming[:self.recent_size]],
+            recent_field(PAST): [function_summary(f) for f in past[:self.recent_size]],
+            'functions_schema': FUNCTIONS_SCHEMA_VERSION,
+            **{field: firestore.DELETE_FIELD for field in EMBEDDED_FIELDS},
+        })
+        metrics.incr('user_activity.users_migrated')
+
+    def load(self):
+        """Upgrade every user to the current functions schema, once (blocking, run at startup)"""
+        marker = self._marker_ref().get()
+        if marker.exists and marker.to_dict().get('schema', 0) >= FUNCTIONS_SCHEMA_VERSION:
+            return
+
+        migrated = 0
+        users = self.db.collection('users').order_by('__name__').select(
+            [*EMBEDDED_FIELDS, COUNT_FIELDS[FOLLOWERS], 'functions_schema']
+        )
+        for user_doc in iter_query_documents(users, page_size=100):
+            if self._upgrade(user_doc.reference, user_doc.to_dict() or {}):
+                migrated += 1
+
+        self._marker_ref().set({'migrated_at': datetime.utcnow().isoformat(), 'users': migrated,
+                                'schema': FUNCTIONS_SCHEMA_VERSION})
+        print(f"🗂️ User activity migrated to subcollections: {migrated} users")
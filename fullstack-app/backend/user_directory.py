@@ -0,0 +1,121 @@
+"""
+Email -> user id index for O(1) lookups and race-free signups
+
+Every user has a `users_by_email/{email}` document ({'user_id': ...}) keyed
+by the normalized email. Registration creates it in the same transaction as
+the user document, so two concurrent signups with one email can't both
+succeed. Login and invites resolve emails with a direct document get
+instead of a `where('bc_email', '==', ...)` query.
+
+Users created before the index existed are backfilled once (the
+`meta/users_by_email` document records that it ran); until then a lookup
+miss falls back to the old query.
+"""
+from datetime import datetime
+from urllib.parse import quote
+
+from firebase_admin import firestore
+
+from firestore_paging import iter_query_documents
+from metrics import metrics
+
+INDEX_COLLECTION = 'users_by_email'
+
+
+class EmailTakenError(Exception):
+    pass
+
+
+def normalize_email(email):
+    return str(email).strip().lower()
+
+
+def email_doc_id(email):
+    # Document ids can't contain '/', which the local part of an email may
+    return quote(normalize_email(email), safe='@+')
+
+
+class UserDirectory:
+
+    def __init__(self, db):
+        self.db = db
+        self.backfilled = False
+
+    def _index_ref(self, email):
+        return self.db.collection(INDEX_COLLECTION).document(email_doc_id(email))
+
+    def _marker_ref(self):
+        return self.db.collection('meta').document(INDEX_COLLECTION)
+
+    def create_user(self, email, user_data):
+        """Create users/{id} + its email index entry atomically -> user id (blocking)"""
+        index_ref = self._index_ref(email)
+        user_ref = self.db.collection('users').document()
+
+        @firestore.transactional
+        def create(transaction):
+            if index_ref.get(transaction=transaction).exists:
+                raise EmailTakenError(email)
+            transaction.create(index_ref, {
+                'user_id': user_ref.id,
+                'created_at': datetime.utcnow().isoformat(),
+            })
+            transaction.set(user_ref, user_data)
+
+        create(self.db.transaction())
+        metrics.incr('user_directory.created')
+        return user_ref.id
+
+    def user_id_for_email(self, email):
+        """User id registered with email, or None (blocking)"""
+        index_doc = self._index_ref(email).get()
+        if index_doc.exists:
+            metrics.incr('user_directory.hits')
+            return index_doc.to_dict()['user_id']
+
+        if self.backfilled:
+            metrics.incr('user_directory.misses')
+            return None
+
+        # Index still being built - ask the users collection directly. Legacy
+        # bc_email values are stored as typed, so match that form and the normalized one.
+        metrics.incr('user_directory.fallback_queries')
+        forms = list(dict.fromkeys([normalize_email(email), str(email).strip(), str(email)]))
+        users = list(self.db.collection('users').where('bc_email', 'in', forms).limit(1).get())
+        return users[0].id if users else None
+
+    def get_user_by_email(self, email):
+        """The user's DocumentSnapshot, or None (blocking)"""
+        user_id = self.user_id_for_email(email)
+        if user_id is None:
+            return None
+        user_doc = self.db.collection('users').document(user_id).get()
+        return user_doc if user_doc.exists else None
+
+    def load(self):
+        """Index every pre-existing user once (blocking, run at startup)"""
+        if self._marker_ref().get().exists:
+            self.backfilled = True
+            return
+
+        created = duplicates = 0
+        users = self.db.collection('users').order_by('__name__').select(['bc_email'])
+        for user_doc in iter_query_documents(users):
+            email = (user_doc.to_dict() or {}).get('bc_email')
+            if not email:
+                continue
+            try:
+                self._index_ref(email).create({
+                    'user_id': user_doc.id,
+                    'created_at': datetime.utcnow().isoformat(),
+                })
+                created += 1
+            except Exception as e:
+                if getattr(e, 'code', None) != 409:
+                    raise
+                # Already indexed, or a legacy duplicate signup - the first account keeps the email
+                duplicates += 1
+
+        self._marker_ref().set({'backfilled_at': datetime.utcnow().isoformat(), 'indexed': created})
+        self.backfilled = True
+        print(f"📇 Email index backfilled: {created} users indexed, {duplicates} already present/duplicates")
@@ -6,6 +6,49 @@ const AuthContext = createContext();
 // Backend API URL
 const API_URL = 'http://127.0.0.1:8000/api';
 
+// Every axios call in the app sends the access token
+const setAuthHeader = (token) => {
+  if (token) {
+    axios.defaults.headers.common['Authorization'] = `Bearer ${token}`;
+  } else {
+    delete axios.defaults.headers.common['Authorization'];
+  }
+};
+
+// Access tokens are short-lived: on a 401, trade the refresh token for a new pair once and retry
+let refreshRequest = null;
+axios.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    const storedUser = JSON.parse(localStorage.getItem('user') || 'null');
+    const isAuthCall = original?.url?.endsWith('/auth/refresh') || original?.url?.endsWith('/users/login');
+
+    if (error.response?.status !== 401 || !original || original._retried || isAuthCall || !storedUser?.refresh_token) {
+      return Promise.reject(error);
+    }
+    original._retried = true;
+
+    // Concurrent 401s share one refresh
+    refreshRequest = refreshRequest || axios
+      .post(`${API_URL}/auth/refresh`, { refresh_token: storedUser.refresh_token })
+      .finally(() => { refreshRequest = null; });
+
+    try {
+      const { data: tokens } = await refreshRequest;
+      localStorage.setItem('user', JSON.stringify({ ...storedUser, ...tokens }));
+      setAuthHeader(tokens.access_token);
+      original.headers['Authorization'] = `Bearer ${tokens.access_token}`;
+      return axios(original);
+    } catch (refreshError) {
+      // Refresh token expired too - sign out
+      localStorage.removeItem('user');
+      setAuthHeader(null);
+      return Promise.reject(error);
+    }
+  }
+);
+
 export const useAuth = () => {
   const context = useContext(AuthContext);
   if (!context) {
@@ -22,7 +65,9 @@ export const AuthProvider = ({ children }) => {
   useEffect(() => {
     const storedUser = localStorage.getItem('user');
     if (storedUser) {
-      setUser(JSON.parse(storedUser));
+      const parsedUser = JSON.parse(storedUser);
+      setAuthHeader(parsedUser.access_token);
+      setUser(parsedUser);
     }
     setLoading(false);
   }, []);
@@ -39,7 +84,8 @@ export const AuthProvider = ({ children }) => {
 
       const userData = response.data;
       
-      // Store user data
+      // Store user data (includes access_token / refresh_token)
+      setAuthHeader(userData.access_token);
       setUser(userData);
       localStorage.setItem('user', JSON.stringify(userData));
 
@@ -76,6 +122,7 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    setAuthHeader(null);
     setUser(null);
     localStorage.removeItem('user');
   };
@@ -44,7 +44,9 @@ export const AliasGenerationPage = () => {
       // Call the generate-alias endpoint
       const response = await axios.post(
         `${API_URL}/users/${userData.user_id}/generate-alias`,
-        { description: description }
+        { description: description },
+        // Registration signs the user in; the alias step uses that token
+        { headers: { Authorization: `Bearer ${userData.access_token}` } }
       );
 
       const alias = response.data.ai_generated_alias;
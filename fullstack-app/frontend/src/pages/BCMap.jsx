@@ -96,6 +96,45 @@ function MapBounds({ locations }) {
   return null;
 }
 
+// Predictions arrive first, then the recommendation streams in token by token (SSE)
+async function streamEventInsights(events, setAiSuggestions) {
+  const res = await fetch(`${API_URL}/ai/event-insights/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ events })
+  });
+  if (!res.ok || !res.body) throw new Error(`Insights stream failed: ${res.status}`);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const frames = buffer.split('\n\n');
+    buffer = frames.pop();
+    for (const frame of frames) {
+      const name = frame.match(/^event: (.*)$/m)?.[1];
+      const data = frame.match(/^data: (.*)$/m)?.[1];
+      if (!name || !data) continue;
+      const payload = JSON.parse(data);
+
+      if (name === 'predictions') {
+        setAiSuggestions({ successPredictions: payload.successPredictions, recommendation: '' });
+      } else if (name === 'token') {
+        setAiSuggestions(prev => ({ ...prev, recommendation: (prev?.recommendation || '') + payload.text }));
+      } else if (name === 'done') {
+        setAiSuggestions(prev => ({ ...prev, recommendation: payload.recommendation }));
+      } else if (name === 'error') {
+        throw new Error(payload.detail);
+      }
+    }
+  }
+}
+
 export default function BCMap() {
   const [events, setEvents] = useState([]);
   const [aiSuggestions, setAiSuggestions] = useState(null);
@@ -125,13 +164,7 @@ export default function BCMap() {
         setFilteredEvents(upcoming);
         
         try {
-          const aiRes = await fetch(`${API_URL}/ai/event-insights`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ events: upcoming })
-          });
-          const insights = await aiRes.json();
-          setAiSuggestions(insights);
+          await streamEventInsights(upcoming, setAiSuggestions);
         } catch (err) {
           console.log('AI suggestions unavailable');
         }
@@ -676,7 +709,7 @@ export default function BCMap() {
 
             {selectedEvent.invitation_image && (
               <img
-                src={selectedEvent.invitation_image}
+                src={selectedEvent.invitation_images?.card || selectedEvent.invitation_image}
                 alt="Event Invitation"
                 style={{
                   width: '100%',
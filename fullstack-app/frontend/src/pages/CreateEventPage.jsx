@@ -94,6 +94,7 @@ const CreateEventPage = () => {
   // Image generation state
   const [generatingImage, setGeneratingImage] = useState(false);
   const [generatedImage, setGeneratedImage] = useState(null);
+  const [generatedImageSizes, setGeneratedImageSizes] = useState({});
   const [imageConfirmed, setImageConfirmed] = useState(false);
   
   const [loading, setLoading] = useState(false);
@@ -189,15 +190,23 @@ const CreateEventPage = () => {
         date: formData.date.toISOString(),
         emoji_vibe: formData.vibe_emojis,
         organizer_alias: user.ai_generated_alias,
-        description: ''
+        description: '',
+        // Same inputs return the cached image; "Regenerate" asks for a new one
+        regenerate: Boolean(generatedImage)
       });
 
       setGeneratedImage(response.data.invitation_image);
+      setGeneratedImageSizes(response.data.invitation_images || {});
       setImageConfirmed(false);
       
     } catch (err) {
       console.error('Error generating image:', err);
-      setError('Failed to generate image. Please try again.');
+      if (err.response?.status === 429) {
+        const retryAfter = err.response.headers['retry-after'] || 'a few';
+        setError(`Image generator is busy. Please try again in ${retryAfter} seconds.`);
+      } else {
+        setError('Failed to generate image. Please try again.');
+      }
     } finally {
       setGeneratingImage(false);
     }
@@ -255,7 +264,8 @@ const CreateEventPage = () => {
         club_name: formData.club_affiliated ? formData.club_name : null,
         organizer_user_id: user.user_id,
         organizer_alias: user.ai_generated_alias,
-        invitation_image: generatedImage
+        invitation_image: generatedImage,
+        invitation_images: generatedImageSizes
       };
       
       console.log('Sending payload:', payload);
@@ -107,7 +107,7 @@ const Dashboard = () => {
               organizer: event.organizer_alias,
               organizerUserId: event.organizer_user_id,
               organizerRating: organizerData.personal_rating || 5,
-              organizerHostCount: organizerData.current_functions?.length || 0,
+              organizerHostCount: organizerData.current_functions_count || 0,
               organizerVibeDescription: organizerData.bio || "No description available",
               description: event.description,
               publicOrPrivate: event.public_or_private,
@@ -289,7 +289,7 @@ function GoatedPrediction() {
               >
                 <CardMedia
                   component="img"
-                  image={goatedEvent.invitation_image}
+                  image={goatedEvent.invitation_images?.preview || goatedEvent.invitation_image}
                   alt={goatedEvent.function_name}
                   sx={{ 
                     width: '100%',
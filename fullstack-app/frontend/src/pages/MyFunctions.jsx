@@ -43,6 +43,7 @@ import LinkIcon from '@mui/icons-material/Link';
 import AddCircleIcon from '@mui/icons-material/AddCircle';
 
 const API_URL = 'http://127.0.0.1:8000/api';
+const PAGE_SIZE = 20;
 
 const MyFunctionsPage = () => {
   const { user } = useAuth();
@@ -50,6 +51,10 @@ const MyFunctionsPage = () => {
   
   const [currentFunctions, setCurrentFunctions] = useState([]);
   const [pastFunctions, setPastFunctions] = useState([]);
+  // History is paged: totals come from the server, next pages via cursors
+  const [counts, setCounts] = useState({ current: 0, past: 0 });
+  const [cursors, setCursors] = useState({ current: null, past: null });
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [tabValue, setTabValue] = useState(0); // 0 = Current, 1 = Past
@@ -87,11 +92,13 @@ const MyFunctionsPage = () => {
         // Don't fail the whole page if this fails
       }
       
-      // Then fetch updated user functions
-      const response = await axios.get(`${API_URL}/users/${user.user_id}/functions`);
+      // Then fetch the first page of each list
+      const response = await axios.get(`${API_URL}/users/${user.user_id}/functions`, { params: { limit: PAGE_SIZE } });
       
       setCurrentFunctions(response.data.current_functions || []);
       setPastFunctions(response.data.past_functions || []);
+      setCounts({ current: response.data.current_count || 0, past: response.data.past_count || 0 });
+      setCursors({ current: response.data.next_current_cursor, past: response.data.next_past_cursor });
       
     } catch (err) {
       console.error('Error fetching functions:', err);
@@ -101,6 +108,29 @@ const MyFunctionsPage = () => {
     }
   };
 
+  const handleLoadMore = async () => {
+    const kind = tabValue === 0 ? 'current' : 'past';
+    
+    try {
+      setLoadingMore(true);
+      const response = await axios.get(`${API_URL}/users/${user.user_id}/${kind}-functions`, {
+        params: { limit: PAGE_SIZE, start_after: cursors[kind] }
+      });
+      
+      if (kind === 'current') {
+        setCurrentFunctions(prev => [...prev, ...(response.data.current_functions || [])]);
+      } else {
+        setPastFunctions(prev => [...prev, ...(response.data.past_functions || [])]);
+      }
+      setCursors(prev => ({ ...prev, [kind]: response.data.next_cursor }));
+    } catch (err) {
+      console.error('Error loading more functions:', err);
+      setSnackbar({ open: true, message: 'Failed to load more functions', severity: 'error' });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleShareLinkClick = (func) => {
     setSelectedFunction(func);
     
@@ -307,11 +337,11 @@ const MyFunctionsPage = () => {
             }}
           >
             <Tab 
-              label={`Upcoming (${currentFunctions.length})`}
+              label={`Upcoming (${counts.current})`}
               sx={{ flex: 1 }}
             />
             <Tab 
-              label={`Past (${pastFunctions.length})`}
+              label={`Past (${counts.past})`}
               sx={{ flex: 1 }}
             />
           </Tabs>
@@ -370,6 +400,7 @@ const MyFunctionsPage = () => {
           </Paper>
         ) : (
           /* Functions Grid */
+          <>
           <Grid container spacing={3}>
             {(tabValue === 0 ? currentFunctions : pastFunctions).map((func, index) => (
               <Grid item xs={12} md={6} key={func.event_id || index}>
@@ -391,7 +422,7 @@ const MyFunctionsPage = () => {
                   {func.invitation_image && (
                     <CardMedia
                       component="img"
-                      image={func.invitation_image}
+                      image={func.invitation_images?.card || func.invitation_image}
                       alt={func.function_name}
                       sx={{ 
                         height: 350,
@@ -570,6 +601,29 @@ const MyFunctionsPage = () => {
               </Grid>
             ))}
           </Grid>
+          
+          {/* Next page of the selected tab */}
+          {cursors[tabValue === 0 ? 'current' : 'past'] && (
+            <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}>
+              <Button
+                variant="outlined"
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                sx={{
+                  color: '#00ff88',
+                  borderColor: '#00ff88',
+                  fontWeight: 'bold',
+                  '&:hover': {
+                    borderColor: '#00dd77',
+                    bgcolor: 'rgba(0, 255, 136, 0.1)',
+                  }
+                }}
+              >
+                {loadingMore ? <CircularProgress size={20} sx={{ color: '#00ff88' }} /> : 'Load More'}
+              </Button>
+            </Box>
+          )}
+          </>
         )}
       </Container>
 
@@ -73,19 +73,23 @@ const ProfilePage = () => {
 
   const fetchUserProfile = async () => {
     try {
-      const response = await axios.get(`${API_URL}/users/${user.user_id}`);
+      // Profile carries counts only; follower handles are a paginated list
+      const [response, followersResponse] = await Promise.all([
+        axios.get(`${API_URL}/users/${user.user_id}`),
+        axios.get(`${API_URL}/users/${user.user_id}/instagram-followers`, { params: { limit: 100 } })
+      ]);
       const userData = response.data;
       
       setInstagramHandle(userData.instagram_handle || '');
-      setFollowersList(userData.instagram_followers || []);
+      setFollowersList(followersResponse.data.instagram_followers || []);
       setClubs(userData.bc_club_affiliations || []);
       setBio(userData.bio || '');
       setYearAtBC(userData.year_at_bc || '');
       setUserStats({
         personal_rating: userData.personal_rating || 5,
-        past_functions_count: userData.past_functions?.length || 0,
-        current_functions_count: userData.current_functions?.length || 0,
-        instagram_follower_count: userData.instagram_follower_count || userData.instagram_followers?.length || 0
+        past_functions_count: userData.past_functions_count || 0,
+        current_functions_count: userData.current_functions_count || 0,
+        instagram_follower_count: userData.instagram_follower_count || 0
       });
     } catch (err) {
       console.error('Error fetching profile:', err);
@@ -102,9 +106,9 @@ const ProfilePage = () => {
     setError('');
     
     try {
+      // Handle only - followers are changed by sync, never by re-sending the loaded page
       await axios.put(`${API_URL}/users/${user.user_id}/instagram`, {
-        instagram_handle: instagramHandle,
-        instagram_followers: followersList
+        instagram_handle: instagramHandle
       });
       
       setSuccess('Instagram updated successfully!');
@@ -128,8 +132,7 @@ const ProfilePage = () => {
     
     try {
       await axios.put(`${API_URL}/users/${user.user_id}/instagram`, {
-        instagram_handle: instagramHandle,
-        instagram_followers: []
+        instagram_handle: instagramHandle
       });
       
       setSuccess('Syncing followers... This may take a minute.');